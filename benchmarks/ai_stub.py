@@ -0,0 +1,119 @@
+"""
+Local stand-in for the Cloudflare Workers AI endpoint used by CloudflareAIService.
+
+Answers the three prompt shapes src/api/services/ai_service.py sends, in the
+`{"result": {"response": "<text>"}}` envelope:
+  - language detection ("Detect the language ...")  -> {"lang": "en", "text": <input>}
+  - list translation ("Translate EACH item ...")    -> the same JSON array
+  - preference extraction                           -> EnhancedPreferenceExtraction JSON, derived
+    from numbers, city names and lifestyle tags found in the user query
+
+Run:
+    python -m benchmarks.ai_stub --port 8097 --latency-ms 900 --jitter-ms 300
+then point the API at it with CLOUDFLARE_AI_BASE_URL=http://localhost:8097.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.synthetic import LIFESTYLE_TAGS, LOCATIONS
+
+
+class StubConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, error_rate: float = 0.0, error_status: int = 503) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+
+def _after(marker: str, prompt: str) -> str:
+    _, _, tail = prompt.partition(marker)
+    return tail.strip()
+
+
+def extract(query: str) -> Dict[str, Any]:
+    """Deterministic 'model' output: enough structure for the matching path to proceed."""
+    text = query.lower()
+    amounts = sorted(int(n.replace(",", "")) for n in re.findall(r"\d[\d,]{2,}", text))
+    budget_min = amounts[0] if amounts else 5000
+    budget_max = amounts[-1] if len(amounts) > 1 else int(budget_min * 1.3)
+    location = next((loc for loc in LOCATIONS if loc.lower() in text), None)
+    tags: List[str] = [tag for tag in LIFESTYLE_TAGS if tag.replace("_", " ") in text or tag in text]
+    estimated = [f for f, found in (("budget_min", amounts), ("budget_max", len(amounts) > 1)) if not found]
+    return {
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "location_preference": location,
+        "lifestyle_tags": tags,
+        "confidence_scores": {"budget_min": 0.9 if amounts else 0.4, "location_preference": 0.9 if location else 0.0},
+        "estimated_fields": estimated,
+        "missing_critical_info": [] if location else ["location_preference"],
+        "suggestions": [] if location else ["Tell us which city you are looking in"],
+    }
+
+
+def respond(prompt: str) -> str:
+    if prompt.startswith("Detect the language"):
+        return json.dumps({"lang": "en", "text": _after("INPUT:\n", prompt)}, ensure_ascii=False)
+    if prompt.startswith("Translate EACH item"):
+        return _after("Array:\n", prompt)
+    query = _after("User query:", prompt).split("\n\n", 1)[0]
+    return json.dumps(extract(query), ensure_ascii=False)
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Workers AI stand-in")
+    app.state.config = config
+    app.state.counters = {"requests": 0, "injected_errors": 0}
+
+    @app.post("/accounts/{account_id}/ai/run/{model:path}")
+    async def run(account_id: str, model: str, request: Request):
+        cfg: StubConfig = app.state.config
+        app.state.counters["requests"] += 1
+        delay = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if cfg.error_rate and random.random() < cfg.error_rate:
+            app.state.counters["injected_errors"] += 1
+            return JSONResponse({"success": False, "errors": [{"message": "injected"}]}, status_code=cfg.error_status)
+        body = await request.json()
+        return {"success": True, "result": {"response": respond(body.get("input", ""))}}
+
+    @app.post("/_stub/config")
+    async def update_config(changes: Dict[str, Any]):
+        for key, value in changes.items():
+            if hasattr(app.state.config, key):
+                setattr(app.state.config, key, value)
+        return vars(app.state.config)
+
+    @app.get("/_stub/stats")
+    async def stats():
+        return app.state.counters
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8097)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(StubConfig(args.latency_ms, args.jitter_ms, args.error_rate))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
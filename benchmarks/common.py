@@ -0,0 +1,91 @@
+"""Shared helpers for the benchmark scripts: open-loop load generation and latency summaries."""
+import asyncio
+import json
+import math
+import platform
+import time
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name: str, latencies_ms: List[float], errors: int, elapsed_s: float, **extra: Any) -> Dict[str, Any]:
+    """Machine-readable summary shared by every benchmark (one JSON object per scenario)."""
+    values = sorted(latencies_ms)
+    total = len(values) + errors
+    return {
+        "name": name,
+        "requests": total,
+        "ok": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(len(values) / elapsed_s, 2) if elapsed_s else None,
+        "p50_ms": _round(percentile(values, 50)),
+        "p95_ms": _round(percentile(values, 95)),
+        "p99_ms": _round(percentile(values, 99)),
+        "max_ms": _round(values[-1] if values else None),
+        "python": platform.python_version(),
+        **extra,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+def emit(results: List[Dict[str, Any]], output: Optional[str] = None) -> None:
+    """Print results as JSON lines and optionally append them to a file."""
+    lines = [json.dumps(r, sort_keys=True) for r in results]
+    for line in lines:
+        print(line)
+    if output:
+        with open(output, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+async def run_at_rate(
+    call: Callable[[int], Awaitable[bool]],
+    rate: float,
+    duration_s: float,
+    max_in_flight: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Open-loop load: start call(i) every 1/rate seconds for duration_s regardless of
+    how long earlier calls take, so slow responses show up as latency instead of
+    silently lowering the offered rate. call returns True on success.
+    Latency is measured from the scheduled start, which includes queueing delay.
+    """
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(max_in_flight)
+    tasks: List[asyncio.Task] = []
+
+    async def one(i: int, scheduled: float) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+        if ok:
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+        else:
+            errors += 1
+
+    start = time.perf_counter()
+    total = int(rate * duration_s)
+    for i in range(total):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(i, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return {"latencies_ms": latencies, "errors": errors, "elapsed_s": elapsed}
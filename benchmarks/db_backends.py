@@ -0,0 +1,78 @@
+"""
+Compare the PostgREST and async SQLAlchemy/asyncpg repository backends on the
+hot read paths used by /matchmaking/match/top and the profile GETs.
+
+Needs the same .env as the API (DATABASE_URL must use postgresql+asyncpg://).
+
+Example:
+    python -m benchmarks.db_backends --user-id <uuid> --iterations 200 --concurrency 1 --concurrency 16
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from benchmarks.common import summarize, emit
+from src.api.db.repository import get_repository
+from src.api.db.session import dispose_engine
+
+
+async def bench(backend: str, op: str, call, iterations: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            t0 = time.perf_counter()
+            try:
+                await call()
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+    await call()  # warm-up: connection pool / prepared statements
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    return summarize(f"db.{backend}.{op}", latencies, errors, time.perf_counter() - start, concurrency=concurrency)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    results = []
+    for backend in args.backend:
+        repo = get_repository(backend)
+        user = await repo.get_user_profile(args.user_id)
+        if not user:
+            raise SystemExit(f"user {args.user_id} not found via {backend}")
+        location = (user.get("location_preference") or "").strip().upper()
+        budget_min, budget_max = user.get("budget_min"), user.get("budget_max")
+
+        ops = {
+            "get_user_profile": lambda: repo.get_user_profile(args.user_id),
+            "find_roommate_candidates": lambda: repo.find_roommate_candidates(args.user_id, location, budget_min, budget_max),
+            "find_property_candidates": lambda: repo.find_property_candidates(location, budget_min, budget_max, datetime.utcnow()),
+        }
+        for concurrency in args.concurrency:
+            for op, call in ops.items():
+                results.append(await bench(backend, op, call, args.iterations, concurrency))
+    await dispose_engine()
+    emit(results, args.output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True, help="existing user_profiles.user_id to query around")
+    parser.add_argument("--backend", action="append", choices=["postgrest", "sqlalchemy"])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, action="append")
+    parser.add_argument("--output", help="append JSON lines to this file")
+    args = parser.parse_args()
+    args.backend = args.backend or ["postgrest", "sqlalchemy"]
+    args.concurrency = args.concurrency or [1, 16]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Geo index micro-benchmark: radius and k-nearest queries over synthetic listings
+clustered around Mexican cities.
+
+Example:
+    python -m benchmarks.geo_index --listings 100000 --queries 2000 --radius-km 2
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import summarize, emit
+from src.api.services.geo_index import GeoIndex
+
+CITY_CENTERS = [
+    (19.4326, -99.1332), (25.6866, -100.3161), (20.6597, -103.3496), (19.0414, -98.2063),
+    (20.5888, -100.3899), (20.9674, -89.5926), (32.5149, -117.0382), (21.1250, -101.6860),
+]
+
+
+def synthetic_points(n: int, rng: random.Random):
+    for pid in range(1, n + 1):
+        lat, lng = rng.choice(CITY_CENTERS)
+        # ~10 km spread around the city center
+        yield pid, lat + rng.gauss(0, 0.09), lng + rng.gauss(0, 0.09)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listings", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius-km", type=float, default=2.0)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--cell-km", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = GeoIndex(cell_km=args.cell_km)
+    t0 = time.perf_counter()
+    for pid, lat, lng in synthetic_points(args.listings, rng):
+        index.add(pid, lat, lng)
+    build_s = time.perf_counter() - t0
+
+    centers = [(lat + rng.gauss(0, 0.05), lng + rng.gauss(0, 0.05)) for lat, lng in rng.choices(CITY_CENTERS, k=args.queries)]
+    results = []
+    for name, query in (
+        (f"geo.within_{args.radius_km}km", lambda c: index.within(c[0], c[1], args.radius_km)),
+        (f"geo.nearest_{args.k}", lambda c: index.nearest(c[0], c[1], args.k)),
+    ):
+        latencies, hits = [], 0
+        start = time.perf_counter()
+        for c in centers:
+            t = time.perf_counter()
+            hits += len(query(c))
+            latencies.append((time.perf_counter() - t) * 1000)
+        results.append(summarize(
+            name, latencies, 0, time.perf_counter() - start,
+            listings=args.listings, cell_km=args.cell_km, avg_hits=round(hits / len(centers), 1), build_s=round(build_s, 3),
+        ))
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Group formation benchmark on synthetic single-location populations.
+
+Example:
+    python -m benchmarks.group_formation --users 10000 --users 25000
+"""
+import argparse
+
+from benchmarks.common import emit
+from benchmarks.synthetic import generate_users
+from src.api.services.group_formation import form_groups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, action="append", help="population size (repeatable)")
+    parser.add_argument("--min-score", type=float, default=0.6)
+    parser.add_argument("--max-neighbours", type=int, default=25)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.users or [10000]:
+        users = generate_users(n, seed=args.seed, location="BENCH")
+        groups, stats = form_groups(users, min_score=args.min_score, max_neighbours=args.max_neighbours)
+        sizes = [len(g["members"]) for g in groups]
+        results.append({
+            "name": f"group_formation.{n}",
+            **stats,
+            "pruned_pct": round(100 * (1 - stats["pairs_scored"] / max(stats["all_pairs"], 1)), 1),
+            "group_sizes": {str(k): sizes.count(k) for k in sorted(set(sizes))},
+            "users_per_second": round(n / stats["elapsed_seconds"], 1) if stats["elapsed_seconds"] else None,
+        })
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Local stand-in for the Juno (Bitso) API used by the payment paths.
+
+Verifies the `Authorization: Bitso <key>:<nonce>:<signature>` header exactly like
+src/api/services/juno.py builds it (HMAC-SHA256 over nonce + method + path + body,
+query string excluded) and injects latency and errors on demand.
+
+Run:
+    python -m benchmarks.juno_stub --port 8099 --latency-ms 80 --error-rate 0.02
+then point the API at it with JUNO_BASE_URL=http://localhost:8099.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import os
+import random
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class StubConfig:
+    def __init__(
+        self,
+        api_key: str,
+        api_secret: str,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 35.0,
+        max_nonce_age_s: float = 60.0,
+    ) -> None:
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.max_nonce_age_s = max_nonce_age_s
+
+
+def _verify(config: StubConfig, authorization: Optional[str], method: str, path: str, body: bytes) -> Optional[str]:
+    """Return None when the header is valid, otherwise the rejection reason."""
+    if not authorization or not authorization.startswith("Bitso "):
+        return "missing Bitso authorization"
+    try:
+        key, nonce, signature = authorization[len("Bitso "):].split(":")
+    except ValueError:
+        return "malformed authorization"
+    if key != config.api_key:
+        return "unknown api key"
+    if not nonce.isdigit() or abs(time.time() * 1000 - int(nonce)) > config.max_nonce_age_s * 1000:
+        return "stale nonce"
+    data = f"{nonce}{method}{path}".encode() + body
+    expected = hmac.new(config.api_secret.encode(), data, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, signature):
+        return "invalid signature"
+    return None
+
+
+def _random_clabe() -> str:
+    return "646180" + "".join(random.choice("0123456789") for _ in range(12))
+
+
+def create_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Juno stand-in")
+    app.state.config = config
+    app.state.clabes = {}
+    app.state.withdrawals = {}
+    app.state.transactions = {}
+    app.state.counters = {"requests": 0, "auth_failures": 0, "injected_errors": 0}
+
+    @app.middleware("http")
+    async def auth_and_faults(request: Request, call_next):
+        cfg: StubConfig = app.state.config
+        app.state.counters["requests"] += 1
+        if request.url.path.startswith("/_stub"):
+            return await call_next(request)
+
+        body = await request.body()
+        reason = _verify(cfg, request.headers.get("Authorization"), request.method, request.url.path, body)
+        if reason:
+            app.state.counters["auth_failures"] += 1
+            return JSONResponse(status_code=401, content={"success": False, "error": {"message": reason, "code": "0201"}})
+
+        delay = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = random.random()
+        if roll < cfg.hang_rate:
+            await asyncio.sleep(cfg.hang_seconds)
+        elif roll < cfg.hang_rate + cfg.error_rate:
+            app.state.counters["injected_errors"] += 1
+            return JSONResponse(status_code=cfg.error_status, content={"success": False, "error": {"message": "injected"}})
+        return await call_next(request)
+
+    @app.post("/mint_platform/v1/clabes")
+    async def create_clabe():
+        clabe = _random_clabe()
+        app.state.clabes[clabe] = {"clabe": clabe, "type": "AUTO_PAYMENT", "status": "ENABLED"}
+        return {"success": True, "payload": app.state.clabes[clabe]}
+
+    @app.get("/spei/v1/clabes/{clabe}")
+    async def clabe_details(clabe: str):
+        if clabe not in app.state.clabes:
+            return JSONResponse(status_code=404, content={"success": False, "error": {"message": "clabe not found"}})
+        return {"success": True, "payload": app.state.clabes[clabe]}
+
+    @app.get("/spei/v1/clabes")
+    async def list_clabes(page: int = 0, page_size: int = 20):
+        items = list(app.state.clabes.values())
+        start = page * page_size
+        return {
+            "success": True,
+            "payload": {"response": items[start:start + page_size], "total_items": len(items), "total_pages": -(-len(items) // page_size)},
+        }
+
+    @app.post("/mint_platform/v1/withdrawals")
+    async def withdraw(request: Request):
+        body = await request.json()
+        withdrawal_id = str(uuid.uuid4())
+        app.state.withdrawals[withdrawal_id] = {"id": withdrawal_id, "status": "PENDING", **body}
+        app.state.transactions[withdrawal_id] = {"id": withdrawal_id, "status": "COMPLETE", "amount": body.get("amount"), "type": "WITHDRAWAL"}
+        return {"success": True, "payload": app.state.withdrawals[withdrawal_id]}
+
+    @app.get("/mint_platform/v1/transactions")
+    async def list_transactions(page: int = 0, page_size: int = 100):
+        items = list(app.state.transactions.values())
+        start = page * page_size
+        return {
+            "success": True,
+            "payload": {"response": items[start:start + page_size], "total_items": len(items), "total_pages": max(1, -(-len(items) // page_size))},
+        }
+
+    @app.post("/_stub/transactions")
+    async def seed_transactions(transactions: List[Dict[str, Any]]):
+        """Seed settled deposits, e.g. [{"id": "txn-1", "amount": "500.00", "status": "COMPLETE"}]."""
+        for txn in transactions:
+            app.state.transactions[str(txn["id"])] = txn
+        return {"transactions": len(app.state.transactions)}
+
+    @app.get("/_stub/stats")
+    async def stats():
+        return {**app.state.counters, "clabes": len(app.state.clabes), "withdrawals": len(app.state.withdrawals), "transactions": len(app.state.transactions)}
+
+    @app.post("/_stub/config")
+    async def update_config(changes: Dict[str, float]):
+        cfg: StubConfig = app.state.config
+        for key, value in changes.items():
+            if hasattr(cfg, key) and key not in ("api_key", "api_secret"):
+                setattr(cfg, key, type(getattr(cfg, key))(value))
+        return vars(cfg) | {"api_secret": "***"}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--api-key", default=os.getenv("JUNO_API_KEY", "stub-key"))
+    parser.add_argument("--api-secret", default=os.getenv("JUNO_API_SECRET", "stub-secret"))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that exceed client timeouts")
+    parser.add_argument("--hang-seconds", type=float, default=35.0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        api_key=args.api_key,
+        api_secret=args.api_secret,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+    )
+
+    import uvicorn
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
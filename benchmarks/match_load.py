@@ -0,0 +1,124 @@
+"""
+End-to-end load benchmark for POST /matchmaking/match/top against a running API
+whose SUPABASE_URL points at benchmarks/postgrest_stub.py and whose
+CLOUDFLARE_AI_BASE_URL points at benchmarks/ai_stub.py (never production).
+
+Scenarios:
+    match       stored preferences only
+    match-ai    ai_query=true with a synthetic prompt (translation + extraction round trips)
+    match-geo   lat/lng/radius_km around the user's city center
+
+Each request picks a random synthetic user fetched from the PostgREST stub.
+
+Example:
+    python -m benchmarks.postgrest_stub --users 20000 --properties 20000 --latency-ms 5 &
+    python -m benchmarks.ai_stub --latency-ms 900 --jitter-ms 300 &
+    SUPABASE_URL=http://localhost:8098 CLOUDFLARE_AI_BASE_URL=http://localhost:8097 python src/main.py &
+    python -m benchmarks.match_load --scenario match --scenario match-geo --rate 50 --duration 20
+"""
+import argparse
+import asyncio
+import random
+from typing import Any, Callable, Dict, List
+
+import httpx
+
+from benchmarks.common import run_at_rate, summarize, emit
+from benchmarks.synthetic import CITY_CENTERS, LIFESTYLE_TAGS
+
+PROMPTS = [
+    "Looking for a room in {city} between {low} and {high}, {tag} please",
+    "Busco cuarto en {city}, presupuesto {low} a {high}, {tag}",
+    "Need a place near downtown {city}, max {high}, {tag}",
+]
+
+
+async def load_users(postgrest_url: str, limit: int) -> List[Dict[str, Any]]:
+    async with httpx.AsyncClient(base_url=postgrest_url, timeout=30.0) as http:
+        r = await http.get("/rest/v1/user_profiles", params={"select": "user_id,location_preference", "limit": str(limit)})
+        r.raise_for_status()
+        return r.json()
+
+
+def build_scenario(name: str, http: httpx.AsyncClient, users: List[Dict[str, Any]], top_k: int, radius_km: float) -> Callable[[int], Any]:
+    rng = random.Random(7)
+
+    async def match(i: int) -> bool:
+        user = rng.choice(users)
+        r = await http.post("/matchmaking/match/top", params={"user_id": user["user_id"], "top_k": top_k})
+        return r.status_code < 300
+
+    async def match_ai(i: int) -> bool:
+        user = rng.choice(users)
+        low = rng.randrange(3000, 9000, 500)
+        prompt = rng.choice(PROMPTS).format(
+            city=user["location_preference"].title(), low=low, high=low + 3000, tag=rng.choice(LIFESTYLE_TAGS).replace("_", " ")
+        )
+        r = await http.post(
+            "/matchmaking/match/top",
+            params={"user_id": user["user_id"], "top_k": top_k, "ai_query": "true"},
+            json={"user_prompt": prompt},
+        )
+        return r.status_code < 300
+
+    async def match_geo(i: int) -> bool:
+        user = rng.choice(users)
+        lat, lng = CITY_CENTERS.get(user["location_preference"], CITY_CENTERS["CDMX"])
+        r = await http.post("/matchmaking/match/top", params={
+            "user_id": user["user_id"],
+            "top_k": top_k,
+            "lat": lat + rng.gauss(0, 0.03),
+            "lng": lng + rng.gauss(0, 0.03),
+            "radius_km": radius_km,
+        })
+        return r.status_code < 300
+
+    scenarios: Dict[str, Callable[[int], Any]] = {
+        "match": match,
+        "match-ai": match_ai,
+        "match-geo": match_geo,
+    }
+    return scenarios[name]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    users = await load_users(args.postgrest_url, args.users)
+    if not users:
+        raise SystemExit("no user_profiles in the PostgREST stub")
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout, limits=limits) as http:
+        results = []
+        for name in args.scenario:
+            scenario = build_scenario(name, http, users, args.top_k, args.radius_km)
+            run = await run_at_rate(scenario, args.rate, args.duration, args.max_in_flight)
+            results.append(summarize(
+                f"matchmaking.load.{name}",
+                run["latencies_ms"],
+                run["errors"],
+                run["elapsed_s"],
+                target_rps=args.rate,
+                top_k=args.top_k,
+            ))
+    emit(results, args.output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8080")
+    parser.add_argument("--postgrest-url", default="http://localhost:8098", help="stub to draw user_ids from")
+    parser.add_argument("--scenario", action="append", choices=["match", "match-ai", "match-geo"])
+    parser.add_argument("--users", type=int, default=5000, help="distinct users to cycle through")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--radius-km", type=float, default=5.0)
+    parser.add_argument("--rate", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per scenario")
+    parser.add_argument("--timeout", type=float, default=35.0)
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    args = parser.parse_args()
+    args.scenario = args.scenario or ["match"]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Matchmaking micro-benchmarks: scoring and candidate selection at 1k / 10k / 100k
+candidates in one location, on synthetic profiles and listings.
+
+Each case times one match_top-sized query (score the pool, keep top_k) per
+iteration, cycling through synthetic query users:
+
+    roommates.python      roommate_score_raw per candidate + sort (MATCH_SCORING=python)
+    properties.python     property_score_raw per candidate + sort (MATCH_SCORING=python)
+    properties.numpy      group_matching.score_properties (vectorized over row dicts)
+    roommates.snapshot    CandidateSnapshot.top_roommates (MATCH_SCORING=snapshot)
+    properties.snapshot   CandidateSnapshot.top_properties
+    select.amenities      AmenityIndex.match for the user's hard filters
+    select.move_in        AvailabilityIndex.overlapping for a 30-day window
+    batch.location        batch_matching.score_location: every query user against both
+                          pools in one call (roommates and properties; per-user cost)
+
+Geo selection has its own benchmark (benchmarks/geo_index.py).
+
+Example:
+    python -m benchmarks.matchmaking --candidates 1000 --candidates 10000 --candidates 100000 --queries 100
+"""
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.common import summarize, emit
+from benchmarks.synthetic import AMENITIES, BASE_DATE, generate_properties, generate_users
+from src.api.services.amenity_index import AmenityIndex
+from src.api.services.availability_index import AvailabilityIndex
+from src.api.services.batch_matching import _preferences, score_location
+from src.api.services.candidate_snapshot import CandidateSnapshot, write_snapshot
+from src.api.services.group_matching import score_properties
+from src.api.services.scoring import roommate_score_raw, property_score_raw, round_score
+
+LOCATION = "BENCH"
+
+
+def time_case(name: str, queries: List[Dict[str, Any]], run: Callable[[Dict[str, Any]], Any], **extra: Any) -> Dict[str, Any]:
+    run(queries[0])  # warm-up (page faults, lazy imports)
+    latencies = []
+    start = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        run(q)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return summarize(name, latencies, 0, time.perf_counter() - start, **extra)
+
+
+def run_size(n: int, n_queries: int, top_k: int, seed: int) -> List[Dict[str, Any]]:
+    users = generate_users(n, seed=seed, location=LOCATION)
+    listings = generate_properties(n, seed=seed, location=LOCATION)
+    rng = random.Random(seed + 1)
+    queries = []
+    for q in generate_users(n_queries, seed=seed + 2, location=LOCATION, with_preferences=True):
+        start = BASE_DATE + timedelta(days=rng.randint(0, 120))
+        q["window"] = (start, start + timedelta(days=30))
+        q["filters"] = rng.sample(AMENITIES[:6], 2 if rng.random() < 0.5 else 1)
+        queries.append(q)
+    now = datetime.combine(BASE_DATE, datetime.min.time()) + timedelta(days=60)
+
+    def in_budget(q: Dict[str, Any], pool: List[Dict[str, Any]], lo: str, hi: str) -> List[Dict[str, Any]]:
+        return [r for r in pool if r[hi] >= q["budget_min"] and r[lo] <= q["budget_max"]]
+
+    def roommates_python(q: Dict[str, Any]) -> None:
+        tags = set(q["lifestyle_tags"])
+        pool = [r for r in in_budget(q, users, "budget_min", "budget_max") if r["user_id"] != q["user_id"]]
+        scored = [(r, roommate_score_raw(q["budget_min"], q["budget_max"], tags, r)) for r in pool]
+        sorted(scored, key=lambda pair: round_score(pair[1]), reverse=True)[:top_k]
+
+    def properties_python(q: Dict[str, Any]) -> None:
+        tags = set(q["lifestyle_tags"])
+        pool = [p for p in in_budget(q, listings, "price", "price") if p["available_from"] <= now.isoformat()]
+        scored = [(p, property_score_raw(q["budget_min"], q["budget_max"], tags, p)) for p in pool]
+        sorted(scored, key=lambda pair: round_score(pair[1]), reverse=True)[:top_k]
+
+    def properties_numpy(q: Dict[str, Any]) -> None:
+        pool = [p for p in in_budget(q, listings, "price", "price") if p["available_from"] <= now.isoformat()]
+        scores = score_properties(q["budget_min"], q["budget_max"], set(q["lifestyle_tags"]), pool)
+        np.argsort(-np.round(scores, 3), kind="stable")[:top_k]
+
+    directory = tempfile.mkdtemp(prefix="roomfi-bench-")
+    write_snapshot(users, listings, directory)
+    snapshot = CandidateSnapshot(directory)
+    snapshot.touch([LOCATION])
+
+    def roommates_snapshot(q: Dict[str, Any]) -> None:
+        snapshot.top_roommates(q["user_id"], LOCATION, q["budget_min"], q["budget_max"], set(q["lifestyle_tags"]), top_k)
+
+    def properties_snapshot(q: Dict[str, Any]) -> None:
+        snapshot.top_properties(LOCATION, q["budget_min"], q["budget_max"], set(q["lifestyle_tags"]), now, None, top_k)
+
+    amenities = AmenityIndex()
+    availability = AvailabilityIndex()
+    for p in listings:
+        amenities.add(p["id"], p["location"], p["amenities"])
+        availability.add(p["id"], p["location"], p["available_from"], p["available_to"])
+
+    def select_amenities(q: Dict[str, Any]) -> None:
+        amenities.match(all_of=q["filters"], location=LOCATION)
+
+    def select_move_in(q: Dict[str, Any]) -> None:
+        availability.overlapping(q["window"][0], q["window"][1], LOCATION)
+
+    cases = {
+        "roommates.python": roommates_python,
+        "properties.python": properties_python,
+        "properties.numpy": properties_numpy,
+        "roommates.snapshot": roommates_snapshot,
+        "properties.snapshot": properties_snapshot,
+        "select.amenities": select_amenities,
+        "select.move_in": select_move_in,
+    }
+    results = [
+        time_case(f"matchmaking.{name}.{n}", queries, run, candidates=n, top_k=top_k)
+        for name, run in cases.items()
+    ]
+
+    # Stored budget and tags only, like the python cases (hard filters are timed by select.*)
+    batch = [{**_preferences(q), "move_in": None, "required_amenities": set()} for q in queries]
+    score_location(batch[:1], users, listings, top_k, now)  # warm-up
+    start = time.perf_counter()
+    score_location(batch, users, listings, top_k, now)
+    elapsed = time.perf_counter() - start
+    results.append(summarize(
+        f"matchmaking.batch.location.{n}", [elapsed * 1000 / len(batch)] * len(batch), 0, elapsed,
+        candidates=n, top_k=top_k,
+    ))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, action="append", help="pool size per location (repeatable)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.candidates or [1000, 10000, 100000]:
+        results.extend(run_size(n, args.queries, args.top_k, args.seed))
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
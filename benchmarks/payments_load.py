@@ -0,0 +1,129 @@
+"""
+Payments load benchmark against a running API whose JUNO_BASE_URL points at
+benchmarks/juno_stub.py (never the real Juno sandbox).
+
+Scenarios:
+    clabe           POST /juno/create-clabe
+    signup          POST /db/new/user  (create_clabe_for_user + Supabase insert)
+                    Writes real rows: only runs with --allow-db-writes, against a test
+                    project, and deletes the profiles (and their stored matches) afterwards.
+    withdraw        POST /funds/withdraw  (synchronous)
+    withdraw-jobs   POST /funds/withdraw/jobs  (accept only)
+
+Example:
+    python -m benchmarks.juno_stub --latency-ms 80 &
+    JUNO_BASE_URL=http://localhost:8099 python src/main.py &
+    python -m benchmarks.payments_load --scenario withdraw --scenario withdraw-jobs --rate 50 --duration 20
+"""
+import argparse
+import asyncio
+import sys
+import uuid
+from typing import Callable, Dict, Any, List
+
+import httpx
+
+from benchmarks.common import run_at_rate, summarize, emit
+
+WITHDRAW_BODY = {
+    "address": "0x000000000000000000000000000000000000dEaD",
+    "amount": "1.5",
+    "asset": "MXNB",
+    "blockchain": "ARBITRUM",
+}
+
+
+def build_scenario(name: str, http: httpx.AsyncClient, created: List[str]) -> Callable[[int], Any]:
+    async def clabe(i: int) -> bool:
+        r = await http.post("/juno/create-clabe")
+        return r.status_code < 300
+
+    async def signup(i: int) -> bool:
+        user_id = str(uuid.uuid4())
+        created.append(user_id)  # before the request: a timed-out request may still have written the row
+        r = await http.post("/db/new/user", json={
+            "user_id": user_id,
+            "first_name": "Bench",
+            "last_name": f"User{i}",
+            "budget_min": 4000,
+            "budget_max": 6000,
+            "location_preference": "MONTERREY",
+        })
+        return r.status_code < 300
+
+    async def withdraw(i: int) -> bool:
+        r = await http.post("/funds/withdraw", json=WITHDRAW_BODY)
+        return r.status_code < 300
+
+    async def withdraw_jobs(i: int) -> bool:
+        r = await http.post(
+            "/funds/withdraw/jobs",
+            json=WITHDRAW_BODY,
+            headers={"Idempotency-Key": f"bench-{uuid.uuid4()}"},
+        )
+        return r.status_code < 300
+
+    scenarios: Dict[str, Callable[[int], Any]] = {
+        "clabe": clabe,
+        "signup": signup,
+        "withdraw": withdraw,
+        "withdraw-jobs": withdraw_jobs,
+    }
+    return scenarios[name]
+
+
+def delete_signups(user_ids: List[str], chunk: int = 100) -> None:
+    """Delete the profiles the signup scenario created, and any stored matches that reference them."""
+    from src.api.config import client
+
+    for start in range(0, len(user_ids), chunk):
+        ids = user_ids[start:start + chunk]
+        client.table("matches").delete().in_("user_id", ids).execute()
+        client.table("matches").delete().in_("matched_user_id", ids).execute()
+        client.table("user_profiles").delete().in_("user_id", ids).execute()
+    print(f"Deleted {len(user_ids)} benchmark signups", file=sys.stderr)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    created: List[str] = []
+    try:
+        async with httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout, limits=limits) as http:
+            results = []
+            for name in args.scenario:
+                run = await run_at_rate(build_scenario(name, http, created), args.rate, args.duration, args.max_in_flight)
+                results.append(summarize(
+                    f"payments.{name}",
+                    run["latencies_ms"],
+                    run["errors"],
+                    run["elapsed_s"],
+                    target_rps=args.rate,
+                ))
+    finally:
+        if created:
+            await asyncio.sleep(1)  # let the API's background match maintenance finish first
+            await asyncio.to_thread(delete_signups, created)
+    emit(results, args.output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--api-url", default="http://localhost:8080")
+    parser.add_argument("--scenario", action="append", choices=["clabe", "signup", "withdraw", "withdraw-jobs"])
+    parser.add_argument("--rate", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per scenario")
+    parser.add_argument("--timeout", type=float, default=35.0)
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--output", help="append JSON lines to this file")
+    parser.add_argument("--allow-db-writes", action="store_true",
+                        help="required by the signup scenario, which inserts (then deletes) user profiles")
+    args = parser.parse_args()
+    args.scenario = args.scenario or ["withdraw"]
+    if "signup" in args.scenario and not args.allow_db_writes:
+        parser.error("the signup scenario writes to the API's database; pass --allow-db-writes "
+                     "(and point the API at a test Supabase project)")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
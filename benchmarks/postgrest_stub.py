@@ -0,0 +1,184 @@
+"""
+In-memory stand-in for the Supabase PostgREST endpoint, serving synthetic
+user_profiles and properties (benchmarks/synthetic.py) for end-to-end load tests.
+
+Implements the subset of the PostgREST read API the matchmaking path uses:
+  GET /rest/v1/<table>?select=a,b&col=op.value&order=col.asc&limit=n&offset=n
+with eq / neq / gt / gte / lt / lte / in.(...) / is.null filters, and
+`Prefer: count=exact` (Content-Range). Writes are not supported. RPCs
+(MATCH_SCORING=sql) are not supported either: use python or snapshot scoring.
+
+Run:
+    python -m benchmarks.postgrest_stub --port 8098 --users 20000 --properties 20000 --latency-ms 5
+then point the API at it with SUPABASE_URL=http://localhost:8098. Any non-empty
+SUPABASE_ANON_KEY works, because the stub does not check auth.
+"""
+import argparse
+import asyncio
+import random
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from benchmarks.synthetic import generate_properties, generate_users
+from src.api.core.responses import dumps
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Parse a filter value to the type of the column value it is compared with."""
+    raw = raw.strip('"')
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, (int, float)):
+        return float(raw)
+    if isinstance(sample, str):
+        try:
+            return datetime.fromisoformat(raw) if "T" in raw else raw
+        except ValueError:
+            return raw
+    return raw
+
+
+def _value(row_value: Any, target: Any) -> Any:
+    if isinstance(target, datetime) and isinstance(row_value, str):
+        return datetime.fromisoformat(row_value)
+    return row_value
+
+
+OPS: Dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def parse_filter(column: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    op, _, raw = expression.partition(".")
+    if op == "is":
+        return lambda row: row.get(column) is None if raw == "null" else row.get(column) is not None
+    if op == "in":
+        values = {v.strip('"') for v in raw.strip("()").split(",") if v}
+        return lambda row: row.get(column) is not None and str(row[column]) in values
+    if op not in OPS:
+        raise ValueError(f"unsupported operator {op}")
+    compare = OPS[op]
+    parsed: Dict[type, Any] = {}
+
+    def check(row: Dict[str, Any]) -> bool:
+        value = row.get(column)
+        if value is None:
+            return False  # SQL NULL never passes a comparison
+        key = type(value)
+        if key not in parsed:
+            parsed[key] = _coerce(raw, value)
+        target = parsed[key]
+        return compare(_value(value, target), target)
+
+    return check
+
+
+class Table:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows  # ordered by id
+        self.by_key: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+
+    def candidates(self, column: str, value: str) -> Optional[List[Dict[str, Any]]]:
+        """Hash lookup for eq filters on text columns (built lazily), so point reads don't scan."""
+        if (column, "") not in self.by_key:
+            if not self.rows or not isinstance(self.rows[0].get(column), str):
+                return None
+            self.by_key[(column, "")] = []
+            for row in self.rows:
+                self.by_key.setdefault((column, row.get(column)), []).append(row)
+        return self.by_key.get((column, value), [])
+
+
+def create_app(tables: Dict[str, Table], latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI(title="PostgREST stand-in")
+    app.state.counters = {"requests": 0}
+
+    @app.get("/rest/v1/{table}")
+    async def read(table: str, request: Request):
+        app.state.counters["requests"] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        source = tables.get(table)
+        if source is None:
+            return JSONResponse({"message": f"relation {table} does not exist"}, status_code=404)
+
+        select, order, limit, offset = "*", None, None, 0
+        filters: List[Callable[[Dict[str, Any]], bool]] = []
+        rows: Optional[List[Dict[str, Any]]] = None
+        for key, value in request.query_params.multi_items():
+            if key == "select":
+                select = value
+            elif key == "order":
+                order = value
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif value.startswith("eq.") and rows is None and source.candidates(key, "") is not None:
+                rows = source.candidates(key, value[3:].strip('"'))
+            else:
+                filters.append(parse_filter(key, value))
+
+        rows = [r for r in (source.rows if rows is None else rows) if all(f(r) for f in filters)]
+        if order:
+            column, _, direction = order.partition(".")
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=direction.startswith("desc"))
+        total = len(rows)
+        rows = rows[offset:offset + limit if limit is not None else None]
+        if select.replace(" ", "") != "*":
+            columns = [c.strip() for c in select.split(",")]
+            rows = [{c: r.get(c) for c in columns} for r in rows]
+
+        headers = {}
+        if "count=exact" in request.headers.get("prefer", ""):
+            headers["Content-Range"] = f"{offset}-{offset + len(rows) - 1 if rows else offset}/{total}"
+        return Response(dumps(rows), media_type="application/json", headers=headers)
+
+    @app.get("/_stub/stats")
+    async def stats():
+        return {**app.state.counters, **{name: len(t.rows) for name, t in tables.items()}}
+
+    return app
+
+
+def build_tables(users: int, properties: int, seed: int) -> Dict[str, Table]:
+    profiles = generate_users(users, seed=seed, with_preferences=True)
+    listings = generate_properties(properties, seed=seed)
+    # A few listings have no coordinates, like real data (geo search skips them)
+    rng = random.Random(seed)
+    for p in rng.sample(listings, k=len(listings) // 50):
+        p["latitude"] = p["longitude"] = None
+    tables = {"user_profiles": Table(profiles), "properties": Table(listings)}
+    # Read at startup or on side paths; empty is enough for the matchmaking load
+    for name in ("landlord_profile", "matches", "group_matches", "roomie_groups", "withdrawal_jobs"):
+        tables[name] = Table([])
+    return tables
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--properties", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added delay per request (network + Postgres)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(build_tables(args.users, args.properties, args.seed), args.latency_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
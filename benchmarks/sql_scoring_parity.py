@@ -0,0 +1,73 @@
+"""
+Check that match_scoring.sql returns the same top-k and the same scores as the
+Python formulas in src/api/services/scoring.py, and compare payload sizes.
+
+Example:
+    python -m benchmarks.sql_scoring_parity --user-id <uuid> --top-k 20 --backend sqlalchemy
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from src.api.db.repository import get_repository
+from src.api.db.session import dispose_engine
+from src.api.services.scoring import roommate_score_raw, property_score_raw, round_score
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    repo = get_repository(args.backend)
+    user = await repo.get_user_profile(args.user_id)
+    if not user:
+        raise SystemExit(f"user {args.user_id} not found")
+    budget_min, budget_max = user["budget_min"], user["budget_max"]
+    location = user["location_preference"].strip().upper()
+    tags = set(user.get("lifestyle_tags") or [])
+    now = datetime.utcnow()
+
+    t0 = time.perf_counter()
+    roommates = await repo.find_roommate_candidates(args.user_id, location, budget_min, budget_max)
+    properties = await repo.find_property_candidates(location, budget_min, budget_max, now)
+    py_rm = sorted((round_score(roommate_score_raw(budget_min, budget_max, tags, r)) for r in roommates), reverse=True)[:args.top_k]
+    py_pr = sorted((round_score(property_score_raw(budget_min, budget_max, tags, p)) for p in properties), reverse=True)[:args.top_k]
+    python_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    sql_rm_rows = await repo.top_roommates(args.user_id, location, budget_min, budget_max, sorted(tags), args.top_k)
+    sql_pr_rows = await repo.top_properties(location, budget_min, budget_max, sorted(tags), now, args.top_k)
+    sql_ms = (time.perf_counter() - t0) * 1000
+
+    sql_rm = [round_score(s) for _, s in sql_rm_rows]
+    sql_pr = [round_score(s) for _, s in sql_pr_rows]
+    # Recompute the Python score for every row SQL returned: must be bit-identical
+    exact = all(
+        roommate_score_raw(budget_min, budget_max, tags, row) == score for row, score in sql_rm_rows
+    ) and all(
+        property_score_raw(budget_min, budget_max, tags, row) == score for row, score in sql_pr_rows
+    )
+
+    print(json.dumps({
+        "name": "sql_scoring_parity",
+        "backend": args.backend,
+        "candidates": {"roommates": len(roommates), "properties": len(properties)},
+        "same_top_k_scores": py_rm == sql_rm and py_pr == sql_pr,
+        "raw_scores_identical": exact,
+        "python_path_ms": round(python_ms, 3),
+        "sql_path_ms": round(sql_ms, 3),
+        "python_path_bytes": len(json.dumps(roommates)) + len(json.dumps(properties)),
+        "sql_path_bytes": len(json.dumps([r for r, _ in sql_rm_rows])) + len(json.dumps([r for r, _ in sql_pr_rows])),
+    }))
+    await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--backend", choices=["postgrest", "sqlalchemy"], default="sqlalchemy")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
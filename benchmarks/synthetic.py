@@ -0,0 +1,127 @@
+"""Synthetic user_profiles and properties rows with realistic-ish distributions, for benchmarks only."""
+import random
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+LOCATIONS = ["CDMX", "MONTERREY", "GUADALAJARA", "PUEBLA", "QUERETARO", "MERIDA", "TIJUANA", "LEON"]
+# Population share per location (Zipf-like: a few big cities dominate)
+LOCATION_WEIGHTS = [0.34, 0.18, 0.15, 0.08, 0.08, 0.06, 0.06, 0.05]
+
+LIFESTYLE_TAGS = [
+    "non_smoker", "early_bird", "night_owl", "quiet", "social", "pet_friendly", "gym",
+    "remote_work", "student", "vegetarian", "clean", "music", "gamer", "lgbtq_friendly",
+    "parking", "wifi", "furnished", "balcony", "laundry", "cooking",
+]
+# Popular tags are far more common than niche ones
+TAG_WEIGHTS = [1.0 / (i + 1) ** 0.8 for i in range(len(LIFESTYLE_TAGS))]
+
+# Listing amenities overlap with lifestyle tags on purpose (the property score is a Jaccard between the two)
+AMENITIES = [
+    "wifi", "furnished", "laundry", "parking", "pet_friendly", "gym", "balcony", "air_conditioning",
+    "security", "elevator", "rooftop", "quiet", "cooking", "pool", "lgbtq_friendly",
+]
+AMENITY_WEIGHTS = [1.0 / (i + 1) ** 0.6 for i in range(len(AMENITIES))]
+PROPERTY_TYPES = ["departamento", "casa"]
+
+# City centers (lat, lng); listings scatter ~10 km around them
+CITY_CENTERS = {
+    "CDMX": (19.4326, -99.1332),
+    "MONTERREY": (25.6866, -100.3161),
+    "GUADALAJARA": (20.6597, -103.3496),
+    "PUEBLA": (19.0414, -98.2063),
+    "QUERETARO": (20.5888, -100.3899),
+    "MERIDA": (20.9674, -89.5926),
+    "TIJUANA": (32.5149, -117.0382),
+    "LEON": (21.1250, -101.6860),
+}
+# Rent level relative to the national median
+PRICE_FACTOR = {
+    "CDMX": 1.35, "MONTERREY": 1.2, "GUADALAJARA": 1.1, "PUEBLA": 0.8,
+    "QUERETARO": 0.95, "MERIDA": 0.85, "TIJUANA": 1.0, "LEON": 0.75,
+}
+# Availability dates are drawn relative to this day so runs are reproducible
+BASE_DATE = date(2025, 7, 1)
+
+
+def _weighted_sample(rng: random.Random, items: List[str], weights: List[float], k: int) -> List[str]:
+    chosen = set()
+    while len(chosen) < k:
+        chosen.add(rng.choices(items, weights=weights)[0])
+    return sorted(chosen)
+
+
+def generate_preferences(rng: random.Random) -> Dict[str, Any]:
+    """roomie_preferences: about a third set a move-in window, fewer require pets/parking/amenities."""
+    prefs: Dict[str, Any] = {}
+    if rng.random() < 0.35:
+        start = BASE_DATE + timedelta(days=rng.randint(0, 180))
+        prefs["move_in_range"] = {"start": start.isoformat(), "end": (start + timedelta(days=rng.choice([14, 30, 60]))).isoformat()}
+    if rng.random() < 0.15:
+        prefs["pet_friendly"] = True
+    if rng.random() < 0.10:
+        prefs["parking"] = True
+    if rng.random() < 0.20:
+        prefs["amenities"] = _weighted_sample(rng, AMENITIES[:6], AMENITY_WEIGHTS[:6], 1)
+    if rng.random() < 0.25:
+        prefs["property_type"] = rng.choice(PROPERTY_TYPES)
+    return prefs
+
+
+def generate_user(rng: random.Random, user_pk: int, location: Optional[str] = None, with_preferences: bool = False) -> Dict[str, Any]:
+    # Monthly budgets in MXN: log-normal around ~6k, range width 10-60% of the minimum
+    budget_min = round(min(max(rng.lognormvariate(8.7, 0.35), 2000), 40000), -2)
+    budget_max = round(budget_min * (1 + rng.uniform(0.1, 0.6)), -2)
+    user = {
+        "id": user_pk,
+        "user_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "first_name": "Synthetic",
+        "last_name": f"User{user_pk}",
+        "age": rng.randint(18, 45),
+        "budget_min": float(budget_min),
+        "budget_max": float(budget_max),
+        "location_preference": location or rng.choices(LOCATIONS, weights=LOCATION_WEIGHTS)[0],
+        "lifestyle_tags": _weighted_sample(rng, LIFESTYLE_TAGS, TAG_WEIGHTS, rng.randint(0, 6)),
+    }
+    if with_preferences:
+        # Separate generator so every other field stays identical to runs without preferences
+        user["roomie_preferences"] = generate_preferences(random.Random(user["user_id"]))
+    return user
+
+
+def generate_users(n: int, seed: int = 42, location: Optional[str] = None, with_preferences: bool = False) -> List[Dict[str, Any]]:
+    """n users; pass location to put everyone in the same city."""
+    rng = random.Random(seed)
+    return [generate_user(rng, i + 1, location, with_preferences) for i in range(n)]
+
+
+def generate_property(rng: random.Random, property_pk: int, location: Optional[str] = None) -> Dict[str, Any]:
+    location = location or rng.choices(LOCATIONS, weights=LOCATION_WEIGHTS)[0]
+    lat, lng = CITY_CENTERS.get(location, CITY_CENTERS["CDMX"])
+    num_rooms = rng.choices([1, 2, 3, 4, 5], weights=[0.3, 0.35, 0.2, 0.1, 0.05])[0]
+    # Monthly rent in MXN: log-normal per room, scaled by city; comparable to user budgets
+    price = round(min(max(rng.lognormvariate(8.55, 0.4) * PRICE_FACTOR.get(location, 1.0) * (0.8 + 0.2 * num_rooms), 1500), 90000), -2)
+    # Most listings are available within the next six months; a fifth have an end date
+    available_from = datetime.combine(BASE_DATE, datetime.min.time()) + timedelta(days=rng.randint(-60, 180))
+    available_to = available_from + timedelta(days=rng.randint(90, 365)) if rng.random() < 0.2 else None
+    amenities = _weighted_sample(rng, AMENITIES, AMENITY_WEIGHTS, rng.randint(0, 7))
+    return {
+        "id": property_pk,
+        "owner_user_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "address": f"Calle Sintetica {property_pk}",
+        "location": location,
+        "price": float(price),
+        "latitude": lat + rng.gauss(0, 0.09),
+        "longitude": lng + rng.gauss(0, 0.09),
+        "amenities": amenities,
+        "num_rooms": num_rooms,
+        "bathrooms": max(1, num_rooms - rng.randint(0, 2)),
+        "available_from": available_from.isoformat(),
+        "available_to": available_to.isoformat() if available_to else None,
+    }
+
+
+def generate_properties(n: int, seed: int = 42, location: Optional[str] = None) -> List[Dict[str, Any]]:
+    """n listings; pass location to put all of them in the same city."""
+    rng = random.Random(seed)
+    return [generate_property(rng, i + 1, location) for i in range(n)]
@@ -16,16 +16,107 @@ class Settings(BaseSettings):
     JUNO_API_SECRET: str
     CLOUDFLARE_ACCOUNT_ID: str
     CLOUDFLARE_API_TOKEN: str
+    CLOUDFLARE_AI_BASE_URL: str = "https://api.cloudflare.com/client/v4"  # point at benchmarks/ai_stub.py for load tests
     LLM_MODEL: str
 
+    # Withdrawal job queue
+    WITHDRAW_WORKERS: int = 4
+    WITHDRAW_MAX_ATTEMPTS: int = 5
+    WITHDRAW_BACKOFF_BASE: float = 1.0
+
+    # Read path backend: "postgrest" (Supabase client) or "sqlalchemy" (asyncpg pool on DATABASE_URL)
+    DB_BACKEND: str = "postgrest"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_STATEMENT_CACHE_SIZE: int = 100  # set to 0 behind pgbouncer in transaction mode
+
+    # Where match_top scores candidates: "python" (fetch all, score in-process), "sql" (match_scoring.sql, top-k only)
+    # or "snapshot" (vectorized over the shared candidate snapshot, then only the top-k rows are fetched)
+    MATCH_SCORING: str = "python"
+
+    # Memory-mapped candidate snapshot shared by the workers started with src/serve.py
+    SNAPSHOT_DIR: str = "/dev/shm/roomfi-snapshot"
+    SNAPSHOT_REFRESH_SECONDS: float = 300.0  # launcher rebuilds this often
+    SNAPSHOT_CHECK_SECONDS: float = 5.0  # workers look for a newer generation this often
+
+    # POST /matchmaking/match/batch: most user_ids accepted per request
+    MATCH_BATCH_MAX_USERS: int = 10000
+
+    # Offline columnar export of every user's matches (src/api/services/match_export.py)
+    MATCH_EXPORT_DIR: str = "exports/matches"
+
+    # In-process geospatial index grid cell size
+    GEO_CELL_KM: float = 1.0
+
+    # Incremental maintenance of stored top-k lists (matches table) on listing/profile writes
+    MATCH_INCREMENTAL: bool = True
+    MATCH_STORED_TOP_K: int = 5
+
+    # Read-through cache for profile / landlord / property lookups (src/api/db/cache.py)
+    ENTITY_CACHE_ENABLED: bool = True
+    ENTITY_CACHE_TTL: float = 30.0
+    ENTITY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # LISTEN on Postgres row-change notifications (src/api/db/sql/change_feed.sql) to keep in-process indexes fresh
+    CHANGE_FEED_ENABLED: bool = False
+    # Without the change feed, reload the in-process property indexes when older than this (0 disables)
+    INDEX_REFRESH_SECONDS: float = 60.0
+
+    # Load the in-process indexes and open DB pools in the background at startup (GET /ready reports progress)
+    WARMUP_ON_STARTUP: bool = True
+
+    # Prometheus metrics at GET /metrics (route latency, in-flight requests, upstream calls)
+    METRICS_ENABLED: bool = True
+    # Fraction of Cloudflare AI calls whose prompt and response are logged at INFO (all of them at DEBUG level)
+    AI_LOG_SAMPLE_RATE: float = 0.0
+
+    # Server-Timing response header with per-stage spans (src/api/core/timing.py)
+    SERVER_TIMING_ENABLED: bool = True
+    # On-demand request profiling (profile=true + X-Profile-Token header); disabled while empty
+    PROFILING_TOKEN: str = ""
+    PROFILE_INTERVAL_MS: float = 1.0
+
 settings = Settings()
 
 logger.info("Configuration loaded successfully.")
-logger.info(f"DATABASE_URL: {settings.DATABASE_URL}")
-logger.info(f"SUPABASE_JWT_SECRET: {settings.SUPABASE_JWT_SECRET}")
 
-from supabase import create_client, Client
+
+class LazySupabaseClient:
+    """
+    Stands in for the Supabase client and builds it on first use.
+
+    Importing supabase pulls in httpx, gotrue, realtime and storage clients; deferring
+    that (and the client construction) keeps module import cheap for workers, scripts
+    and benchmarks that never touch PostgREST. Attribute access is forwarded, so call
+    sites keep using `client.table(...)`.
+    """
+
+    def __init__(self, url: str, key: str) -> None:
+        self._url = url
+        self._key = key
+        self._client = None
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def get(self):
+        if self._client is None:
+            from supabase import ClientOptions, create_client
+            from src.api.core.metrics import supabase_http_client
+            # Own HTTP client so every PostgREST call is timed per table (GET /metrics)
+            self._client = create_client(self._url, self._key, options=ClientOptions(httpx_client=supabase_http_client()))
+            logger.info("Supabase client created.")
+        return self._client
+
+    def reset(self) -> None:
+        """Drop the client (and its connections); the next use builds a new one, e.g. in a forked worker."""
+        self._client = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
 
 SUPABASE_URL = settings.SUPABASE_URL
 SUPABASE_KEY = settings.SUPABASE_ANON_KEY
-client = create_client(SUPABASE_URL, SUPABASE_KEY)
+client = LazySupabaseClient(SUPABASE_URL, SUPABASE_KEY)
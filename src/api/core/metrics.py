@@ -0,0 +1,185 @@
+"""
+Prometheus metrics: per-route latency and in-flight requests, plus upstream calls.
+
+MetricsMiddleware labels every request with the endpoint that served it
+(`matchmaking.match_top`, not the raw path, which contains ids), so label cardinality
+stays bounded. The endpoint is only known once routing has run, so the in-flight
+gauge is per method. Upstream calls are timed by httpx transports that wrap the real
+ones, one per dependency:
+
+    supabase     target = table or rpc/<function>
+    juno         target = path, with ids replaced by {id}
+    cloudflare   target = model
+
+and labeled with an outcome (`ok`, `4xx`, `5xx`, `error`). Durations stop when the
+response headers arrive, and body download is not included.
+
+Under src/serve.py every worker writes its samples to PROMETHEUS_MULTIPROC_DIR, and
+GET /metrics aggregates them, so any worker can answer a scrape for the whole process
+group.
+"""
+import os
+import re
+import time
+from typing import Callable, Optional
+
+import httpx
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, REGISTRY, generate_latest
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by endpoint",
+    ["method", "route", "status"],
+    buckets=BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Latency of calls to external dependencies",
+    ["dependency", "target", "outcome"],
+    buckets=BUCKETS,
+)
+
+
+# ---------- Routes ----------
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, works with streaming responses)."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    @staticmethod
+    def _route(scope) -> str:
+        # Routing stores the endpoint in the (shared) scope; stable across Starlette/FastAPI versions
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        return f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__name__}"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = "500"
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_LATENCY.labels(method, self._route(scope), status).observe(time.perf_counter() - start)
+
+
+def render() -> tuple:
+    """Exposition body and content type; aggregates all workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+# ---------- Upstream dependencies ----------
+_ID_SEGMENT = re.compile(r"^(?!v\d+$).*\d")
+
+
+def supabase_target(request: httpx.Request) -> str:
+    path = request.url.path
+    _, _, rest = path.partition("/rest/v1/")
+    return rest or path
+
+
+def juno_target(request: httpx.Request) -> str:
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in request.url.path.split("/"))
+
+
+def cloudflare_target(request: httpx.Request) -> str:
+    _, _, model = request.url.path.partition("/ai/run/")
+    return model or request.url.path
+
+
+def _outcome(status_code: Optional[int]) -> str:
+    if status_code is None:
+        return "error"
+    if status_code >= 500:
+        return "5xx"
+    if status_code >= 400:
+        return "4xx"
+    return "ok"
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    def __init__(self, dependency: str, target: Callable[[httpx.Request], str], inner: httpx.BaseTransport) -> None:
+        self.dependency = dependency
+        self.target = target
+        self.inner = inner
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        status_code = None
+        start = time.perf_counter()
+        try:
+            response = self.inner.handle_request(request)
+            status_code = response.status_code
+            return response
+        finally:
+            UPSTREAM_LATENCY.labels(self.dependency, self.target(request), _outcome(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, dependency: str, target: Callable[[httpx.Request], str], inner: httpx.AsyncBaseTransport) -> None:
+        self.dependency = dependency
+        self.target = target
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        status_code = None
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+            status_code = response.status_code
+            return response
+        finally:
+            UPSTREAM_LATENCY.labels(self.dependency, self.target(request), _outcome(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def juno_transport() -> httpx.AsyncBaseTransport:
+    return InstrumentedAsyncTransport("juno", juno_target, httpx.AsyncHTTPTransport())
+
+
+def cloudflare_transport() -> httpx.AsyncBaseTransport:
+    return InstrumentedAsyncTransport("cloudflare", cloudflare_target, httpx.AsyncHTTPTransport())
+
+
+def supabase_http_client(timeout: float = 120.0) -> httpx.Client:
+    """HTTP client for the Supabase (PostgREST) client, same defaults as postgrest-py's own."""
+    transport = InstrumentedTransport("supabase", supabase_target, httpx.HTTPTransport(http2=True))
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True)
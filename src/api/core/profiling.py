@@ -0,0 +1,108 @@
+"""
+On-demand sampling profiler for single requests (`profile=true` on /matchmaking/match/top).
+
+A background thread snapshots the stacks of the threads running application code
+every PROFILE_INTERVAL_MS. Those are the event loop thread and any to_thread
+workers that are inside src/. The samples are returned in collapsed-stack format
+("frame;frame;frame" -> count), which flamegraph.pl, speedscope and inferno read
+directly. Overhead exists only while a profile runs, and only one profile runs at a
+time. Samples cover the whole process, so concurrent requests on the same worker
+show up as well.
+
+Profiling is off unless PROFILING_TOKEN is set, and the caller must send it in the
+X-Profile-Token header.
+"""
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException
+
+from src.api.config import settings
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MAX_SECONDS = 30.0
+
+_running = threading.Lock()
+
+
+def authorize(token: Optional[str]) -> None:
+    """Raise 403 unless profiling is enabled and the token matches."""
+    expected = settings.PROFILING_TOKEN
+    if not expected or not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Profiling is not enabled for this caller")
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(SRC_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(SRC_DIR))
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: Optional[float] = None) -> None:
+        self.interval = (interval_ms or settings.PROFILE_INTERVAL_MS) / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._target = threading.get_ident()  # the event loop thread serving the request
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+        self._elapsed = 0.0
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            in_app = ident == self._target
+            while frame is not None:
+                stack.append(_label(frame))
+                in_app = in_app or frame.f_code.co_filename.startswith(SRC_DIR)
+                frame = frame.f_back
+            if in_app:
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        deadline = time.perf_counter() + MAX_SECONDS
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            self._sample()
+
+    def start(self) -> bool:
+        """False if another profile is already running (the request then runs unprofiled)."""
+        if not _running.acquire(blocking=False):
+            return False
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._elapsed = time.perf_counter() - self._started
+        _running.release()
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "format": "collapsed",
+            "interval_ms": self.interval * 1000,
+            "duration_ms": round(self._elapsed * 1000, 2),
+            "samples": self.samples,
+            "stacks": dict(self.stacks.most_common()),
+        }
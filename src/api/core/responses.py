@@ -0,0 +1,52 @@
+"""
+Response helpers for the hot JSON paths.
+
+FastJSONResponse renders with orjson, which is several times faster than the
+stdlib encoder on the row lists we return. Set as the app's default response
+class, it changes only the encoder: FastAPI still runs jsonable_encoder on plain
+return values first. Routes that return large payloads (match_top, group_match,
+paginated listings) return a FastJSONResponse directly to skip that pass as well.
+Their content must already be JSON-ready: dicts, lists, str, numbers, None,
+datetime/UUID (orjson handles these natively), plus the few extra types handled
+in _default.
+
+passthrough() forwards an upstream httpx response (Juno) as raw bytes when the
+body needs no transformation, instead of parsing it and encoding it again.
+"""
+from decimal import Decimal
+from typing import Any
+
+import httpx
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def passthrough(response: httpx.Response) -> Response:
+    """Relay an upstream response body unchanged (status code and content type preserved)."""
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", "application/json"),
+    )
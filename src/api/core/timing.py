@@ -0,0 +1,80 @@
+"""
+Per-request timing spans, returned in a `Server-Timing` response header.
+
+    with span("roommates.fetch"):
+        roommates = await repository.find_roommate_candidates(...)
+
+ServerTimingMiddleware starts a collector for each request in a context variable,
+and writes the collected spans plus `total` into the header when the response
+starts. Browsers show the header in the network panel, and it can be read with
+`curl -si`. Outside a request, span() does nothing. Work pushed to threads with
+asyncio.to_thread copies the context, so spans recorded there are collected too.
+Spans with the same name are summed (`dur`) and counted (`desc`).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+_current: ContextVar[Optional["Timings"]] = ContextVar("server_timing", default=None)
+
+
+class Timings:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}  # name -> [total ms, count]
+
+    def add(self, name: str, duration_ms: float) -> None:
+        entry = self.spans.setdefault(name, [0.0, 0])
+        entry[0] += duration_ms
+        entry[1] += 1
+
+    def header(self) -> str:
+        parts = [
+            f"{name};dur={total:.2f}" + (f';desc="x{count}"' if count > 1 else "")
+            for name, (total, count) in self.spans.items()
+        ]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(parts)
+
+
+def current() -> Optional[Timings]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - start) * 1000)
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware: collects spans for the request and adds the Server-Timing header."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = _current.set(timings)
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and timings.spans:
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timings.header().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,136 @@
+"""
+Read-through entity cache for single-row lookups (profiles, landlords, properties).
+
+  - keyed by (table, id); values are the row dicts the repository returns
+  - bounded by an approximate byte budget (serialized JSON size), LRU eviction
+  - entries expire after a TTL; writes go through put() / invalidate()
+  - concurrent misses for the same key share one load (single flight)
+
+Callers get a shallow copy of the cached row, so request handlers may update the
+top-level fields of what they receive (match_top does) without touching the cache.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.api.config import settings
+
+logger = logging.getLogger(__name__)
+
+Key = Tuple[str, str]
+
+
+class EntityCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 30.0) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Key, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Key, asyncio.Future] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(table: str, entity_id: Any) -> Key:
+        return table, str(entity_id)
+
+    # ---------- Reads ----------
+    def get(self, table: str, entity_id: Any) -> Optional[Dict[str, Any]]:
+        key = self._key(table, entity_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return dict(value)
+
+    async def get_or_load(
+        self, table: str, entity_id: Any, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]
+    ) -> Optional[Dict[str, Any]]:
+        value = self.get(table, entity_id)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        key = self._key(table, entity_id)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            value = await asyncio.shield(pending)
+            return dict(value) if value is not None else None
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        else:
+            future.set_result(value)
+            # An invalidate() during the load removes the in-flight entry: don't cache a stale row
+            if value is not None and self._inflight.get(key) is future:
+                self._store(key, value)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        return dict(value) if value is not None else None
+
+    # ---------- Writes ----------
+    def put(self, table: str, entity_id: Any, value: Dict[str, Any]) -> None:
+        """Write-through after a successful insert/update."""
+        key = self._key(table, entity_id)
+        self._inflight.pop(key, None)
+        self._store(key, value)
+
+    def invalidate(self, table: str, entity_id: Any) -> None:
+        key = self._key(table, entity_id)
+        self._inflight.pop(key, None)
+        self._drop(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._inflight.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+    # ---------- Internal helpers ----------
+    def _store(self, key: Key, value: Dict[str, Any]) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, dict(value))
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.bytes -= evicted_size
+
+    def _drop(self, key: Key) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+
+# Create global instance
+entity_cache = EntityCache(max_bytes=settings.ENTITY_CACHE_MAX_BYTES, ttl_seconds=settings.ENTITY_CACHE_TTL)
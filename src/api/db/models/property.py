@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Float, JSON, TIMESTAMP, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from src.api.db.models.base import Base
 
 class Property(Base):
     __tablename__ = "properties"
+    __table_args__ = (UniqueConstraint("owner_user_id", "address", name="properties_owner_address_key"),)
 
     id = Column(Integer, primary_key=True, index=True)
     owner_user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
@@ -12,6 +13,8 @@ class Property(Base):
     address = Column(String, nullable=True)
     location = Column(String, nullable=True)
     price = Column(Float, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
 
     amenities = Column(JSON, nullable=True)
     num_rooms = Column(Integer, nullable=True)
@@ -6,7 +6,7 @@ class UserProfile(Base):
     __tablename__ = "user_profiles"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, unique=True, index=True)
 
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
@@ -23,6 +23,10 @@ class UserProfile(Base):
     lifestyle_tags = Column(JSON, nullable=True)
     roomie_preferences = Column(JSON, nullable=True)
 
+    # Set when AI-extracted preferences are persisted (see services/preference_store.py)
+    ai_prompt_fingerprint = Column(String, nullable=True)
+    ai_preferences_updated_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
     bio = Column(Text, nullable=True)
     profile_image_url = Column(String, nullable=True)
 
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Numeric, Text, JSON, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID
+from src.api.db.models.base import Base
+
+class WithdrawalJob(Base):
+    __tablename__ = "withdrawal_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
+    idempotency_key = Column(String, nullable=False, unique=True, index=True)
+
+    address = Column(String, nullable=False)
+    amount = Column(Numeric, nullable=False)
+    asset = Column(String, nullable=False)
+    blockchain = Column(String, nullable=False)
+
+    status = Column(String, nullable=False, default="queued")  # queued, submitting, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    juno_response = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    updated_at = Column(TIMESTAMP(timezone=True), onupdate=func.now())
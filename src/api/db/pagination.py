@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination for PostgREST list endpoints.
+
+Pages are ordered by `id` and continue with `id > last_id`, so every page is an
+index range scan no matter how deep the client goes (OFFSET would re-read and
+discard all earlier rows). The cursor is an opaque urlsafe-base64 token; clients
+pass back `next_cursor` until it is null.
+
+    page = keyset_page("properties", lambda q: q.eq("owner_user_id", user_id),
+                       columns="id, price", limit=50, cursor=cursor)
+    # {"items": [...], "next_cursor": "eyJpZCI6IDUwfQ" | None, "total": 1234 | None}
+"""
+import base64
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.api.config import client
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raises ValueError on anything that is not a cursor we issued."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def select_columns(fields: Optional[str], allowed: Iterable[str]) -> str:
+    """
+    Validate a comma-separated column list against `allowed` and return a select
+    string; `id` is always included because the next cursor is built from it.
+    None or empty means all columns. Raises ValueError on unknown names.
+    """
+    if not fields:
+        return "*"
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}")
+    columns = ["id"] + [c for c in dict.fromkeys(requested) if c != "id"]
+    return ", ".join(columns)
+
+
+def keyset_page(
+    table: str,
+    apply_filters: Callable[[Any], Any] = lambda query: query,
+    columns: str = "*",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+) -> Dict[str, Any]:
+    """
+    One page of `table` after `cursor`. Fetches limit + 1 rows to learn whether a
+    next page exists without a second round trip. The total (optional, one extra
+    count query) covers every row matching the filters, not just the remaining ones.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+
+    query = apply_filters(client.table(table).select(columns))
+    if after is not None:
+        query = query.gt("id", after)
+    rows = query.order("id").limit(limit + 1).execute().data or []
+
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    total = None
+    if include_total:
+        total = apply_filters(client.table(table).select("id", count="exact")).limit(1).execute().count
+
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(items[-1]["id"]) if has_more else None,
+        "total": total,
+    }
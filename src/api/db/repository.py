@@ -0,0 +1,372 @@
+"""
+Read repository for the hot paths (matchmaking and profile GETs).
+
+Two interchangeable backends selected by settings.DB_BACKEND:
+  - "postgrest": Supabase client over HTTP (default, previous behaviour)
+  - "sqlalchemy": async SQLAlchemy engine with a pooled asyncpg connection
+
+Both return rows as plain dicts shaped like PostgREST JSON (UUIDs and timestamps
+as strings), so callers do not care which backend produced them. With
+ENTITY_CACHE_ENABLED the chosen backend is wrapped in CachedRepository.
+"""
+import asyncio
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+
+from src.api.config import settings, client
+from src.api.db.cache import entity_cache
+from src.api.db.session import get_engine
+
+ID_CHUNK = 500
+POOL_PAGE = 1000  # keyset page size for whole-pool reads (PostgREST caps rows per response)
+JSON_COLUMNS = ("lifestyle_tags", "roomie_preferences", "amenities", "preferred_tenants")
+
+
+class PostgrestRepository:
+    # The Supabase client is blocking: every call runs in a worker thread (like services/withdrawals.py)
+    # so a PostgREST round trip never holds up the event loop
+    async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("user_profiles").select("*").eq("user_id", user_id).limit(1).execute()
+        )
+        return response.data[0] if response.data else None
+
+    async def get_landlord_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("landlord_profile").select("*").eq("user_id", user_id).limit(1).execute()
+        )
+        return response.data[0] if response.data else None
+
+    async def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("properties").select("*").eq("id", property_id).limit(1).execute()
+        )
+        return response.data[0] if response.data else None
+
+    async def find_roommate_candidates(self, user_id: str, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("user_profiles")
+            .select("*")
+            .neq("user_id", user_id)
+            .eq("location_preference", location)
+            .gte("budget_max", budget_min)
+            .lte("budget_min", budget_max)
+            .execute()
+        )
+        return response.data or []
+
+    async def get_user_profiles_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("user_profiles").select("*").in_("id", ids).execute()
+        )
+        return response.data or []
+
+    @staticmethod
+    def _pages(build) -> List[Dict[str, Any]]:
+        """All pages of build(), keyset-paginated on id; blocking, run it with asyncio.to_thread."""
+        rows: List[Dict[str, Any]] = []
+        last_id = 0
+        while True:
+            page = build().gt("id", last_id).order("id").limit(POOL_PAGE).execute().data or []
+            rows.extend(page)
+            if len(page) < POOL_PAGE:
+                return rows
+            last_id = page[-1]["id"]
+
+    async def find_roommate_pool(self, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        """Every profile in `location` overlapping [budget_min, budget_max], ordered by id (batch matching)."""
+        return await asyncio.to_thread(self._pages, lambda: client.table("user_profiles")
+                                       .select("*")
+                                       .eq("location_preference", location)
+                                       .gte("budget_max", budget_min)
+                                       .lte("budget_min", budget_max))
+
+    async def find_property_pool(self, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        """Every listing in `location` priced within [budget_min, budget_max], ordered by id (batch matching)."""
+        return await asyncio.to_thread(self._pages, lambda: client.table("properties")
+                                       .select("*")
+                                       .eq("location", location)
+                                       .gte("price", budget_min)
+                                       .lte("price", budget_max))
+
+    async def get_user_profiles_by_user_ids(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("user_profiles").select("*").in_("user_id", user_ids).execute()
+        )
+        return response.data or []
+
+    async def get_properties_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("properties").select("*").in_("id", ids).execute()
+        )
+        return response.data or []
+
+    async def get_group(self, group_id: int) -> Optional[Dict[str, Any]]:
+        response = await asyncio.to_thread(
+            lambda: client.table("roomie_groups").select("*").eq("id", group_id).limit(1).execute()
+        )
+        return response.data[0] if response.data else None
+
+    async def find_property_candidates(self, location: Optional[str], budget_min: float, budget_max: float, available_before: Optional[datetime], min_rooms: Optional[int] = None, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        def build():
+            query = client.table("properties") \
+                .select("*") \
+                .gte("price", budget_min) \
+                .lte("price", budget_max)
+            if available_before is not None:
+                query = query.lte("available_from", available_before.isoformat())
+            if location is not None:
+                query = query.eq("location", location)
+            if min_rooms:
+                query = query.gte("num_rooms", min_rooms)
+            return query
+
+        def fetch() -> List[Dict[str, Any]]:
+            if ids is None:
+                return build().execute().data or []
+            if len(ids) > ID_CHUNK and location is not None:
+                # Large id sets (broad hard filters): one query for the location, filtered here,
+                # instead of len(ids) / ID_CHUNK sequential round trips
+                wanted = set(ids)
+                return [row for row in build().execute().data or [] if row["id"] in wanted]
+            # Chunk id lists so the in.(...) filter stays within URL length limits
+            rows: List[Dict[str, Any]] = []
+            for start in range(0, len(ids), ID_CHUNK):
+                rows.extend(build().in_("id", ids[start:start + ID_CHUNK]).execute().data or [])
+            return rows
+
+        return await asyncio.to_thread(fetch)
+
+    async def top_roommates(self, user_id: str, location: str, budget_min: float, budget_max: float, lifestyle_tags: List[str], top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+        response = await asyncio.to_thread(
+            lambda: client.rpc("match_top_roommates", {
+                "p_user_id": user_id,
+                "p_location": location,
+                "p_budget_min": budget_min,
+                "p_budget_max": budget_max,
+                "p_tags": lifestyle_tags,
+                "p_top_k": top_k,
+            }).execute()
+        )
+        return [(r["profile"], r["score"]) for r in response.data or []]
+
+    async def top_properties(self, location: str, budget_min: float, budget_max: float, lifestyle_tags: List[str], available_before: datetime, top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+        response = await asyncio.to_thread(
+            lambda: client.rpc("match_top_properties", {
+                "p_location": location,
+                "p_budget_min": budget_min,
+                "p_budget_max": budget_max,
+                "p_tags": lifestyle_tags,
+                "p_available_before": available_before.isoformat(),
+                "p_top_k": top_k,
+            }).execute()
+        )
+        return [(r["property"], r["score"]) for r in response.data or []]
+
+
+class SqlAlchemyRepository:
+    # Fixed statement text so asyncpg's per-connection prepared statement cache is hit
+    GET_USER = text("SELECT * FROM user_profiles WHERE user_id = CAST(:user_id AS uuid) LIMIT 1")
+    GET_LANDLORD = text("SELECT * FROM landlord_profile WHERE user_id = CAST(:user_id AS uuid) LIMIT 1")
+    GET_PROPERTY = text("SELECT * FROM properties WHERE id = :property_id LIMIT 1")
+    ROOMMATE_CANDIDATES = text(
+        "SELECT * FROM user_profiles "
+        "WHERE user_id <> CAST(:user_id AS uuid) "
+        "AND location_preference = :location "
+        "AND budget_max >= :budget_min "
+        "AND budget_min <= :budget_max"
+    )
+    PROPERTY_CANDIDATES = text(
+        "SELECT * FROM properties "
+        "WHERE (CAST(:location AS text) IS NULL OR location = :location) "
+        "AND price >= :budget_min "
+        "AND price <= :budget_max "
+        "AND (CAST(:available_before AS timestamp) IS NULL OR available_from <= :available_before) "
+        "AND (CAST(:min_rooms AS integer) IS NULL OR num_rooms >= :min_rooms) "
+        "AND (CAST(:ids AS integer[]) IS NULL OR id = ANY(:ids))"
+    )
+    ROOMMATE_POOL = text(
+        "SELECT * FROM user_profiles "
+        "WHERE location_preference = :location "
+        "AND budget_max >= :budget_min "
+        "AND budget_min <= :budget_max "
+        "ORDER BY id"
+    )
+    PROPERTY_POOL = text(
+        "SELECT * FROM properties "
+        "WHERE location = :location "
+        "AND price >= :budget_min "
+        "AND price <= :budget_max "
+        "ORDER BY id"
+    )
+    USER_PROFILES_BY_IDS = text("SELECT * FROM user_profiles WHERE id = ANY(:ids)")
+    USER_PROFILES_BY_USER_IDS = text("SELECT * FROM user_profiles WHERE user_id = ANY(CAST(:user_ids AS uuid[]))")
+    PROPERTIES_BY_IDS = text("SELECT * FROM properties WHERE id = ANY(:ids)")
+    GET_GROUP = text("SELECT * FROM roomie_groups WHERE id = :group_id LIMIT 1")
+    TOP_ROOMMATES = text(
+        "SELECT profile, score FROM match_top_roommates("
+        "CAST(:user_id AS uuid), :location, :budget_min, :budget_max, CAST(:tags AS jsonb), :top_k)"
+    )
+    TOP_PROPERTIES = text(
+        "SELECT property, score FROM match_top_properties("
+        ":location, :budget_min, :budget_max, CAST(:tags AS jsonb), :available_before, :top_k)"
+    )
+
+    @staticmethod
+    def _to_row(mapping) -> Dict[str, Any]:
+        row: Dict[str, Any] = {}
+        for key, value in mapping.items():
+            if isinstance(value, UUID):
+                value = str(value)
+            elif isinstance(value, (datetime, date)):
+                value = value.isoformat()
+            elif isinstance(value, Decimal):
+                value = float(value)
+            elif key in JSON_COLUMNS and isinstance(value, str):
+                value = json.loads(value)
+            row[key] = value
+        return row
+
+    async def _fetch_all(self, statement, **params) -> List[Dict[str, Any]]:
+        async with get_engine().connect() as conn:
+            result = await conn.execute(statement, params)
+            return [self._to_row(m) for m in result.mappings()]
+
+    async def _fetch_one(self, statement, **params) -> Optional[Dict[str, Any]]:
+        rows = await self._fetch_all(statement, **params)
+        return rows[0] if rows else None
+
+    async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(self.GET_USER, user_id=user_id)
+
+    async def get_landlord_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(self.GET_LANDLORD, user_id=user_id)
+
+    async def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(self.GET_PROPERTY, property_id=int(property_id))
+
+    async def find_roommate_candidates(self, user_id: str, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        return await self._fetch_all(
+            self.ROOMMATE_CANDIDATES,
+            user_id=user_id, location=location, budget_min=budget_min, budget_max=budget_max,
+        )
+
+    async def get_user_profiles_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        return await self._fetch_all(self.USER_PROFILES_BY_IDS, ids=list(ids))
+
+    async def find_roommate_pool(self, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        return await self._fetch_all(self.ROOMMATE_POOL, location=location, budget_min=budget_min, budget_max=budget_max)
+
+    async def find_property_pool(self, location: str, budget_min: float, budget_max: float) -> List[Dict[str, Any]]:
+        return await self._fetch_all(self.PROPERTY_POOL, location=location, budget_min=budget_min, budget_max=budget_max)
+
+    async def get_user_profiles_by_user_ids(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self._fetch_all(self.USER_PROFILES_BY_USER_IDS, user_ids=list(user_ids))
+
+    async def get_properties_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        return await self._fetch_all(self.PROPERTIES_BY_IDS, ids=[int(i) for i in ids])
+
+    async def get_group(self, group_id: int) -> Optional[Dict[str, Any]]:
+        return await self._fetch_one(self.GET_GROUP, group_id=int(group_id))
+
+    async def find_property_candidates(self, location: Optional[str], budget_min: float, budget_max: float, available_before: Optional[datetime], min_rooms: Optional[int] = None, ids: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        if ids is not None and not ids:
+            return []
+        return await self._fetch_all(
+            self.PROPERTY_CANDIDATES,
+            location=location, budget_min=budget_min, budget_max=budget_max, available_before=available_before,
+            min_rooms=min_rooms, ids=ids,
+        )
+
+    async def _fetch_scored(self, statement, column: str, **params) -> List[Tuple[Dict[str, Any], float]]:
+        async with get_engine().connect() as conn:
+            result = await conn.execute(statement, params)
+            return [
+                (json.loads(m[column]) if isinstance(m[column], str) else m[column], m["score"])
+                for m in result.mappings()
+            ]
+
+    async def top_roommates(self, user_id: str, location: str, budget_min: float, budget_max: float, lifestyle_tags: List[str], top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+        return await self._fetch_scored(
+            self.TOP_ROOMMATES, "profile",
+            user_id=user_id, location=location, budget_min=float(budget_min), budget_max=float(budget_max),
+            tags=json.dumps(lifestyle_tags), top_k=top_k,
+        )
+
+    async def top_properties(self, location: str, budget_min: float, budget_max: float, lifestyle_tags: List[str], available_before: datetime, top_k: int) -> List[Tuple[Dict[str, Any], float]]:
+        return await self._fetch_scored(
+            self.TOP_PROPERTIES, "property",
+            location=location, budget_min=float(budget_min), budget_max=float(budget_max),
+            tags=json.dumps(lifestyle_tags), available_before=available_before, top_k=top_k,
+        )
+
+
+class CachedRepository:
+    """
+    Read-through entity cache (src/api/db/cache.py) in front of a backend for the
+    single-row lookups and their batch variants; everything else is delegated.
+    """
+
+    def __init__(self, inner, cache) -> None:
+        self.inner = inner
+        self.cache = cache
+
+    def __getattr__(self, name: str):
+        return getattr(self.inner, name)
+
+    async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.cache.get_or_load("user_profiles", user_id, lambda: self.inner.get_user_profile(user_id))
+
+    async def get_landlord_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.cache.get_or_load("landlord_profile", user_id, lambda: self.inner.get_landlord_profile(user_id))
+
+    async def get_property(self, property_id: int) -> Optional[Dict[str, Any]]:
+        return await self.cache.get_or_load("properties", property_id, lambda: self.inner.get_property(property_id))
+
+    async def get_user_profiles_by_user_ids(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self._batch("user_profiles", "user_id", user_ids, self.inner.get_user_profiles_by_user_ids)
+
+    async def get_properties_by_ids(self, ids: List[int]) -> List[Dict[str, Any]]:
+        return await self._batch("properties", "id", ids, self.inner.get_properties_by_ids)
+
+    async def _batch(self, table: str, key_column: str, ids: List[Any], fetch) -> List[Dict[str, Any]]:
+        """Serve what the cache has, fetch the rest in one query and cache it."""
+        rows: List[Dict[str, Any]] = []
+        misses: List[Any] = []
+        for entity_id in ids:
+            row = self.cache.get(table, entity_id)
+            if row is None:
+                misses.append(entity_id)
+            else:
+                rows.append(row)
+        if misses:
+            fetched = await fetch(misses)
+            for row in fetched:
+                self.cache.put(table, row[key_column], row)
+            rows.extend(fetched)
+        return rows
+
+
+_BACKENDS = {
+    "postgrest": PostgrestRepository,
+    "sqlalchemy": SqlAlchemyRepository,
+}
+_repositories: Dict[str, Any] = {}
+
+
+def get_repository(backend: Optional[str] = None):
+    """Return the repository for `backend` (defaults to settings.DB_BACKEND)."""
+    name = (backend or settings.DB_BACKEND).lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND '{name}', expected one of {sorted(_BACKENDS)}")
+    if name not in _repositories:
+        repository = _BACKENDS[name]()
+        if settings.ENTITY_CACHE_ENABLED:
+            repository = CachedRepository(repository, entity_cache)
+        _repositories[name] = repository
+    return _repositories[name]
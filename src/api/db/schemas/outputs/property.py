@@ -21,4 +21,8 @@ class PropertyOut(BaseModel):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PropertyBatchOut(BaseModel):
+    items: Dict[int, PropertyOut]  # keyed by property id
+    missing: List[int]
@@ -25,3 +25,8 @@ class UserProfileOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class UserProfileBatchOut(BaseModel):
+    items: Dict[str, UserProfileOut]  # keyed by user_id
+    missing: List[UUID]
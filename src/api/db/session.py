@@ -0,0 +1,32 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from src.api.config import settings
+
+_engine: Optional[AsyncEngine] = None
+
+
+def get_engine() -> AsyncEngine:
+    """
+    Lazily create the shared async engine on settings.DATABASE_URL (postgresql+asyncpg://...).
+    asyncpg keeps a per-connection prepared statement cache, so the fixed SQL strings
+    used by the repository are parsed/planned once per pooled connection and reused.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(
+            settings.DATABASE_URL,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_pre_ping=True,
+            connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        )
+    return _engine
+
+
+async def dispose_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
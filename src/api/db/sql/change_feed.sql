@@ -0,0 +1,59 @@
+-- Row change notifications for in-process caches and indexes.
+--
+-- Every INSERT / UPDATE / DELETE on user_profiles, properties and landlord_profile
+-- sends a pg_notify on channel 'roomfi_changes' with a small JSON payload:
+--
+--   {"table": "properties", "op": "UPDATE", "id": 42, "row": {"location": ..., ...}}
+--
+-- "row" only carries the columns named in the trigger arguments (the ones the
+-- in-process indexes need), so payloads stay far below the 8000 byte NOTIFY limit.
+-- For DELETE it holds the old values. Consumed by src/api/services/change_feed.py.
+--
+-- Apply once in the Supabase SQL editor (or psql). Safe to re-run.
+
+CREATE OR REPLACE FUNCTION public.roomfi_notify_change()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    rec  jsonb;
+    cols jsonb := '{}'::jsonb;
+    col  text;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := to_jsonb(OLD);
+    ELSE
+        rec := to_jsonb(NEW);
+    END IF;
+
+    FOREACH col IN ARRAY TG_ARGV LOOP
+        cols := cols || jsonb_build_object(col, rec -> col);
+    END LOOP;
+
+    PERFORM pg_notify('roomfi_changes', jsonb_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'id', rec -> 'id',
+        'row', cols
+    )::text);
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS roomfi_user_profiles_changed ON public.user_profiles;
+CREATE TRIGGER roomfi_user_profiles_changed
+AFTER INSERT OR UPDATE OR DELETE ON public.user_profiles
+FOR EACH ROW EXECUTE FUNCTION public.roomfi_notify_change(
+    'user_id', 'location_preference', 'budget_min', 'budget_max', 'lifestyle_tags', 'roomie_preferences'
+);
+
+DROP TRIGGER IF EXISTS roomfi_properties_changed ON public.properties;
+CREATE TRIGGER roomfi_properties_changed
+AFTER INSERT OR UPDATE OR DELETE ON public.properties
+FOR EACH ROW EXECUTE FUNCTION public.roomfi_notify_change(
+    'owner_user_id', 'location', 'price', 'latitude', 'longitude', 'available_from', 'available_to', 'amenities'
+);
+
+DROP TRIGGER IF EXISTS roomfi_landlord_profile_changed ON public.landlord_profile;
+CREATE TRIGGER roomfi_landlord_profile_changed
+AFTER INSERT OR UPDATE OR DELETE ON public.landlord_profile
+FOR EACH ROW EXECUTE FUNCTION public.roomfi_notify_change('user_id');
@@ -0,0 +1,37 @@
+-- A group's open suggestions (group_matches rows with status 'suggested'), replaced atomically.
+--
+-- src/api/services/group_matching.py swaps a group's suggestions for each new
+-- ranking. Done as a delete and an insert from the client, a failure in between
+-- leaves the group with no suggestions, and two runs for the same group can both
+-- insert. This function does both in one transaction under a per-group advisory
+-- lock, so concurrent runs serialize and the last one wins.
+--
+-- Apply once in the Supabase SQL editor (or psql). Fails if duplicate open
+-- suggestions already exist; find them first with the SELECT below.
+
+-- SELECT group_id, property_id, count(*) FROM group_matches WHERE status = 'suggested' GROUP BY 1, 2 HAVING count(*) > 1;
+
+-- At most one open suggestion per group and property
+CREATE UNIQUE INDEX IF NOT EXISTS group_matches_suggested_key
+    ON public.group_matches (group_id, property_id)
+    WHERE status = 'suggested';
+
+-- p_entries: [{"property_id": int, "match_score": float}], best first
+CREATE OR REPLACE FUNCTION public.replace_group_suggestions(p_group_id integer, p_entries jsonb)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtextextended('group_matches:' || p_group_id::text, 0));
+
+    DELETE FROM public.group_matches
+    WHERE group_id = p_group_id AND status = 'suggested';
+
+    INSERT INTO public.group_matches (group_id, property_id, match_score, status)
+    SELECT p_group_id, (x->>'property_id')::integer, (x->>'match_score')::float8, 'suggested'
+    FROM jsonb_array_elements(p_entries) AS x;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END
+$$;
@@ -0,0 +1,119 @@
+-- Stored top-k match lists (matches table), patched atomically.
+--
+-- src/api/services/match_maintenance.py offers each new listing or profile to the
+-- lists of the users it can affect. Done as select + delete + insert from the
+-- client, concurrent writes touching the same user interleave and entries get lost
+-- or duplicated. These functions do the whole patch in one transaction and take a
+-- per-list advisory lock (user_id + kind), so writers on the same list serialize
+-- and writers on different lists don't wait for each other.
+--
+-- Apply once in the Supabase SQL editor (or psql). Fails if duplicate pending
+-- entries already exist; find them first with the SELECTs below.
+
+-- SELECT user_id, matched_user_id, count(*) FROM matches WHERE status = 'pending' AND matched_user_id IS NOT NULL GROUP BY 1, 2 HAVING count(*) > 1;
+-- SELECT user_id, matched_property_id, count(*) FROM matches WHERE status = 'pending' AND matched_property_id IS NOT NULL GROUP BY 1, 2 HAVING count(*) > 1;
+
+-- At most one pending entry per user and item
+CREATE UNIQUE INDEX IF NOT EXISTS matches_pending_roommate_key
+    ON public.matches (user_id, matched_user_id)
+    WHERE status = 'pending' AND matched_user_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS matches_pending_property_key
+    ON public.matches (user_id, matched_property_id)
+    WHERE status = 'pending' AND matched_property_id IS NOT NULL;
+
+-- Lock one user's roommate or property list until the end of the transaction
+CREATE OR REPLACE FUNCTION public.roomfi_lock_match_list(p_user_id uuid, p_kind text)
+RETURNS void
+LANGUAGE sql AS $$
+    SELECT pg_advisory_xact_lock(hashtextextended('matches:' || p_kind || ':' || p_user_id::text, 0))
+$$;
+
+-- Offer one item (matched_user_id or matched_property_id) to many users' lists.
+-- p_entries: [{"user_id": uuid, "score": float}], scores already rounded.
+-- Per user: a previous entry for the same item is replaced; the item is inserted
+-- if the list has fewer than p_top_k entries, or beats (strictly) the weakest
+-- entry, which is evicted.
+CREATE OR REPLACE FUNCTION public.patch_stored_matches(
+    p_kind text,
+    p_matched_user_id uuid,
+    p_matched_property_id integer,
+    p_entries jsonb,
+    p_top_k integer,
+    p_source text
+)
+RETURNS TABLE (inserted integer, evicted integer)
+LANGUAGE plpgsql AS $$
+DECLARE
+    e record;
+    n integer;
+    weakest record;
+BEGIN
+    inserted := 0;
+    evicted := 0;
+    -- Users in a fixed order, so two patches never wait on each other's locks in a cycle
+    FOR e IN
+        SELECT (x->>'user_id')::uuid AS user_id, (x->>'score')::float8 AS score
+        FROM jsonb_array_elements(p_entries) AS x
+        ORDER BY 1
+    LOOP
+        PERFORM public.roomfi_lock_match_list(e.user_id, p_kind);
+
+        DELETE FROM public.matches m
+        WHERE m.user_id = e.user_id AND m.status = 'pending'
+          AND (m.matched_user_id = p_matched_user_id OR m.matched_property_id = p_matched_property_id);
+
+        SELECT count(*) INTO n
+        FROM public.matches m
+        WHERE m.user_id = e.user_id AND m.status = 'pending'
+          AND ((p_kind = 'roommate' AND m.matched_user_id IS NOT NULL)
+            OR (p_kind = 'property' AND m.matched_property_id IS NOT NULL));
+
+        IF n >= p_top_k THEN
+            SELECT m.id, COALESCE(m.score, 0) AS score INTO weakest
+            FROM public.matches m
+            WHERE m.user_id = e.user_id AND m.status = 'pending'
+              AND ((p_kind = 'roommate' AND m.matched_user_id IS NOT NULL)
+                OR (p_kind = 'property' AND m.matched_property_id IS NOT NULL))
+            ORDER BY COALESCE(m.score, 0), m.id
+            LIMIT 1;
+            CONTINUE WHEN e.score <= weakest.score;
+            DELETE FROM public.matches WHERE id = weakest.id;
+            evicted := evicted + 1;
+        END IF;
+
+        INSERT INTO public.matches (user_id, matched_user_id, matched_property_id, score, status, source)
+        VALUES (e.user_id, p_matched_user_id, p_matched_property_id, e.score, 'pending', p_source);
+        inserted := inserted + 1;
+    END LOOP;
+    RETURN NEXT;
+END
+$$;
+
+-- Replace one user's whole roommate or property list.
+-- p_entries: [{"matched_user_id": uuid} or {"matched_property_id": int}, with "score"]
+CREATE OR REPLACE FUNCTION public.replace_stored_matches(
+    p_user_id uuid,
+    p_kind text,
+    p_entries jsonb,
+    p_source text
+)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    n integer;
+BEGIN
+    PERFORM public.roomfi_lock_match_list(p_user_id, p_kind);
+
+    DELETE FROM public.matches m
+    WHERE m.user_id = p_user_id AND m.status = 'pending'
+      AND ((p_kind = 'roommate' AND m.matched_user_id IS NOT NULL)
+        OR (p_kind = 'property' AND m.matched_property_id IS NOT NULL));
+
+    INSERT INTO public.matches (user_id, matched_user_id, matched_property_id, score, status, source)
+    SELECT p_user_id, (x->>'matched_user_id')::uuid, (x->>'matched_property_id')::integer,
+           (x->>'score')::float8, 'pending', p_source
+    FROM jsonb_array_elements(p_entries) AS x;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END
+$$;
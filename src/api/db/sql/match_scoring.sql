@@ -0,0 +1,99 @@
+-- Server-side match scoring with ORDER BY / LIMIT pushdown.
+--
+-- Mirrors src/api/services/scoring.py expression for expression in float8 so the
+-- raw scores are bit-identical to the Python *_raw functions. Rounding to 3
+-- decimals stays in Python (round() is half-even, Postgres round() is not).
+--
+-- Apply once in the Supabase SQL editor (or psql). Called through
+-- client.rpc(...) or the async engine, see src/api/db/repository.py.
+
+-- Distinct text elements of a JSON array (NULL / non-array -> empty set)
+CREATE OR REPLACE FUNCTION public.roomfi_text_set(arr jsonb)
+RETURNS text[]
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT COALESCE(array_agg(DISTINCT e), '{}')
+    FROM jsonb_array_elements_text(
+        CASE WHEN jsonb_typeof(arr) = 'array' THEN arr ELSE '[]'::jsonb END
+    ) AS e
+$$;
+
+-- |a ∩ b| / |a ∪ b|, 0 when either side is empty (same as scoring.jaccard)
+CREATE OR REPLACE FUNCTION public.roomfi_jaccard(a text[], b text[])
+RETURNS double precision
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN cardinality(a) = 0 OR cardinality(b) = 0 THEN 0::float8
+        ELSE (SELECT count(*) FROM (SELECT unnest(a) INTERSECT SELECT unnest(b)) AS i)::float8
+           / (SELECT count(*) FROM (SELECT unnest(a) UNION SELECT unnest(b)) AS u)::float8
+    END
+$$;
+
+-- Top-k roommates: 0.5 * budget_score + 0.5 * tag_score
+CREATE OR REPLACE FUNCTION public.match_top_roommates(
+    p_user_id uuid,
+    p_location text,
+    p_budget_min double precision,
+    p_budget_max double precision,
+    p_tags jsonb,
+    p_top_k integer
+)
+RETURNS TABLE (profile jsonb, score double precision)
+LANGUAGE sql STABLE AS $$
+    WITH params AS (
+        SELECT public.roomfi_text_set(p_tags) AS tags,
+               (p_budget_min + p_budget_max) / 2 AS user_avg
+    ),
+    candidates AS (
+        SELECT u,
+               (COALESCE(u.budget_min, 0) + COALESCE(u.budget_max, 0)) / 2 AS rm_avg,
+               public.roomfi_jaccard(p.tags, public.roomfi_text_set(u.lifestyle_tags::jsonb)) AS tag_score,
+               p.user_avg
+        FROM public.user_profiles AS u, params AS p
+        WHERE u.user_id <> p_user_id
+          AND u.location_preference = p_location
+          AND u.budget_max >= p_budget_min
+          AND u.budget_min <= p_budget_max
+    ),
+    scored AS (
+        SELECT u,
+               0.5::float8 * (CASE WHEN rm_avg <> 0
+                                   THEN 1 - abs(user_avg - rm_avg) / greatest(user_avg, rm_avg)
+                                   ELSE 0 END)
+             + 0.5::float8 * tag_score AS score
+        FROM candidates
+    )
+    SELECT to_jsonb(s.u), s.score
+    FROM scored AS s
+    ORDER BY s.score DESC, (s.u).id
+    LIMIT p_top_k
+$$;
+
+-- Top-k properties: 0.7 * price_score + 0.3 * amenity_score
+CREATE OR REPLACE FUNCTION public.match_top_properties(
+    p_location text,
+    p_budget_min double precision,
+    p_budget_max double precision,
+    p_tags jsonb,
+    p_available_before timestamp,
+    p_top_k integer
+)
+RETURNS TABLE (property jsonb, score double precision)
+LANGUAGE sql STABLE AS $$
+    WITH params AS (
+        SELECT public.roomfi_text_set(p_tags) AS tags
+    ),
+    scored AS (
+        SELECT pr,
+               0.7::float8 * (1 - abs(((p_budget_min + p_budget_max) / 2) - COALESCE(pr.price, 0)) / p_budget_max)
+             + 0.3::float8 * public.roomfi_jaccard(p.tags, public.roomfi_text_set(pr.amenities::jsonb)) AS score
+        FROM public.properties AS pr, params AS p
+        WHERE pr.location = p_location
+          AND pr.price >= p_budget_min
+          AND pr.price <= p_budget_max
+          AND pr.available_from <= p_available_before
+    )
+    SELECT to_jsonb(s.pr), s.score
+    FROM scored AS s
+    ORDER BY s.score DESC, (s.pr).id
+    LIMIT p_top_k
+$$;
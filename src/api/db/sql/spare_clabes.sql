@@ -0,0 +1,29 @@
+-- CLABEs created at Juno but not attached to any row.
+--
+-- POST /db/new/user, /db/new/landlord and /db/new/property create the CLABE first,
+-- so the row is written once, with it, by the conflict-aware insert. When that insert
+-- turns out to be a duplicate (or fails), the CLABE is parked here instead of being
+-- lost, and the next create claims it instead of asking Juno for a new one
+-- (src/api/services/clabes.py).
+--
+-- Apply once in the Supabase SQL editor (or psql).
+
+CREATE TABLE IF NOT EXISTS public.spare_clabes (
+    clabe text PRIMARY KEY,
+    parked_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Oldest parked CLABE, removed in the same statement; NULL when there are none.
+-- SKIP LOCKED: concurrent claims never get the same CLABE and never wait on each other.
+CREATE OR REPLACE FUNCTION public.claim_spare_clabe()
+RETURNS text
+LANGUAGE sql AS $$
+    DELETE FROM public.spare_clabes
+    WHERE clabe = (
+        SELECT clabe FROM public.spare_clabes
+        ORDER BY parked_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING clabe
+$$;
@@ -0,0 +1,22 @@
+-- Unique constraints backing the single-round-trip create endpoints.
+--
+-- POST /db/new/user, /db/new/landlord and /db/new/property insert with
+-- ON CONFLICT DO NOTHING (PostgREST: Prefer: resolution=ignore-duplicates) on
+-- these keys; an empty result means the row already existed -> 400.
+--
+-- Apply once in the Supabase SQL editor (or psql). Fails if duplicates already
+-- exist; find them first with the SELECTs below.
+
+-- SELECT user_id, count(*) FROM user_profiles GROUP BY 1 HAVING count(*) > 1;
+-- SELECT owner_user_id, address, count(*) FROM properties GROUP BY 1, 2 HAVING count(*) > 1;
+
+ALTER TABLE public.user_profiles
+    ADD CONSTRAINT user_profiles_user_id_key UNIQUE (user_id);
+
+-- landlord_profile.user_id is already declared unique in the model; keep for fresh databases
+ALTER TABLE public.landlord_profile
+    DROP CONSTRAINT IF EXISTS landlord_profile_user_id_key,
+    ADD CONSTRAINT landlord_profile_user_id_key UNIQUE (user_id);
+
+ALTER TABLE public.properties
+    ADD CONSTRAINT properties_owner_address_key UNIQUE (owner_user_id, address);
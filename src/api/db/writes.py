@@ -0,0 +1,22 @@
+"""
+Conflict-aware inserts: duplicate detection in the same round trip as the write.
+
+A select-then-insert costs two round trips and still lets two concurrent requests
+both pass the check. insert_unique sends one INSERT ... ON CONFLICT DO NOTHING
+(PostgREST upsert with ignore_duplicates) against a unique constraint, see
+src/api/db/sql/unique_constraints.sql; an empty result means the row existed.
+
+The create endpoints reserve the row's CLABE first and write the row once, with it
+(src/api/services/clabes.py). insert_unique is blocking: run it with asyncio.to_thread.
+"""
+from typing import Dict, Any, Optional
+
+from src.api.config import client
+
+
+def insert_unique(table: str, row: Dict[str, Any], on_conflict: str) -> Optional[Dict[str, Any]]:
+    """Insert row; returns the stored row, or None if on_conflict columns already exist."""
+    result = client.table(table) \
+        .upsert(row, on_conflict=on_conflict, ignore_duplicates=True) \
+        .execute()
+    return result.data[0] if result.data else None
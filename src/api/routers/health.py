@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from src.api.services.warmup import warmup
+
+router = APIRouter()
+
+@router.get("/health")
+async def health():
+    """Liveness: the process is up and serving."""
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def ready():
+    """Readiness: 200 once pools, indexes and caches are warm, 503 (with per-component status) until then."""
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, HTTPException, status, Query
-from fastapi.responses import JSONResponse
 import httpx
 import time
 import hmac
 import hashlib
 from src.api.config import settings
+from src.api.core.metrics import juno_transport
+from src.api.core.responses import passthrough
 from typing import Optional
 
 router = APIRouter()
@@ -28,16 +29,13 @@ async def create_clabe():
         url = f"{JUNO_BASE_URL}{path}"
         authorization = sign_juno_request(method, path)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=juno_transport()) as client:
             response = await client.post(url, headers={"Authorization": authorization})
 
         if not (200 <= response.status_code < 300):
             raise HTTPException(status_code=response.status_code, detail=response.text)
 
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
-        )
+        return passthrough(response)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -52,16 +50,13 @@ async def get_clabe_details(clabe: str):
 
         authorization = sign_juno_request(method, path)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=juno_transport()) as client:
             response = await client.get(url, headers={"Authorization": authorization})
 
         if not (200 <= response.status_code < 300):
             raise HTTPException(status_code=response.status_code, detail=response.text)
 
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
-        )
+        return passthrough(response)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -98,16 +93,13 @@ async def list_clabes(
 
         authorization = sign_juno_request(method, path)  # Signature uses path only (no query)
 
-        async with httpx.AsyncClient() as client:
+        async with httpx.AsyncClient(transport=juno_transport()) as client:
             response = await client.get(url, headers={"Authorization": authorization})
 
         if not (200 <= response.status_code < 300):
             raise HTTPException(status_code=response.status_code, detail=response.text)
 
-        return JSONResponse(
-            status_code=response.status_code,
-            content=response.json()
-        )
+        return passthrough(response)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
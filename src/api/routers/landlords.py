@@ -1,57 +1,83 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
 from src.api.config import client
 from src.api.db.schemas.inputs.landlord import LandlordProfileCreate
 from src.api.db.schemas.outputs.landlord import LandlordProfileOut
+from src.api.db.schemas.outputs.property import PropertyOut
+from src.api.core.responses import FastJSONResponse
+from src.api.db.pagination import keyset_page, select_columns, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from datetime import datetime
-from src.api.services.juno import create_clabe_for_user  # ✅ Reuse service
+from src.api.db.cache import entity_cache
+from src.api.db.repository import get_repository
+from src.api.services.clabes import clabe_reserve, ClabeUnavailable
 
 router = APIRouter()
+repository = get_repository()
 
 @router.post("/new/landlord")
 async def create_landlord_profile(payload: LandlordProfileCreate):
-    # Check if landlord profile already exists
-    existing = client.table("landlord_profile").select("user_id").eq("user_id", str(payload.user_id)).execute()
-    if existing.data:
-        raise HTTPException(status_code=400, detail="Landlord profile already exists")
-
-    # Create CLABE from JUNO service
+    # Reserve a CLABE, then insert the landlord profile with it; duplicates are detected by the
+    # unique user_id constraint in the same round trip (their CLABE is kept for the next create)
     try:
-        clabe = await create_clabe_for_user()
-    except Exception as e:
+        profile = await clabe_reserve.insert_with_clabe("landlord_profile", {
+            "user_id": str(payload.user_id),
+            "first_name": payload.first_name,
+            "last_name": payload.last_name,
+            "phone_number": payload.phone_number,
+            "verified": payload.verified,
+            "bio": payload.bio,
+            "profile_image_url": payload.profile_image_url,
+            "joined_at": payload.joined_at.isoformat() if payload.joined_at else datetime.utcnow().isoformat(),
+            "preferred_locations": payload.preferred_locations
+        }, on_conflict="user_id")
+    except ClabeUnavailable as e:
         raise HTTPException(status_code=502, detail=f"Failed to create CLABE: {e}")
-
-    # Insert new landlord profile with first_name, last_name, clabe
-    result = client.table("landlord_profile").insert({
-        "user_id": str(payload.user_id),
-        "first_name": payload.first_name,
-        "last_name": payload.last_name,
-        "phone_number": payload.phone_number,
-        "verified": payload.verified,
-        "bio": payload.bio,
-        "profile_image_url": payload.profile_image_url,
-        "joined_at": payload.joined_at.isoformat() if payload.joined_at else datetime.utcnow().isoformat(),
-        "preferred_locations": payload.preferred_locations,
-        "clabe": clabe
-    }).execute()
+    if profile is None:
+        raise HTTPException(status_code=400, detail="Landlord profile already exists")
+    entity_cache.put("landlord_profile", profile["user_id"], profile)
 
     return {
         "message": "Landlord profile created",
         "user_id": payload.user_id,
-        "clabe": clabe
+        "clabe": profile["clabe"]
     }
 
 @router.get("/get/landlord", response_model=LandlordProfileOut)
-def get_landlord_profile(user_id: str):
+async def get_landlord_profile(user_id: str):
     # Fetch landlord profile
-    response = client.table("landlord_profile").select("*").eq("user_id", user_id).single().execute()
-    if not response.data:
+    profile = await repository.get_landlord_profile(user_id)
+    if not profile:
         raise HTTPException(status_code=404, detail="Landlord profile not found")
-    return response.data
+    return profile
 
 @router.get("/get/landlord/properties")
-def get_landlord_properties(user_id: str):
-    # Fetch properties owned by the landlord
-    response = client.table("properties").select("*").eq("owner_user_id", user_id).execute()
-    if not response.data:
+def get_landlord_properties(
+    user_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size; paging starts at {DEFAULT_PAGE_SIZE} when only cursor is given"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns, e.g. id,address,price"),
+    include_total: bool = Query(True, description="Count all of the landlord's properties (one extra query)"),
+):
+    try:
+        columns = select_columns(fields, PropertyOut.model_fields)
+        if limit is None and cursor is None:
+            # Legacy (deprecated): without limit or cursor, the bare list of all the landlord's properties
+            page = None
+            rows = client.table("properties").select(columns).eq("owner_user_id", user_id).order("id").execute().data
+        else:
+            # Fetch one page of properties owned by the landlord, ordered by id
+            page = keyset_page(
+                "properties",
+                lambda query: query.eq("owner_user_id", user_id),
+                columns=columns,
+                limit=limit or DEFAULT_PAGE_SIZE,
+                cursor=cursor,
+                include_total=include_total,
+            )
+            rows = page["items"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not rows and cursor is None:
         raise HTTPException(status_code=404, detail="No properties found for this landlord")
-    return response.data
+    return FastJSONResponse(rows if page is None else page)
@@ -1,28 +1,71 @@
-from fastapi import APIRouter, Query, HTTPException, Body
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Query, HTTPException, Body, Header
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from src.api.config import settings
+from src.api.core import profiling
+from src.api.core.responses import FastJSONResponse, dumps
+from src.api.core.timing import span
 from src.api.services.ai_service import ai_service
-from supabase import create_client, Client
+from src.api.services.amenity_index import amenity_index, preference_filters
+from src.api.services.availability_index import availability_index, move_in_range
+from src.api.services.batch_matching import match_users
+from src.api.services.candidate_snapshot import candidate_snapshot
+from src.api.services.geo_index import geo_index
+from src.api.services.group_matching import match_group, GroupMatchingError
+from src.api.services.preference_store import prompt_fingerprint, store_preferences
+from src.api.services.scoring import roommate_score_raw, property_score_raw, round_score
+from src.api.db.repository import get_repository
 import logging
 
 router = APIRouter()
-client: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+repository = get_repository()
 
+# MATCH_SCORING=snapshot: rows picked from the snapshot per returned match, so stale picks can be dropped
+SNAPSHOT_OVERFETCH = 2
+
+
+async def _loaded(index):
+    """The index, loaded in a worker thread when cold (first use before warm-up, or after a feed reset)."""
+    return index if index.loaded else await asyncio.to_thread(index.ensure_loaded)
 
 
 class MatchmakingRequest(BaseModel):
     user_prompt: Optional[str] = None
 
+
+class BatchMatchRequest(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, max_length=settings.MATCH_BATCH_MAX_USERS)
+    top_k: int = Field(5, ge=1, le=20)
+
+
 @router.post("/match/top")
 async def match_top(
     user_id: str,
+    background_tasks: BackgroundTasks,
     top_k: Optional[int] = Query(5, ge=1, le=20),
     ai_query: Optional[bool] = Query(False, description="Enable AI processing of user prompt"),
+    lat: Optional[float] = Query(None, ge=-90, le=90, description="Search center latitude"),
+    lng: Optional[float] = Query(None, ge=-180, le=180, description="Search center longitude"),
+    radius_km: Optional[float] = Query(None, gt=0, le=100, description="Only properties within this distance of (lat, lng)"),
+    persist_preferences: Optional[bool] = Query(False, description="Store AI-extracted preferences on the profile (write-behind)"),
+    profile: Optional[bool] = Query(False, description="Return a sampled CPU profile of this request (requires X-Profile-Token)"),
+    x_profile_token: Optional[str] = Header(None),
     body: Optional[MatchmakingRequest] = Body(None)
 ):
+    profiler = None
     try:
+        if profile:
+            profiling.authorize(x_profile_token)
+            profiler = profiling.SamplingProfiler()
+            if not profiler.start():
+                profiler = None  # another profile is running; serve the request unprofiled
+
+        if (lat is None, lng is None, radius_km is None).count(True) not in (0, 3):
+            raise HTTPException(status_code=422, detail="lat, lng and radius_km must be provided together")
+
         # Validate AI query parameters
         user_prompt = body.user_prompt if (body and body.user_prompt) else None
         if ai_query:
@@ -37,34 +80,45 @@ async def match_top(
         
         # 1. Fetch user
         try:
-            user_resp = client.table("user_profiles").select("*").eq("user_id", user_id).single().execute()
-            user = user_resp.data
+            with span("user"):
+                user = await repository.get_user_profile(user_id)
         except Exception as e:
             logging.error(f"Error fetching user profile: {e}")
             raise HTTPException(status_code=404, detail="User not found or Supabase error")
 
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found or Supabase error")
         if not user:
             raise HTTPException(status_code=404, detail="User profile is empty")
 
         # 2. Process AI query if enabled
-        if ai_query and user_prompt:
+        fingerprint = prompt_fingerprint(user_prompt) if (ai_query and user_prompt) else None
+        if fingerprint and user.get("ai_prompt_fingerprint") == fingerprint:
+            # Same prompt already extracted and stored on the profile: skip the AI pipeline
+            logging.info(f"AI preferences for user {user_id} already stored for this prompt")
+            ai_insights = {"status": "success", "cached": True, "prompt_fingerprint": fingerprint}
+        elif ai_query and user_prompt:
             try:
                 logging.info(f"Processing AI query for user {user_id}")
-                ai_insights = await ai_service.process_user_prompt(user_prompt, user)
-                
+                with span("ai"):
+                    ai_insights = await ai_service.process_user_prompt(user_prompt, user)
+                ai_status = ai_insights.get("status")
+
                 # Handle AI processing results with enhanced fallback logic
-                if ai_insights.get("processing_status") in ["success", "partial"]:
+                if ai_status in ["success", "partial"]:
                     # AI succeeded - use updated preferences
                     extracted_preferences = ai_insights.get("extracted_preferences", {})
                     if extracted_preferences.get("updated"):
                         user.update(extracted_preferences["updated"])
                         logging.info(f"Updated user preferences with AI insights")
-                
-                elif ai_insights.get("processing_status") == "fallback_to_existing":
+                        if persist_preferences:
+                            background_tasks.add_task(store_preferences, user_id, extracted_preferences["updated"], fingerprint)
+
+                elif ai_status == "fallback_to_existing":
                     # AI failed but we have existing preferences - continue with original user data
                     logging.info(f"AI failed, falling back to existing preferences for user {user_id}")
                 
-                elif ai_insights.get("processing_status") == "insufficient_data":
+                elif ai_status == "insufficient_data":
                     # AI succeeded but data is still insufficient
                     raise HTTPException(
                         status_code=422,
@@ -72,11 +126,11 @@ async def match_top(
                             "error": "Insufficient preferences for matching",
                             "message": "Could not extract enough information from your query to perform matching. Please provide more details about your budget, location, or lifestyle preferences.",
                             "ai_insights": ai_insights,
-                            "suggestions": ai_insights.get("extracted_preferences", {}).get("ai_enhancements", {}).get("suggestions", [])
+                            "suggestions": ai_insights.get("suggestions", [])
                         }
                     )
                 
-                elif ai_insights.get("processing_status") == "failed":
+                elif ai_status == "failed":
                     # AI failed and no existing preferences
                     if ai_insights.get("fallback_reason") and "no existing preferences" in ai_insights.get("fallback_reason", ""):
                         raise HTTPException(
@@ -106,7 +160,7 @@ async def match_top(
                     "original_prompt": user_prompt,
                     "translated_prompt": None,
                     "extracted_preferences": None,
-                    "processing_status": "failed",
+                    "status": "failed",
                     "fallback_reason": f"Exception in AI processing: {str(e)}",
                     "error": str(e)
                 }
@@ -121,71 +175,151 @@ async def match_top(
         if not all([budget_min, budget_max, location]):
             raise HTTPException(status_code=422, detail="User profile is missing required fields")
 
-        # 3. Fetch roommate candidates
-        try:
-            roommates_resp = client.table("user_profiles") \
-                .select("*") \
-                .neq("user_id", user_id) \
-                .eq("location_preference", location) \
-                .gte("budget_max", budget_min) \
-                .lte("budget_min", budget_max) \
-                .execute()
-            roommates = roommates_resp.data or []
-        except Exception as e:
-            logging.error(f"Error fetching roommates: {e}")
-            raise HTTPException(status_code=500, detail="Failed to fetch roommates from Supabase")
+        with span("filters"):
+            # Optional proximity filter: properties within radius_km of (lat, lng) replace the location match
+            nearby = None
+            if radius_km is not None:
+                nearby = dict((await _loaded(geo_index)).within(lat, lng, radius_km))
 
-        # 4. Fetch property candidates
-        try:
-            properties_resp = client.table("properties") \
-                .select("*") \
-                .eq("location", location) \
-                .gte("price", budget_min) \
-                .lte("price", budget_max) \
-                .lte("available_from", datetime.utcnow().isoformat()) \
-                .execute()
-            properties = properties_resp.data or []
-        except Exception as e:
-            logging.error(f"Error fetching properties: {e}")
-            raise HTTPException(status_code=500, detail="Failed to fetch properties from Supabase")
-
-        # 5. Score functions
-        def roommate_score(rm):
-            rm_tags = set(rm.get("lifestyle_tags") or [])
-            tag_score = len(lifestyle_tags & rm_tags) / len(lifestyle_tags | rm_tags) if lifestyle_tags and rm_tags else 0
-            rm_budget_avg = (rm.get("budget_min", 0) + rm.get("budget_max", 0)) / 2
-            user_budget_avg = (budget_min + budget_max) / 2
-            budget_score = 1 - abs(user_budget_avg - rm_budget_avg) / max(user_budget_avg, rm_budget_avg) if rm_budget_avg else 0
-            return round(0.5 * budget_score + 0.5 * tag_score, 3)
-
-        def property_score(prop):
-            amenities = set(prop.get("amenities") or [])
-            amenity_score = len(lifestyle_tags & amenities) / len(lifestyle_tags | amenities) if lifestyle_tags and amenities else 0
-            price_score = 1 - abs(((budget_min + budget_max) / 2) - prop.get("price", 0)) / budget_max
-            return round(0.7 * price_score + 0.3 * amenity_score, 3)
-
-        # 6. Sort and return
-        top_roommates = sorted(roommates, key=roommate_score, reverse=True)[:min(top_k, len(roommates))]
-        top_properties = sorted(properties, key=property_score, reverse=True)[:min(top_k, len(properties))]
-
-        # Prepare response
+            # Hard filters narrow property candidates to an id set before scoring:
+            #   - proximity circle (replaces the location match)
+            #   - move-in window (replaces the "available now" check)
+            #   - required amenities, pet_friendly and parking from roomie_preferences
+            property_location = location if nearby is None else None
+            candidate_ids = set(nearby) if nearby is not None else None
+
+            move_in = move_in_range(user)
+            if move_in is not None:
+                overlapping = set((await _loaded(availability_index)).overlapping(move_in.start, move_in.end, property_location))
+                candidate_ids = overlapping if candidate_ids is None else candidate_ids & overlapping
+
+            required_amenities = preference_filters(user.get("roomie_preferences"))
+            if required_amenities:
+                with_amenities = (await _loaded(amenity_index)).match(all_of=required_amenities, location=property_location)
+                candidate_ids = with_amenities if candidate_ids is None else candidate_ids & with_amenities
+
+        sql_scoring = settings.MATCH_SCORING == "sql"
+        snapshot_scoring = settings.MATCH_SCORING == "snapshot" and candidate_snapshot.available
+
+        # 3. Roommate candidates
+        if sql_scoring:
+            try:
+                with span("roommates.sql"):
+                    scored_roommates = await repository.top_roommates(user_id, location, budget_min, budget_max, sorted(lifestyle_tags), top_k)
+            except Exception as e:
+                logging.error(f"Error scoring roommates in SQL: {e}")
+                raise HTTPException(status_code=500, detail="Failed to score candidates in Supabase")
+        else:
+            try:
+                if snapshot_scoring:
+                    # Pick from the shared snapshot, then fetch and re-check only those rows (they may have changed since)
+                    with span("roommates.snapshot"):
+                        ids = candidate_snapshot.top_roommates(user_id, location, budget_min, budget_max, lifestyle_tags, top_k * SNAPSHOT_OVERFETCH)
+                    with span("roommates.fetch"):
+                        rows = await repository.get_user_profiles_by_ids(ids) if ids else []
+                    roommates = [
+                        rm for rm in rows
+                        if str(rm.get("user_id")) != user_id and rm.get("location_preference") == location
+                        and rm.get("budget_max") is not None and rm.get("budget_min") is not None
+                        and rm["budget_max"] >= budget_min and rm["budget_min"] <= budget_max
+                    ]
+                else:
+                    with span("roommates.fetch"):
+                        roommates = await repository.find_roommate_candidates(user_id, location, budget_min, budget_max)
+            except Exception as e:
+                logging.error(f"Error fetching roommates: {e}")
+                raise HTTPException(status_code=500, detail="Failed to fetch roommates from Supabase")
+            with span("roommates.score"):
+                scored_roommates = [(rm, roommate_score_raw(budget_min, budget_max, lifestyle_tags, rm)) for rm in roommates]
+                scored_roommates = sorted(scored_roommates, key=lambda pair: round_score(pair[1]), reverse=True)[:top_k]
+
+        # 4. Property candidates
+        if sql_scoring and candidate_ids is None:
+            try:
+                with span("properties.sql"):
+                    scored_properties = await repository.top_properties(location, budget_min, budget_max, sorted(lifestyle_tags), datetime.utcnow(), top_k)
+            except Exception as e:
+                logging.error(f"Error scoring properties in SQL: {e}")
+                raise HTTPException(status_code=500, detail="Failed to score candidates in Supabase")
+        else:
+            available_before = None if move_in is not None else datetime.utcnow()
+            if snapshot_scoring:
+                with span("properties.snapshot"):
+                    candidate_ids = set(candidate_snapshot.top_properties(
+                        property_location, budget_min, budget_max, lifestyle_tags, available_before, candidate_ids,
+                        top_k * SNAPSHOT_OVERFETCH,
+                    ))
+            try:
+                with span("properties.fetch"):
+                    properties = await repository.find_property_candidates(
+                        property_location, budget_min, budget_max, available_before,
+                        ids=sorted(candidate_ids) if candidate_ids is not None else None,
+                    )
+            except Exception as e:
+                logging.error(f"Error fetching properties: {e}")
+                raise HTTPException(status_code=500, detail="Failed to fetch properties from Supabase")
+            with span("properties.score"):
+                scored_properties = [(prop, property_score_raw(budget_min, budget_max, lifestyle_tags, prop)) for prop in properties]
+                scored_properties = sorted(scored_properties, key=lambda pair: round_score(pair[1]), reverse=True)[:top_k]
+
+        # Prepare response: rows are per-request copies (fresh from the DB, or copied by the
+        # entity cache), so scores are added in place instead of copying every row again
+        for rm, score in scored_roommates:
+            rm["score"] = round_score(score)
+        for prop, score in scored_properties:
+            prop["score"] = round_score(score)
+            if nearby is not None:
+                prop["distance_km"] = round(nearby[prop["id"]], 3)
         response = {
-            "roommate_matches": [
-                {**rm, "score": roommate_score(rm)} for rm in top_roommates
-            ],
-            "property_matches": [
-                {**prop, "score": property_score(prop)} for prop in top_properties
-            ]
+            "roommate_matches": [rm for rm, _ in scored_roommates],
+            "property_matches": [prop for prop, _ in scored_properties],
         }
-        
+
         # Add AI insights if AI query was used
         if ai_query and ai_insights:
             response["ai_insights"] = ai_insights
 
-        return response
+        if profiler is not None:
+            profiler.stop()
+            response["profile"] = profiler.result()
+
+        with span("render"):
+            return FastJSONResponse(response)
 
     except HTTPException as e:
         raise e
     except Exception as e:
         logging.exception("Unhandled matchmaking error")
         raise HTTPException(status_code=500, detail="Internal server error during matchmaking")
+    finally:
+        if profiler is not None:
+            profiler.stop()
+
+
+@router.post("/group/match")
+async def group_match(
+    group_id: int,
+    top_k: Optional[int] = Query(10, ge=1, le=50),
+    persist: Optional[bool] = Query(True, description="Write results to group_matches")
+):
+    try:
+        return FastJSONResponse(await match_group(repository, group_id, top_k=top_k, persist=persist))
+    except GroupMatchingError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logging.exception("Unhandled group matchmaking error")
+        raise HTTPException(status_code=500, detail="Internal server error during group matchmaking")
+
+
+@router.post("/match/batch")
+async def match_batch(body: BatchMatchRequest):
+    """
+    Top matches for many users (stored preferences only), streamed as NDJSON:
+    one {"user_id", "location", "roommate_matches", "property_matches"} line per
+    user, or {"user_id", "error"} for users that can't be matched.
+    """
+    async def lines():
+        async for result in match_users(repository, body.user_ids, top_k=body.top_k):
+            yield dumps(result) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
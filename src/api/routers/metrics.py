@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.api.core.metrics import render
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (all workers aggregated when running under src/serve.py)."""
+    body, content_type = render()
+    return Response(body, media_type=content_type)
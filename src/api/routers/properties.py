@@ -1,60 +1,75 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from typing import List
 from src.api.db.schemas.inputs.property import PropertyCreate
-from src.api.db.schemas.outputs.property import PropertyOut
-from src.api.config import client
-from src.api.services.juno import create_clabe_for_user
+from src.api.db.schemas.outputs.property import PropertyOut, PropertyBatchOut
+from src.api.config import settings
+from src.api.db.cache import entity_cache
+from src.api.db.repository import get_repository
+from src.api.services.clabes import clabe_reserve, ClabeUnavailable
+from src.api.services.amenity_index import amenity_index
+from src.api.services.availability_index import availability_index
+from src.api.services.geo_index import geo_index
+from src.api.services.match_maintenance import match_maintainer
 from datetime import datetime
 
 router = APIRouter()
+repository = get_repository()
 
-@router.post("/new/property")
-async def create_property(payload: PropertyCreate):
-    # Optional: check if similar property already exists (same address + owner)
-    existing = client.table("properties") \
-        .select("id") \
-        .eq("owner_user_id", str(payload.owner_user_id)) \
-        .eq("address", payload.address) \
-        .execute()
-
-    if existing.data:
-        raise HTTPException(status_code=400, detail="Property already exists for this owner at this address")
+BATCH_MAX_IDS = 100
 
-    # Create CLABE for this property (optional)
+@router.post("/new/property")
+async def create_property(payload: PropertyCreate, background_tasks: BackgroundTasks):
+    # Reserve a CLABE, then insert the property (with latitude and longitude) with it; a property
+    # with the same owner and address is detected by the unique constraint in the same round trip
     try:
-        clabe = await create_clabe_for_user()
-    except Exception as e:
+        prop = await clabe_reserve.insert_with_clabe("properties", {
+            "owner_user_id": str(payload.owner_user_id),
+            "address": payload.address,
+            "location": payload.location,
+            "price": payload.price,
+            "amenities": payload.amenities,
+            "num_rooms": payload.num_rooms,
+            "bathrooms": payload.bathrooms,
+            "available_from": payload.available_from.isoformat(),
+            "available_to": payload.available_to.isoformat(),
+            "created_at": payload.created_at.isoformat() if payload.created_at else datetime.utcnow().isoformat(),
+            "updated_at": payload.updated_at.isoformat() if payload.updated_at else datetime.utcnow().isoformat(),
+            "latitude": payload.latitude,
+            "longitude": payload.longitude
+        }, on_conflict="owner_user_id,address")
+    except ClabeUnavailable as e:
         raise HTTPException(status_code=502, detail=f"Failed to create CLABE: {e}")
+    if prop is None:
+        raise HTTPException(status_code=400, detail="Property already exists for this owner at this address")
+    entity_cache.put("properties", prop["id"], prop)
 
-    # Insert property with latitude and longitude
-    result = client.table("properties").insert({
-        "owner_user_id": str(payload.owner_user_id),
-        "address": payload.address,
-        "location": payload.location,
-        "price": payload.price,
-        "amenities": payload.amenities,
-        "num_rooms": payload.num_rooms,
-        "bathrooms": payload.bathrooms,
-        "available_from": payload.available_from.isoformat(),
-        "available_to": payload.available_to.isoformat(),
-        "created_at": payload.created_at.isoformat() if payload.created_at else datetime.utcnow().isoformat(),
-        "updated_at": payload.updated_at.isoformat() if payload.updated_at else datetime.utcnow().isoformat(),
-        "latitude": payload.latitude,
-        "longitude": payload.longitude,
-        "clabe": clabe
-    }).execute()
+    # Added even while an index is loading: the load replays it onto the copy it swaps in
+    geo_index.add(prop["id"], payload.latitude, payload.longitude)
+    availability_index.add(prop["id"], payload.location, payload.available_from, payload.available_to)
+    amenity_index.add(prop["id"], payload.location, payload.amenities)
+    if settings.MATCH_INCREMENTAL:
+        background_tasks.add_task(match_maintainer.on_property_insert, prop)
 
     return {
         "message": "Property created",
-        "property_id": result.data[0]["id"],
-        "clabe": clabe
+        "property_id": prop["id"],
+        "clabe": prop["clabe"]
     }
 
 @router.get("/get/property", response_model=PropertyOut)
-def get_property(property_id: str):
+async def get_property(property_id: int):
     # Fetch property by ID
-    response = client.table("properties").select("*").eq("id", property_id).single().execute()
+    prop = await repository.get_property(property_id)
 
-    if not response.data:
+    if not prop:
         raise HTTPException(status_code=404, detail="Property not found")
 
-    return response.data
+    return prop
+
+@router.get("/get/properties", response_model=PropertyBatchOut)
+async def get_properties(property_ids: List[int] = Query(..., min_length=1, max_length=BATCH_MAX_IDS)):
+    # Fetch many properties in one query; ids without a property are reported in "missing"
+    wanted = list(dict.fromkeys(property_ids))
+    rows = await repository.get_properties_by_ids(wanted)
+    items = {row["id"]: row for row in rows}
+    return {"items": items, "missing": [i for i in wanted if i not in items]}
@@ -1,53 +1,67 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from typing import List
+from uuid import UUID
 from datetime import datetime
 from src.api.db.schemas.inputs.user import UserProfileCreate
-from src.api.db.schemas.outputs.user import UserProfileOut
-from src.api.config import client
-from src.api.services.juno import create_clabe_for_user
+from src.api.db.schemas.outputs.user import UserProfileOut, UserProfileBatchOut
+from src.api.config import settings
+from src.api.db.cache import entity_cache
+from src.api.db.repository import get_repository
+from src.api.services.clabes import clabe_reserve, ClabeUnavailable
+from src.api.services.match_maintenance import match_maintainer
 
 router = APIRouter()
+repository = get_repository()
 
-@router.post("/new/user")
-async def create_user_profile(payload: UserProfileCreate):
-    # Check if profile already exists
-    existing = client.table("user_profiles").select("user_id").eq("user_id", str(payload.user_id)).execute()
-    if existing.data:
-        raise HTTPException(status_code=400, detail="User profile already exists")
+BATCH_MAX_IDS = 100
 
-    # Create CLABE from JUNO service
+@router.post("/new/user")
+async def create_user_profile(payload: UserProfileCreate, background_tasks: BackgroundTasks):
+    # Reserve a CLABE, then insert the profile with it; duplicates are detected by the
+    # unique user_id constraint in the same round trip (their CLABE is kept for the next signup)
     try:
-        clabe = await create_clabe_for_user()
-    except Exception as e:
+        profile = await clabe_reserve.insert_with_clabe("user_profiles", {
+            "user_id": str(payload.user_id),
+            "first_name": payload.first_name,
+            "last_name": payload.last_name,
+            "gender": payload.gender,
+            "age": payload.age,
+            "budget_min": payload.budget_min,
+            "budget_max": payload.budget_max,
+            "location_preference": payload.location_preference,
+            "lifestyle_tags": payload.lifestyle_tags,
+            "roomie_preferences": payload.roomie_preferences,
+            "bio": payload.bio,
+            "profile_image_url": payload.profile_image_url,
+            "created_at": datetime.utcnow().isoformat()
+        }, on_conflict="user_id")
+    except ClabeUnavailable as e:
         raise HTTPException(status_code=502, detail=str(e))
+    if profile is None:
+        raise HTTPException(status_code=400, detail="User profile already exists")
+    entity_cache.put("user_profiles", profile["user_id"], profile)
 
-    # Insert user profile into database, with CLABE
-    result = client.table("user_profiles").insert({
-        "user_id": str(payload.user_id),
-        "first_name": payload.first_name,
-        "last_name": payload.last_name,
-        "gender": payload.gender,
-        "age": payload.age,
-        "budget_min": payload.budget_min,
-        "budget_max": payload.budget_max,
-        "location_preference": payload.location_preference,
-        "lifestyle_tags": payload.lifestyle_tags,
-        "roomie_preferences": payload.roomie_preferences,
-        "bio": payload.bio,
-        "profile_image_url": payload.profile_image_url,
-        "created_at": datetime.utcnow().isoformat(),
-        "clabe": clabe
-    }).execute()
+    if settings.MATCH_INCREMENTAL:
+        background_tasks.add_task(match_maintainer.on_profile_write, profile)
 
     return {
         "message": "User profile created",
         "user_id": payload.user_id,
-        "clabe": clabe
+        "clabe": profile["clabe"]
     }
 
 @router.get("/get/user", response_model=UserProfileOut)
-def get_user_profile(user_id: str):
+async def get_user_profile(user_id: str):
     # Fetch user profile
-    response = client.table("user_profiles").select("*").eq("user_id", user_id).single().execute()
-    if not response.data:
+    profile = await repository.get_user_profile(user_id)
+    if not profile:
         raise HTTPException(status_code=404, detail="User profile not found")
-    return response.data
+    return profile
+
+@router.get("/get/users", response_model=UserProfileBatchOut)
+async def get_user_profiles(user_ids: List[UUID] = Query(..., min_length=1, max_length=BATCH_MAX_IDS)):
+    # Fetch many profiles in one query; ids without a profile are reported in "missing"
+    wanted = list(dict.fromkeys(str(u) for u in user_ids))
+    rows = await repository.get_user_profiles_by_user_ids(wanted)
+    items = {str(row["user_id"]): row for row in rows}
+    return {"items": items, "missing": [u for u in wanted if u not in items]}
@@ -1,13 +1,12 @@
 import logging
-from fastapi import APIRouter, HTTPException
+from uuid import UUID
+from fastapi import APIRouter, HTTPException, Header
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, constr, condecimal
-import time
-import hmac
-import hashlib
-import httpx
 
-from src.api.config import settings
+from src.api.core.responses import passthrough
+from src.api.services.juno import exact_postman_body, submit_withdrawal
+from src.api.services.withdrawals import withdrawal_queue, IdempotencyConflict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -15,38 +14,17 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-API_KEY = settings.JUNO_API_KEY
-API_SECRET = settings.JUNO_API_SECRET
-BASE_URL = settings.JUNO_BASE_URL
-
 class WithdrawalRequest(BaseModel):
     address: constr(min_length=10)
     amount: condecimal(gt=0)
     asset: str = "MXNB"
     blockchain: str = "ARBITRUM"
 
-def exact_postman_body(address, amount, asset, blockchain):
-    return (
-        '{"address":"%s","amount":"%s","asset":"%s","blockchain":"%s","compliance":{"travel_rule":{}}}'
-        % (address, amount, asset, blockchain)
-    )
-
-def sign_postman_style(method: str, path: str, body_str: str):
-    nonce = str(int(time.time() * 1000))
-    data = f"{nonce}{method}{path}{body_str}"
-    signature = hmac.new(API_SECRET.encode(), data.encode(), hashlib.sha256).hexdigest()
-    authorization = f"Bitso {API_KEY}:{nonce}:{signature}"
-    return authorization
-
 @router.post("/withdraw")
 async def withdraw_funds(req: WithdrawalRequest):
     try:
         logger.info("Received withdrawal request: %s", req.dict())
 
-        method = "POST"
-        path = "/mint_platform/v1/withdrawals"
-        url = f"{BASE_URL}{path}"
-
         body_str = exact_postman_body(
             req.address,
             str(req.amount),
@@ -55,27 +33,8 @@ async def withdraw_funds(req: WithdrawalRequest):
         )
         logger.info("Constructed request body: %s", body_str)
 
-        authorization = sign_postman_style(method, path, body_str)
-        logger.info("Generated authorization header.")
-
-        headers = {
-            "Authorization": authorization,
-            "Content-Type": "application/json",
-            "User-Agent": "PostmanRuntime/7.44.1",
-            "Accept": "*/*",
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Accept-Encoding": "gzip, deflate, br"
-        }
-        logger.info("Headers prepared for the request.")
-
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
-            logger.info("Sending POST request to %s", url)
-            response = await client.post(
-                url,
-                headers=headers,
-                content=body_str.encode()
-            )
+        logger.info("Sending withdrawal request to Juno")
+        response = await submit_withdrawal(req.address, req.amount, req.asset, req.blockchain)
 
         logger.info("Received response with status code: %d", response.status_code)
         logger.debug("Response content: %s", response.text)
@@ -85,8 +44,49 @@ async def withdraw_funds(req: WithdrawalRequest):
             raise HTTPException(status_code=502, detail=f"Withdrawal failed: {response.text}")
 
         logger.info("Withdrawal successful.")
-        return JSONResponse(status_code=response.status_code, content=response.json())
+        return passthrough(response)
 
     except Exception as e:
         logger.exception("An error occurred during the withdrawal process.")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/withdraw/jobs", status_code=202)
+async def enqueue_withdrawal(
+    req: WithdrawalRequest,
+    idempotency_key: str = Header(..., alias="Idempotency-Key", min_length=8, max_length=255)
+):
+    """Accept a withdrawal for background submission; retries with the same key return the same job."""
+    payload = {
+        "address": req.address,
+        "amount": str(req.amount),
+        "asset": req.asset,
+        "blockchain": req.blockchain,
+    }
+    try:
+        job, created = await withdrawal_queue.enqueue(idempotency_key, payload)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to persist withdrawal job")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return JSONResponse(
+        status_code=202 if created else 200,
+        content={"job_id": job["id"], "status": job["status"], "created": created}
+    )
+
+@router.get("/withdraw/jobs/{job_id}")
+async def get_withdrawal_job(job_id: UUID):
+    job = await withdrawal_queue.get(str(job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Withdrawal job not found")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job.get("attempts"),
+        "error": job.get("error"),
+        "juno_response": job.get("juno_response"),
+        "created_at": job.get("created_at"),
+        "updated_at": job.get("updated_at"),
+    }
@@ -1,13 +1,21 @@
 import httpx
 import json
 import logging
-from typing import Dict, Any, Optional, Tuple, List
+import random
+from typing import TYPE_CHECKING, Dict, Any, Optional, Tuple, List
 
+import orjson
 from pydantic import BaseModel, Field
-from langchain.output_parsers import PydanticOutputParser
-from langchain.prompts import PromptTemplate
+
+if TYPE_CHECKING:
+    # LangChain is slow to import; it is loaded on the first extraction instead (see parser)
+    from langchain.output_parsers import PydanticOutputParser
 
 from src.api.config import settings
+from src.api.core.metrics import cloudflare_transport
+from src.api.core.timing import span
+
+PREFERENCE_FIELDS = ("budget_min", "budget_max", "location_preference", "lifestyle_tags")
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -44,12 +52,16 @@ class CloudflareAIService:
         self.api_token: str = settings.CLOUDFLARE_API_TOKEN
         self.llm_model: str = getattr(settings, "LLM_MODEL", "@cf/openai/gpt-oss-120b")
         self.translation_model: str = getattr(settings, "TRANSLATION_MODEL", self.llm_model)
-        self.base_url: str = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/run"
+        self.base_url: str = f"{settings.CLOUDFLARE_AI_BASE_URL}/accounts/{self.account_id}/ai/run"
+        self._parser: Optional["PydanticOutputParser"] = None
 
-        # Structured parser to enforce JSON schema
-        self.parser: PydanticOutputParser = PydanticOutputParser(
-            pydantic_object=EnhancedPreferenceExtraction
-        )
+    @property
+    def parser(self) -> "PydanticOutputParser":
+        """Structured parser to enforce JSON schema (built on first use)."""
+        if self._parser is None:
+            from langchain.output_parsers import PydanticOutputParser
+            self._parser = PydanticOutputParser(pydantic_object=EnhancedPreferenceExtraction)
+        return self._parser
 
     # ---------- Internal helpers ----------
     async def _make_request(self, model: str, prompt: str) -> Optional[Dict[str, Any]]:
@@ -61,16 +73,26 @@ class CloudflareAIService:
         payload = {"input": prompt}
         url = f"{self.base_url}/{model}"
 
-        logger.info(f"Cloudflare AI endpoint: {url}")
-        logger.info(f"Cloudflare AI payload (truncated): {json.dumps(payload, ensure_ascii=False)[:1000]}")
+        # Payload logging is sampled (or DEBUG only): formatting 1 KB twice per call is not free.
+        # Latency and outcome per model are in GET /metrics.
+        level = logging.DEBUG
+        if settings.AI_LOG_SAMPLE_RATE and random.random() < settings.AI_LOG_SAMPLE_RATE:
+            level = logging.INFO
+        verbose = logger.isEnabledFor(level)
+        if verbose:
+            logger.log(level, f"Cloudflare AI endpoint: {url}")
+            logger.log(level, f"Cloudflare AI payload (truncated): {json.dumps(payload, ensure_ascii=False)[:1000]}")
 
         try:
-            async with httpx.AsyncClient() as client:
+            async with httpx.AsyncClient(transport=cloudflare_transport()) as client:
                 response = await client.post(url, headers=headers, json=payload, timeout=30.0)
-                logger.info(f"Cloudflare AI response status: {response.status_code}")
-                logger.info(f"Cloudflare AI response body (truncated): {response.text[:1000]}")
+                if verbose:
+                    logger.log(level, f"Cloudflare AI response status: {response.status_code}")
+                    logger.log(level, f"Cloudflare AI response body (truncated): {response.text[:1000]}")
+                elif response.is_error:
+                    logger.warning(f"Cloudflare AI {model} returned {response.status_code}: {response.text[:200]}")
                 response.raise_for_status()
-                return response.json()
+                return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Cloudflare AI request failed: {e}")
             return None
@@ -329,6 +351,8 @@ class CloudflareAIService:
         Extract or update housing preferences based on the user prompt.
         Returns (result_dict, success_flag).
         """
+        from langchain.prompts import PromptTemplate
+
         has_existing_prefs = not self._is_empty_profile(current_prefs)
         profile_status = "existing_preferences" if has_existing_prefs else "empty_profile"
         format_instructions = self.parser.get_format_instructions()
@@ -507,18 +531,26 @@ Extract complete preferences with intelligent gap filling:""",
           - ai_enhancements.confidence_scores
           - ai_enhancements.estimated_fields
           - status, fallback_mode, fallback_reason, error, translation_note
+          - extracted_preferences.updated (merged budget/location/tags, on success)
         """
         try:
             # 1) Translation (and language detection)
-            translated_prompt, translation_ok, src_lang = await self.translate_to_english(prompt)
+            with span("ai.translate"):
+                translated_prompt, translation_ok, src_lang = await self.translate_to_english(prompt)
             translation_note = None if translation_ok else "Translation/Lang detection failed or skipped; using original text."
             source_language = (src_lang or "").lower().strip()
 
             # 2) Preference extraction
-            preferences_result, extraction_success = await self.extract_preferences(translated_prompt, current_user)
+            with span("ai.extract"):
+                preferences_result, extraction_success = await self.extract_preferences(translated_prompt, current_user)
 
-            # 3) Slim insights
+            # 3) Slim insights (+ the merged preference fields when extraction worked)
             ai_insights = self._pluck_insights(preferences_result)
+            if extraction_success:
+                updated = preferences_result.get("updated") or {}
+                ai_insights["extracted_preferences"] = {
+                    "updated": {k: updated.get(k) for k in PREFERENCE_FIELDS if updated.get(k) is not None}
+                }
 
             # 4) Status + fallback/error
             status, fallback_mode, fallback_reason, error = self._derive_status(
@@ -533,14 +565,15 @@ Extract complete preferences with intelligent gap filling:""",
             if source_language and not source_language.startswith("en"):
                 to_fix_any = bool(ai_insights.get("suggestions") or ai_insights.get("missing_critical_info"))
                 if to_fix_any:
-                    if ai_insights.get("suggestions"):
-                        ai_insights["suggestions"] = await self._translate_list_to_lang(ai_insights["suggestions"], source_language)
-                        backtranslated = True
-                    if ai_insights.get("missing_critical_info"):
-                        ai_insights["missing_critical_info"] = await self._translate_list_to_lang(
-                            ai_insights["missing_critical_info"], source_language
-                        )
-                        backtranslated = True
+                    with span("ai.translate_back"):
+                        if ai_insights.get("suggestions"):
+                            ai_insights["suggestions"] = await self._translate_list_to_lang(ai_insights["suggestions"], source_language)
+                            backtranslated = True
+                        if ai_insights.get("missing_critical_info"):
+                            ai_insights["missing_critical_info"] = await self._translate_list_to_lang(
+                                ai_insights["missing_critical_info"], source_language
+                            )
+                            backtranslated = True
 
             if backtranslated:
                 # Append note so you can observe when we post-process to match user language
@@ -0,0 +1,130 @@
+"""
+Inverted index over property amenities, for hard-filter preferences.
+
+Amenity strings are normalized to one vocabulary ("Pet Friendly", "mascotas" and
+"pets" all become pet_friendly), then each term maps to the set of property ids
+that have it. Filters become posting-set intersections, smallest first:
+  - all_of: every term must be present (AND)
+  - any_of: at least one term must be present (OR)
+  - location: intersected with the location's posting set
+
+Loaded lazily from `properties` and kept fresh by add()/remove() calls from the
+write paths, the change feed or periodic reloads (property_index.py).
+"""
+import logging
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set, FrozenSet
+
+from src.api.services.property_index import PropertyIndex
+
+logger = logging.getLogger(__name__)
+
+SYNONYMS = {
+    "pets": "pet_friendly",
+    "pet": "pet_friendly",
+    "mascotas": "pet_friendly",
+    "acepta_mascotas": "pet_friendly",
+    "estacionamiento": "parking",
+    "cochera": "parking",
+    "garage": "parking",
+    "wi_fi": "wifi",
+    "internet": "wifi",
+    "lavanderia": "laundry",
+    "aire_acondicionado": "air_conditioning",
+    "ac": "air_conditioning",
+    "balcon": "balcony",
+    "amueblado": "furnished",
+    "gimnasio": "gym",
+    "house": "casa",
+    "apartment": "departamento",
+    "apartamento": "departamento",
+    "depa": "departamento",
+    "flat": "departamento",
+}
+
+
+def normalize_amenity(raw: str) -> str:
+    """Lowercase, strip accents, join words with underscores, then map synonyms."""
+    text = unicodedata.normalize("NFKD", str(raw)).encode("ascii", "ignore").decode()
+    term = "_".join(text.lower().replace("-", " ").split())
+    return SYNONYMS.get(term, term)
+
+
+def preference_filters(prefs: Optional[dict]) -> List[str]:
+    """Hard-filter terms (AND) from a user's roomie_preferences."""
+    if not isinstance(prefs, dict):
+        return []
+    terms = {normalize_amenity(a) for a in prefs.get("amenities") or [] if a}
+    if prefs.get("pet_friendly"):
+        terms.add("pet_friendly")
+    if prefs.get("parking"):
+        terms.add("parking")
+    # property_type is not a filter: listings carry no type term in amenities (and have no type column)
+    return sorted(terms)
+
+
+class AmenityIndex(PropertyIndex):
+    COLUMNS = "id, location, amenities"
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Set[int]] = {}
+        self._by_location: Dict[str, Set[int]] = {}
+        self._entries: Dict[int, tuple] = {}  # property_id -> (location, terms)
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- Maintenance ----------
+    def add(self, property_id: int, location: Optional[str], amenities: Optional[Iterable[str]]) -> None:
+        self._write(property_id, {"location": location, "amenities": amenities})
+
+    def _empty(self) -> Dict[str, Any]:
+        return {"_postings": {}, "_by_location": {}, "_entries": {}}
+
+    def _add(self, property_id: int, row: Dict[str, Any]) -> None:
+        self._remove(property_id)
+        loc = (row.get("location") or "").strip().upper()
+        terms: FrozenSet[str] = frozenset(normalize_amenity(a) for a in row.get("amenities") or [] if a)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(property_id)
+        self._by_location.setdefault(loc, set()).add(property_id)
+        self._entries[property_id] = (loc, terms)
+
+    def _remove(self, property_id: int) -> None:
+        entry = self._entries.pop(property_id, None)
+        if entry:
+            loc, terms = entry
+            for term in terms:
+                self._postings[term].discard(property_id)
+            self._by_location[loc].discard(property_id)
+
+    def _load(self, page_size: int = 1000) -> None:
+        super()._load(page_size)
+        logger.info("Amenity index has %d terms", len(self._postings))
+
+    # ---------- Queries ----------
+    def postings(self, term: str) -> Set[int]:
+        return self._postings.get(normalize_amenity(term), set())
+
+    def match(self, all_of: Iterable[str] = (), any_of: Iterable[str] = (), location: Optional[str] = None) -> Set[int]:
+        """Ids of properties with every all_of term, at least one any_of term, in location if given."""
+        sets = [self.postings(t) for t in all_of]
+        any_terms = list(any_of)
+        if any_terms:
+            sets.append(set().union(*(self.postings(t) for t in any_terms)))
+        if location is not None:
+            sets.append(self._by_location.get(location.strip().upper(), set()))
+        if not sets:
+            return set(self._entries)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            if not result:
+                break
+            result &= s
+        return result
+
+
+# Create global instance
+amenity_index = AmenityIndex()
@@ -0,0 +1,198 @@
+"""
+Interval index over property availability windows (available_from, available_to).
+
+One interval tree per location, implemented as a treap keyed by start date and
+augmented with the max end date of each subtree:
+  - insert / remove: O(log n) expected
+  - overlapping(start, end): O(log n + k); subtrees whose max end is before the
+    query start, or whose starts are all after the query end, are never visited
+
+Loaded lazily from `properties` and kept fresh by add()/remove() calls from the
+write paths, the change feed or periodic reloads (property_index.py). Listings
+without available_to are treated as open-ended.
+"""
+import logging
+import random
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from src.api.db.schemas.inputs.preferences import MoveInRange
+from src.api.services.property_index import PropertyIndex
+
+logger = logging.getLogger(__name__)
+
+OPEN_END = date.max.toordinal()
+DateLike = Union[date, datetime, str, None]
+
+
+def to_ordinal(value: DateLike, default: Optional[int] = None) -> Optional[int]:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal()
+
+
+def move_in_range(user: dict) -> Optional[MoveInRange]:
+    """The profile's roomie_preferences.move_in_range, or None when absent, malformed or inverted."""
+    raw = (user.get("roomie_preferences") or {}).get("move_in_range")
+    if not raw:
+        return None
+    try:
+        move_in = MoveInRange(**raw)
+    except (TypeError, ValidationError):
+        logger.warning(f"Ignoring malformed move_in_range for user {user.get('user_id')}")
+        return None
+    return move_in if move_in.start <= move_in.end else None
+
+
+class _Node:
+    __slots__ = ("key", "end", "max_end", "priority", "left", "right")
+
+    def __init__(self, key: Tuple[int, int], end: int) -> None:
+        self.key = key  # (start, property_id)
+        self.end = end
+        self.max_end = end
+        self.priority = random.random()
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+    def update(self) -> None:
+        self.max_end = self.end
+        if self.left and self.left.max_end > self.max_end:
+            self.max_end = self.left.max_end
+        if self.right and self.right.max_end > self.max_end:
+            self.max_end = self.right.max_end
+
+
+def _rotate_right(node: _Node) -> _Node:
+    left = node.left
+    node.left, left.right = left.right, node
+    node.update()
+    left.update()
+    return left
+
+
+def _rotate_left(node: _Node) -> _Node:
+    right = node.right
+    node.right, right.left = right.left, node
+    node.update()
+    right.update()
+    return right
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if new.key < node.key:
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            node = _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            node = _rotate_left(node)
+    node.update()
+    return node
+
+
+def _remove(node: Optional[_Node], key: Tuple[int, int]) -> Optional[_Node]:
+    if node is None:
+        return None
+    if key < node.key:
+        node.left = _remove(node.left, key)
+    elif key > node.key:
+        node.right = _remove(node.right, key)
+    else:
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        if node.left.priority > node.right.priority:
+            node = _rotate_right(node)
+            node.right = _remove(node.right, key)
+        else:
+            node = _rotate_left(node)
+            node.left = _remove(node.left, key)
+    node.update()
+    return node
+
+
+class IntervalTree:
+    def __init__(self) -> None:
+        self.root: Optional[_Node] = None
+        self.size = 0
+
+    def insert(self, start: int, end: int, property_id: int) -> None:
+        self.root = _insert(self.root, _Node((start, property_id), end))
+        self.size += 1
+
+    def remove(self, start: int, property_id: int) -> None:
+        self.root = _remove(self.root, (start, property_id))
+        self.size -= 1
+
+    def overlapping(self, q_start: int, q_end: int) -> List[int]:
+        out: List[int] = []
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end < q_start:
+                continue
+            stack.append(node.left)
+            if node.key[0] <= q_end:
+                if node.end >= q_start:
+                    out.append(node.key[1])
+                stack.append(node.right)
+        return out
+
+
+class AvailabilityIndex(PropertyIndex):
+    COLUMNS = "id, location, available_from, available_to"
+
+    def __init__(self) -> None:
+        self._trees: Dict[str, IntervalTree] = {}
+        self._entries: Dict[int, Tuple[str, int]] = {}  # property_id -> (location, start)
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- Maintenance ----------
+    def add(self, property_id: int, location: Optional[str], available_from: DateLike, available_to: DateLike) -> None:
+        self._write(property_id, {"location": location, "available_from": available_from, "available_to": available_to})
+
+    def _empty(self) -> Dict[str, Any]:
+        return {"_trees": {}, "_entries": {}}
+
+    def _add(self, property_id: int, row: Dict[str, Any]) -> None:
+        self._remove(property_id)
+        start = to_ordinal(row.get("available_from"))
+        if start is None:
+            return
+        end = to_ordinal(row.get("available_to"), OPEN_END)
+        loc = (row.get("location") or "").strip().upper()
+        self._trees.setdefault(loc, IntervalTree()).insert(start, end, property_id)
+        self._entries[property_id] = (loc, start)
+
+    def _remove(self, property_id: int) -> None:
+        entry = self._entries.pop(property_id, None)
+        if entry:
+            loc, start = entry
+            self._trees[loc].remove(start, property_id)
+
+    # ---------- Queries ----------
+    def overlapping(self, start: DateLike, end: DateLike, location: Optional[str] = None) -> List[int]:
+        """Ids of listings whose availability overlaps [start, end], optionally in one location."""
+        q_start, q_end = to_ordinal(start), to_ordinal(end)
+        if location is not None:
+            tree = self._trees.get(location.strip().upper())
+            return tree.overlapping(q_start, q_end) if tree else []
+        return [pid for tree in self._trees.values() for pid in tree.overlapping(q_start, q_end)]
+
+
+# Create global instance
+availability_index = AvailabilityIndex()
@@ -0,0 +1,254 @@
+"""
+Batch matchmaking: top roommate and property matches for many users at once.
+
+match_top answers one user per request and fetches that user's candidates every
+time. Users in the same location draw from the same pools, so the batch path:
+
+  1) loads the requested profiles (ID_CHUNK per query) and groups them by
+     normalized location_preference
+  2) fetches each location's roommate and property pools once, covering the
+     union of the group's budget ranges (repository.find_*_pool)
+  3) scores every user in the group against the whole pool as a matrix: tags
+     and amenities become multi-hot rows over one vocabulary, so all Jaccard
+     intersections are one matrix product; budget and price scores broadcast
+  4) applies each user's own filters as a mask (budget overlap and self for
+     roommates; price, "available now" or move-in window and required amenities
+     for properties) and keeps the top_k per user
+
+Scores use the float expressions of scoring.py, and ranking uses the rounded
+score with ties in id order, so results match match_top with stored preferences
+(MATCH_SCORING=python) up to the order of tied candidates. AI prompts and
+proximity search are per-request features and are not part of the batch path.
+
+Results are yielded per user as soon as their location is scored, which lets
+POST /matchmaking/match/batch stream them as NDJSON. The same generator runs
+from the command line:
+
+    python -m src.api.services.batch_matching --top-k 5 <user_id> [<user_id> ...]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from src.api.db.repository import ID_CHUNK, get_repository
+from src.api.services.amenity_index import amenity_index, preference_filters
+from src.api.services.availability_index import availability_index, move_in_range
+from src.api.services.candidate_snapshot import to_epoch
+from src.api.services.scoring import round_score
+
+logger = logging.getLogger(__name__)
+
+# Users scored per matrix block: keeps users x candidates at about this many cells
+BLOCK_CELLS = 2_000_000
+
+
+def _preferences(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Normalized matching inputs, or None when the profile can't be matched (same check as match_top)."""
+    location = user.get("location_preference")
+    if location:
+        location = location.strip().upper()
+    if not all([user.get("budget_min"), user.get("budget_max"), location]):
+        return None
+    return {
+        "user_id": str(user["user_id"]),
+        "location": location,
+        "budget_min": float(user["budget_min"]),
+        "budget_max": float(user["budget_max"]),
+        "tags": set(user.get("lifestyle_tags") or []),
+        "move_in": move_in_range(user),
+        "required_amenities": preference_filters(user.get("roomie_preferences")),
+    }
+
+
+class _Vocabulary:
+    """Column index per tag, shared by the users and both pools of one location."""
+
+    def __init__(self, tag_sets: Iterable[Set[str]]) -> None:
+        self.columns: Dict[str, int] = {}
+        for tags in tag_sets:
+            for tag in tags:
+                self.columns.setdefault(tag, len(self.columns))
+
+    def matrix(self, tag_sets: List[Set[str]]) -> np.ndarray:
+        # float32 holds 0/1 and tag counts exactly, and BLAS multiplies it fastest
+        out = np.zeros((len(tag_sets), max(1, len(self.columns))), dtype=np.float32)
+        for row, tags in enumerate(tag_sets):
+            for tag in tags:
+                out[row, self.columns[tag]] = 1
+        return out
+
+
+def _jaccard(users: np.ndarray, user_counts: np.ndarray, pool: np.ndarray, pool_counts: np.ndarray) -> np.ndarray:
+    """users x pool Jaccard matrix; 0 where either side has no tags (scoring.jaccard)."""
+    inter = (users @ pool.T).astype(np.float64)
+    union = user_counts[:, None] + pool_counts[None, :] - inter
+    both = (user_counts[:, None] > 0) & (pool_counts[None, :] > 0)
+    return np.divide(inter, union, out=np.zeros_like(inter), where=both)
+
+
+def top_rows(scores: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Positions of the best `limit` scores, ranked like match_top: by round_score()
+    (Python round), ties in input order. Also used by group_matching. np.round can differ from round() by one
+    unit on halves, so the numpy cut keeps a 0.001 margin and only the rows that
+    survive it are rounded and sorted in Python.
+    """
+    if len(scores) > limit:
+        threshold = scores[np.argpartition(-scores, limit - 1)[:limit]].min()
+        rows = np.flatnonzero(scores >= threshold - 0.001)
+    else:
+        rows = np.arange(len(scores))
+    rounded = [round_score(float(s)) for s in scores[rows]]
+    order = sorted(range(len(rows)), key=lambda i: -rounded[i])[:limit]
+    return rows[order]
+
+
+def score_location(users: List[Dict[str, Any]], roommates: List[Dict[str, Any]], properties: List[Dict[str, Any]],
+                   top_k: int, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """
+    Top matches for every user of one location against that location's pools.
+    `users` are _preferences() dicts; pool rows are shared across users and are
+    copied into the results, never modified.
+    """
+    now = now or datetime.utcnow()
+    user_tags = [u["tags"] for u in users]
+    rm_tags = [set(r.get("lifestyle_tags") or []) for r in roommates]
+    prop_tags = [set(p.get("amenities") or []) for p in properties]
+    vocabulary = _Vocabulary([*user_tags, *rm_tags, *prop_tags])
+
+    u_matrix = vocabulary.matrix(user_tags)
+    u_counts = u_matrix.sum(axis=1, dtype=np.float64)
+    u_min = np.array([u["budget_min"] for u in users], dtype=np.float64)
+    u_max = np.array([u["budget_max"] for u in users], dtype=np.float64)
+    u_avg = (u_min + u_max) / 2
+
+    rm_matrix = vocabulary.matrix(rm_tags)
+    rm_counts = rm_matrix.sum(axis=1, dtype=np.float64)
+    rm_min = np.array([r["budget_min"] for r in roommates], dtype=np.float64)
+    rm_max = np.array([r["budget_max"] for r in roommates], dtype=np.float64)
+    rm_avg = (rm_min + rm_max) / 2
+    rm_user_ids = np.array([str(r["user_id"]) for r in roommates], dtype=object)
+
+    prop_matrix = vocabulary.matrix(prop_tags)
+    prop_counts = prop_matrix.sum(axis=1, dtype=np.float64)
+    prices = np.array([p["price"] for p in properties], dtype=np.float64)
+    prop_ids = np.array([p["id"] for p in properties], dtype=np.int64)
+    available_now = np.array([to_epoch(p.get("available_from")) for p in properties], dtype=np.float64) <= to_epoch(now)
+
+    location = users[0]["location"] if users else None
+    results: List[Dict[str, Any]] = []
+    block = max(1, BLOCK_CELLS // max(1, len(roommates), len(properties)))
+    for start in range(0, len(users), block):
+        rows = slice(start, start + block)
+
+        # Roommates: 0.5 * budget_score + 0.5 * jaccard(lifestyle_tags)
+        avg = u_avg[rows, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            budget = np.where(rm_avg != 0, 1 - np.abs(avg - rm_avg) / np.maximum(avg, rm_avg), 0)
+        rm_scores = 0.5 * budget + 0.5 * _jaccard(u_matrix[rows], u_counts[rows], rm_matrix, rm_counts)
+        rm_keep = (rm_max >= u_min[rows, None]) & (rm_min <= u_max[rows, None])
+
+        # Properties: 0.7 * price_score + 0.3 * jaccard(lifestyle_tags, amenities)
+        price = 1 - np.abs(avg - prices) / u_max[rows, None]
+        prop_scores = 0.7 * price + 0.3 * _jaccard(u_matrix[rows], u_counts[rows], prop_matrix, prop_counts)
+        prop_keep = (prices >= u_min[rows, None]) & (prices <= u_max[rows, None])
+
+        for offset, user in enumerate(users[rows]):
+            rm_row = rm_keep[offset] & (rm_user_ids != user["user_id"])
+            prop_row = prop_keep[offset]
+            if user["move_in"] is not None:
+                overlapping = availability_index.ensure_loaded().overlapping(user["move_in"].start, user["move_in"].end, location)
+                prop_row = prop_row & np.isin(prop_ids, np.fromiter(overlapping, dtype=np.int64, count=len(overlapping)))
+            else:
+                prop_row = prop_row & available_now
+            if user["required_amenities"]:
+                with_amenities = amenity_index.ensure_loaded().match(all_of=user["required_amenities"], location=location)
+                prop_row = prop_row & np.isin(prop_ids, np.fromiter(with_amenities, dtype=np.int64, count=len(with_amenities)))
+
+            rm_rows = np.flatnonzero(rm_row)
+            prop_rows = np.flatnonzero(prop_row)
+            rm_top = rm_rows[top_rows(rm_scores[offset, rm_rows], top_k)]
+            prop_top = prop_rows[top_rows(prop_scores[offset, prop_rows], top_k)]
+            results.append({
+                "user_id": user["user_id"],
+                "location": location,
+                "roommate_matches": [{**roommates[i], "score": round_score(float(rm_scores[offset, i]))} for i in rm_top],
+                "property_matches": [{**properties[i], "score": round_score(float(prop_scores[offset, i]))} for i in prop_top],
+            })
+    return results
+
+
+async def match_users(repository, user_ids: Iterable[str], top_k: int = 5) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield one result per distinct user_id: matches, or {"user_id", "error"} when the
+    profile is missing, incomplete, or its location's pools could not be fetched.
+    """
+    started = time.perf_counter()
+    wanted = list(dict.fromkeys(str(u) for u in user_ids))
+    profiles: Dict[str, Dict[str, Any]] = {}
+    for i in range(0, len(wanted), ID_CHUNK):
+        for row in await repository.get_user_profiles_by_user_ids(wanted[i:i + ID_CHUNK]):
+            profiles[str(row["user_id"])] = row
+
+    by_location: Dict[str, List[Dict[str, Any]]] = {}
+    for user_id in wanted:
+        profile = profiles.get(user_id)
+        if profile is None:
+            yield {"user_id": user_id, "error": "User not found"}
+            continue
+        prefs = _preferences(profile)
+        if prefs is None:
+            yield {"user_id": user_id, "error": "User profile is missing required fields"}
+            continue
+        by_location.setdefault(prefs["location"], []).append(prefs)
+
+    now = datetime.utcnow()
+    for location, users in by_location.items():
+        budget_min = min(u["budget_min"] for u in users)
+        budget_max = max(u["budget_max"] for u in users)
+        try:
+            # Whole-location scans: the repository runs these (and the profile lookups) in worker threads
+            roommates = await repository.find_roommate_pool(location, budget_min, budget_max)
+            properties = await repository.find_property_pool(location, budget_min, budget_max)
+        except Exception as e:
+            logger.error(f"Error fetching candidate pools for {location}: {e}")
+            for user in users:
+                yield {"user_id": user["user_id"], "error": "Failed to fetch candidates"}
+            continue
+        # Scoring is CPU-bound: keep the event loop free for other requests meanwhile
+        for result in await asyncio.to_thread(score_location, users, roommates, properties, top_k, now):
+            yield result
+
+    logger.info(
+        "Batch matched %d users in %d locations in %.2fs",
+        sum(len(u) for u in by_location.values()), len(by_location), time.perf_counter() - started,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Top matches for many users, one JSON line per user")
+    parser.add_argument("user_ids", nargs="*", help="user_ids to match (default: read one per line from stdin)")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    user_ids = args.user_ids
+    if not user_ids:
+        user_ids = [line.strip() for line in sys.stdin if line.strip()]
+
+    async def run() -> None:
+        async for result in match_users(get_repository(), user_ids, top_k=args.top_k):
+            print(json.dumps(result, default=str))
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
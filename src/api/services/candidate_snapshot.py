@@ -0,0 +1,362 @@
+"""
+Array-backed, per-location candidate snapshot shared by all API workers.
+
+The multi-worker launcher (src/serve.py) builds the snapshot once in the parent and
+publishes it as plain .npy files. Each worker memory-maps those files read-only, so
+every worker reads the same physical pages from the OS page cache, and no worker
+holds a private copy as Python dicts. On Linux the default SNAPSHOT_DIR lives on
+/dev/shm, so the files are backed by shared memory.
+
+Layout of one generation (published atomically by renaming CURRENT):
+
+  <SNAPSHOT_DIR>/CURRENT                       name of the live generation
+  <SNAPSHOT_DIR>/gen-<ms>/manifest.json        {"tags": [...], "shards": {location: {dir, profiles, properties}}}
+  <SNAPSHOT_DIR>/gen-<ms>/<dir>/profiles.*.npy    id, user_id, budget_min, budget_max, tags
+  <SNAPSHOT_DIR>/gen-<ms>/<dir>/properties.*.npy  id, price, available_from, tags
+
+Shards are keyed by the stored location string (the same equality match the
+repository uses). Tags and amenities are bitmasks over one vocabulary, as in
+group_formation. The snapshot only selects candidates. With
+MATCH_SCORING=snapshot, match_top scores whole pools here in one vectorized pass,
+fetches the full rows of the few winners, and rescores them with scoring.py. Rows
+created after the last build are picked up on the next refresh
+(SNAPSHOT_REFRESH_SECONDS).
+"""
+import bisect
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.api.config import settings, client
+from src.api.services.group_formation import _popcount
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+PROFILE_COLUMNS = ("id", "user_id", "budget_min", "budget_max", "tags")
+PROPERTY_COLUMNS = ("id", "price", "available_from", "tags")
+
+
+def to_epoch(value: Any) -> float:
+    """Naive-UTC seconds for an ISO timestamp / datetime; NaN for missing (never passes a <= filter, like SQL NULL)."""
+    if value is None:
+        return float("nan")
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH).total_seconds()
+
+
+def _scan(table: str, columns: str, page_size: int) -> Iterable[Dict[str, Any]]:
+    last_id = 0
+    while True:
+        page = client.table(table) \
+            .select(columns) \
+            .gt("id", last_id) \
+            .order("id") \
+            .limit(page_size) \
+            .execute().data or []
+        yield from page
+        if len(page) < page_size:
+            break
+        last_id = page[-1]["id"]
+
+
+class TagVocabulary:
+    def __init__(self, tags: Iterable[str] = ()) -> None:
+        self.tags: List[str] = []
+        self.bits: Dict[str, int] = {}
+        for tag in tags:
+            self.add(tag)
+
+    def add(self, tag: str) -> None:
+        if tag not in self.bits:
+            self.bits[tag] = len(self.tags)
+            self.tags.append(tag)
+
+    @property
+    def words(self) -> int:
+        return max(1, -(-len(self.tags) // 64))
+
+    def masks(self, tag_sets: List[Set[str]]) -> np.ndarray:
+        masks = np.zeros((len(tag_sets), self.words), dtype=np.uint64)
+        for i, tags in enumerate(tag_sets):
+            for tag in tags:
+                bit = self.bits[tag]
+                masks[i, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return masks
+
+    def query(self, tags: Set[str]) -> np.ndarray:
+        """Mask for a query tag set; tags outside the vocabulary can't intersect and are dropped here."""
+        return self.masks([{t for t in tags if t in self.bits}])[0]
+
+
+# ---------- Building (launcher / CLI) ----------
+def build_snapshot(directory: Optional[str] = None, page_size: int = 1000, keep: int = 2) -> Dict[str, Any]:
+    """Scan profiles and properties, write a new generation and make it current. Returns the manifest."""
+    return write_snapshot(
+        _scan("user_profiles", "id, user_id, location_preference, budget_min, budget_max, lifestyle_tags", page_size),
+        _scan("properties", "id, location, price, available_from, amenities", page_size),
+        directory or settings.SNAPSHOT_DIR,
+        keep,
+    )
+
+
+def write_snapshot(profile_rows: Iterable[Dict[str, Any]], property_rows: Iterable[Dict[str, Any]],
+                   directory: str, keep: int = 2) -> Dict[str, Any]:
+    """Write rows (ordered by id) as a new generation and make it current."""
+    started = time.perf_counter()
+    profiles: Dict[str, List[Dict[str, Any]]] = {}
+    properties: Dict[str, List[Dict[str, Any]]] = {}
+    vocabulary = TagVocabulary()
+
+    for row in profile_rows:
+        if row.get("location_preference") is None or row.get("budget_min") is None or row.get("budget_max") is None:
+            continue  # can never pass the candidate filters
+        tags = set(row.get("lifestyle_tags") or [])
+        for tag in tags:
+            vocabulary.add(tag)
+        profiles.setdefault(row["location_preference"], []).append({**row, "tags": tags})
+
+    for row in property_rows:
+        if row.get("location") is None or row.get("price") is None:
+            continue
+        tags = set(row.get("amenities") or [])
+        for tag in tags:
+            vocabulary.add(tag)
+        properties.setdefault(row["location"], []).append({**row, "tags": tags})
+
+    generation = f"gen-{int(time.time() * 1000)}"
+    root = os.path.join(directory, generation)
+    os.makedirs(root)
+    shards: Dict[str, Dict[str, Any]] = {}
+    for n, location in enumerate(sorted(set(profiles) | set(properties))):
+        shard_dir = f"shard-{n:05d}"
+        os.makedirs(os.path.join(root, shard_dir))
+        pool = profiles.get(location, [])
+        listings = properties.get(location, [])
+        _write(root, shard_dir, "profiles", {
+            "id": np.array([r["id"] for r in pool], dtype=np.int64),
+            "user_id": np.array([str(r["user_id"]) for r in pool], dtype="S36"),
+            "budget_min": np.array([r["budget_min"] for r in pool], dtype=np.float64),
+            "budget_max": np.array([r["budget_max"] for r in pool], dtype=np.float64),
+            "tags": vocabulary.masks([r["tags"] for r in pool]),
+        })
+        _write(root, shard_dir, "properties", {
+            "id": np.array([r["id"] for r in listings], dtype=np.int64),
+            "price": np.array([r["price"] for r in listings], dtype=np.float64),
+            "available_from": np.array([to_epoch(r.get("available_from")) for r in listings], dtype=np.float64),
+            "tags": vocabulary.masks([r["tags"] for r in listings]),
+        })
+        shards[location] = {"dir": shard_dir, "profiles": len(pool), "properties": len(listings)}
+
+    manifest = {
+        "generation": generation,
+        "built_at": datetime.utcnow().isoformat(),
+        "build_seconds": round(time.perf_counter() - started, 3),
+        "tags": vocabulary.tags,
+        "shards": shards,
+    }
+    with open(os.path.join(root, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    # Publish: readers only ever see a complete generation
+    pointer = os.path.join(directory, "CURRENT")
+    with open(pointer + ".tmp", "w") as f:
+        f.write(generation)
+    os.replace(pointer + ".tmp", pointer)
+
+    # Old generations stay readable by workers that still map them (unlink keeps open mappings valid)
+    generations = sorted(d for d in os.listdir(directory) if d.startswith("gen-"))
+    for old in generations[:-keep]:
+        shutil.rmtree(os.path.join(directory, old), ignore_errors=True)
+
+    logger.info(
+        "Candidate snapshot %s built in %.1fs: %d locations, %d tags",
+        generation, manifest["build_seconds"], len(shards), len(vocabulary.tags),
+    )
+    return manifest
+
+
+def _write(root: str, shard_dir: str, kind: str, columns: Dict[str, np.ndarray]) -> None:
+    for name, array in columns.items():
+        np.save(os.path.join(root, shard_dir, f"{kind}.{name}.npy"), array)
+
+
+# ---------- Reading (API workers) ----------
+@dataclass
+class Shard:
+    profiles: Dict[str, np.ndarray]
+    properties: Dict[str, np.ndarray]
+
+
+class CandidateSnapshot:
+    def __init__(self, directory: str, check_seconds: float = 5.0) -> None:
+        self.directory = directory
+        self.check_seconds = check_seconds
+        self.generation: Optional[str] = None
+        self.manifest: Dict[str, Any] = {}
+        self.vocabulary = TagVocabulary()
+        self._shards: Dict[str, Shard] = {}
+        self._checked_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        self._refresh()
+        return self.generation is not None
+
+    def _refresh(self) -> None:
+        """Switch to a newer generation if the launcher published one (checked at most every check_seconds)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return
+        self._checked_at = now
+        try:
+            with open(os.path.join(self.directory, "CURRENT")) as f:
+                generation = f.read().strip()
+        except FileNotFoundError:
+            return
+        if generation == self.generation:
+            return
+        with open(os.path.join(self.directory, generation, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.manifest = manifest
+        self.vocabulary = TagVocabulary(manifest["tags"])
+        self._shards = {}
+        self.generation = generation
+        logger.info("Using candidate snapshot %s", generation)
+
+    def shard(self, location: str) -> Optional[Shard]:
+        self._refresh()
+        shard = self._shards.get(location)
+        if shard is None:
+            entry = self.manifest.get("shards", {}).get(location)
+            if entry is None:
+                return None
+            root = os.path.join(self.directory, self.generation, entry["dir"])
+
+            def load(kind: str, columns: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+                return {c: np.load(os.path.join(root, f"{kind}.{c}.npy"), mmap_mode="r") for c in columns}
+
+            shard = Shard(profiles=load("profiles", PROFILE_COLUMNS), properties=load("properties", PROPERTY_COLUMNS))
+            self._shards[location] = shard
+        return shard
+
+    def locations(self) -> List[str]:
+        self._refresh()
+        return list(self.manifest.get("shards", {}))
+
+    def touch(self, locations: Iterable[str]) -> int:
+        """Map and read through the given shards so their pages are resident; returns bytes touched."""
+        touched = 0
+        for location in locations:
+            shard = self.shard(location)
+            if shard is None:
+                continue
+            for column in (*shard.profiles.values(), *shard.properties.values()):
+                touched += int(np.asarray(column).nbytes)
+                np.asarray(column).view(np.uint8).sum()
+        return touched
+
+    # ---------- Candidate selection ----------
+    def _tag_scores(self, masks: np.ndarray, tags: Set[str]) -> np.ndarray:
+        """Jaccard(tags, row tags) per row; tags outside the vocabulary still count towards the union."""
+        counts = _popcount(masks)
+        inter = _popcount(masks & self.vocabulary.query(tags))
+        union = counts + len(tags) - inter
+        both = (counts > 0) & (len(tags) > 0)
+        return np.divide(inter, union, out=np.zeros(len(masks)), where=both)
+
+    def top_roommates(self, user_id: str, location: str, budget_min: float, budget_max: float,
+                      lifestyle_tags: Set[str], limit: int) -> List[int]:
+        """user_profiles ids of the best `limit` candidates (scoring.roommate_score_raw, vectorized)."""
+        shard = self.shard(location)
+        if shard is None or not len(shard.profiles["id"]):
+            return []
+        p = shard.profiles
+        keep = (p["user_id"] != str(user_id).encode()) & (p["budget_max"] >= budget_min) & (p["budget_min"] <= budget_max)
+        rows = np.flatnonzero(keep)
+        if not len(rows):
+            return []
+
+        rm_avg = (p["budget_min"][rows] + p["budget_max"][rows]) / 2
+        user_avg = (budget_min + budget_max) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            budget_score = np.where(rm_avg != 0, 1 - np.abs(user_avg - rm_avg) / np.maximum(user_avg, rm_avg), 0)
+        scores = 0.5 * budget_score + 0.5 * self._tag_scores(p["tags"][rows], lifestyle_tags)
+        return _top_ids(p["id"][rows], scores, limit)
+
+    def top_properties(self, location: Optional[str], budget_min: float, budget_max: float,
+                       lifestyle_tags: Set[str], available_before: Optional[datetime],
+                       ids: Optional[Set[int]], limit: int) -> List[int]:
+        """properties ids of the best `limit` candidates (scoring.property_score_raw, vectorized).
+        location=None searches every shard (proximity search); ids restricts to a pre-filtered set."""
+        shards = [self.shard(location)] if location is not None else [self.shard(loc) for loc in self.locations()]
+        wanted = np.fromiter(ids, dtype=np.int64, count=len(ids)) if ids is not None else None
+        cutoff = to_epoch(available_before) if available_before is not None else None
+
+        all_ids, all_scores = [], []
+        for shard in shards:
+            if shard is None or not len(shard.properties["id"]):
+                continue
+            p = shard.properties
+            keep = (p["price"] >= budget_min) & (p["price"] <= budget_max)
+            if cutoff is not None:
+                keep &= p["available_from"] <= cutoff
+            if wanted is not None:
+                keep &= np.isin(p["id"], wanted)
+            rows = np.flatnonzero(keep)
+            if not len(rows):
+                continue
+            price_score = 1 - np.abs(((budget_min + budget_max) / 2) - p["price"][rows]) / budget_max
+            all_scores.append(0.7 * price_score + 0.3 * self._tag_scores(p["tags"][rows], lifestyle_tags))
+            all_ids.append(p["id"][rows])
+        if not all_ids:
+            return []
+        found, scores = np.concatenate(all_ids), np.concatenate(all_scores)
+        by_id = np.argsort(found, kind="stable")  # shards interleave ids; tie order must not depend on sharding
+        return _top_ids(found[by_id], scores[by_id], limit)
+
+
+def _top_ids(ids: np.ndarray, scores: np.ndarray, limit: int) -> List[int]:
+    # Rank on the rounded score (like match_top); stable sort keeps id order on ties
+    if len(scores) > limit:
+        part = np.argpartition(-scores, limit - 1)[:limit]
+        threshold = np.round(scores[part], 3).min()
+        part = np.flatnonzero(np.round(scores, 3) >= threshold)  # keep every row tied at the cut
+    else:
+        part = np.arange(len(scores))
+    order = part[np.argsort(-np.round(scores[part], 3), kind="stable")][:limit]
+    return [int(i) for i in ids[order]]
+
+
+# ---------- Location routing ----------
+class HashRing:
+    """Consistent hashing of locations onto workers; adding a worker moves ~1/N of the locations."""
+
+    def __init__(self, nodes: Iterable[Any], replicas: int = 64) -> None:
+        self._ring: List[Tuple[int, Any]] = sorted(
+            (self._hash(f"{node}#{r}"), node) for node in nodes for r in range(replicas)
+        )
+        self._keys = [h for h, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def node_for(self, key: str) -> Any:
+        i = bisect.bisect(self._keys, self._hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+
+# Create global instance
+candidate_snapshot = CandidateSnapshot(settings.SNAPSHOT_DIR, check_seconds=settings.SNAPSHOT_CHECK_SECONDS)
@@ -0,0 +1,233 @@
+"""
+Postgres LISTEN/NOTIFY change feed for cache and index invalidation.
+
+Triggers from src/api/db/sql/change_feed.sql notify channel 'roomfi_changes' on
+every row change in user_profiles, properties and landlord_profile, including
+writes that bypass our routers (other services, the Supabase dashboard). This
+module keeps one dedicated asyncpg connection LISTENing on that channel and turns
+each payload into a typed event:
+
+  ProfileChanged / PropertyChanged / LandlordChanged (table, op, id, row)
+  FeedReset: published on every (re)connect; notifications sent while we were
+             disconnected are lost, so subscribers must drop or reload state
+
+Subscribers register per event type (subscribing to ChangeEvent receives all row
+events). Events are dispatched in order from a single queue; handlers may be plain
+functions or coroutines, and a failing handler is logged without stopping the feed.
+"""
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+
+from src.api.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "roomfi_changes"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    table: str
+    op: str  # INSERT / UPDATE / DELETE
+    id: Any
+    row: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def deleted(self) -> bool:
+        return self.op == "DELETE"
+
+
+@dataclass(frozen=True)
+class ProfileChanged(ChangeEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class PropertyChanged(ChangeEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class LandlordChanged(ChangeEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class FeedReset:
+    reason: str
+
+
+EVENT_TYPES: Dict[str, Type[ChangeEvent]] = {
+    "user_profiles": ProfileChanged,
+    "properties": PropertyChanged,
+    "landlord_profile": LandlordChanged,
+}
+
+
+def parse_notification(payload: str) -> ChangeEvent:
+    data = json.loads(payload)
+    event_type = EVENT_TYPES.get(data["table"], ChangeEvent)
+    return event_type(table=data["table"], op=data["op"], id=data.get("id"), row=data.get("row") or {})
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """DATABASE_URL is a SQLAlchemy URL (postgresql+asyncpg://...); asyncpg wants plain postgresql://."""
+    scheme, sep, rest = database_url.partition("://")
+    return f"{scheme.split('+')[0]}{sep}{rest}"
+
+
+class ChangeFeed:
+    def __init__(self, dsn: Optional[str] = None, channel: str = CHANNEL, max_backoff: float = 30.0) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.max_backoff = max_backoff
+        self._subscribers: List[Tuple[type, Callable[[Any], Any]]] = []
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+        self.events_received = 0
+
+    # ---------- Subscriptions ----------
+    def subscribe(self, event_type: type, handler: Callable[[Any], Any]) -> None:
+        self._subscribers.append((event_type, handler))
+
+    async def publish(self, event: Any) -> None:
+        for event_type, handler in self._subscribers:
+            if not isinstance(event, event_type):
+                continue
+            try:
+                result = handler(event)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception:
+                logger.exception("Change feed handler %r failed on %r", handler, event)
+
+    # ---------- Lifecycle ----------
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping = False
+        self._tasks = [asyncio.create_task(self._listen()), asyncio.create_task(self._dispatch())]
+        logger.info("Change feed listening on %s", self.channel)
+
+    async def stop(self) -> None:
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _dispatch(self) -> None:
+        while True:
+            event = await self._queue.get()
+            await self.publish(event)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = parse_notification(payload)
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed change notification: %s", payload[:200])
+            return
+        self.events_received += 1
+        self._queue.put_nowait(event)
+
+    async def _listen(self) -> None:
+        import asyncpg  # only needed when the feed is enabled
+
+        backoff = 1.0
+        while not self._stopping:
+            connection = None
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(self.dsn or asyncpg_dsn(settings.DATABASE_URL))
+                connection.add_termination_listener(lambda _conn: closed.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                backoff = 1.0
+                self._queue.put_nowait(FeedReset(reason="connected"))
+                await closed.wait()
+                logger.warning("Change feed connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change feed connection failed: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+
+def subscribe_indexes(feed: ChangeFeed) -> None:
+    """Keep the in-process matchmaking indexes in step with the database."""
+    from src.api.services.amenity_index import amenity_index
+    from src.api.services.availability_index import availability_index
+    from src.api.services.geo_index import geo_index
+    from src.api.services.index_refresh import refresh
+    from src.api.services.match_maintenance import match_maintainer
+
+    reloads: Set[asyncio.Task] = set()
+
+    # Events are applied even to indexes that are not loaded or are being (re)loaded:
+    # a load records them and replays them onto the copy it swaps in
+    def on_property(event: PropertyChanged) -> None:
+        row = event.row
+        if event.deleted:
+            geo_index.remove(event.id)
+            availability_index.remove(event.id)
+            amenity_index.remove(event.id)
+            return
+        geo_index.add(event.id, row.get("latitude"), row.get("longitude"))
+        availability_index.add(event.id, row.get("location"), row.get("available_from"), row.get("available_to"))
+        amenity_index.add(event.id, row.get("location"), row.get("amenities"))
+
+    def on_profile(event: ProfileChanged) -> None:
+        if event.deleted:
+            match_maintainer.remove_user(event.id)
+        else:
+            match_maintainer.add_user({"id": event.id, **event.row})
+
+    async def reload(indexes: list, maintainer: bool) -> None:
+        try:
+            if indexes:
+                await asyncio.to_thread(refresh, indexes)
+            if maintainer:
+                await asyncio.to_thread(match_maintainer.load)
+        except Exception as e:
+            logger.error(f"Reload after change feed reset failed, keeping the current copies: {e}")
+
+    def on_reset(event: FeedReset) -> None:
+        # Changes may have been missed while disconnected: reload what is already loaded in
+        # the background, queries keep using the current copies until the new ones swap in.
+        # Indexes load after the listener is up on the initial connect, so nothing is loaded
+        # yet and this is skipped (unless warm-up won the race, when a reload is needed).
+        indexes = [index for index in (geo_index, availability_index, amenity_index) if index.loaded]
+        if not indexes and not match_maintainer.loaded:
+            return
+        task = asyncio.create_task(reload(indexes, match_maintainer.loaded))
+        reloads.add(task)  # the loop keeps only weak references to tasks
+        task.add_done_callback(reloads.discard)
+
+    feed.subscribe(PropertyChanged, on_property)
+    feed.subscribe(ProfileChanged, on_profile)
+    feed.subscribe(FeedReset, on_reset)
+
+
+def subscribe_cache(feed: ChangeFeed) -> None:
+    """Invalidate entity cache entries for rows changed anywhere."""
+    from src.api.db.cache import entity_cache
+
+    feed.subscribe(ProfileChanged, lambda e: entity_cache.invalidate("user_profiles", e.row.get("user_id")))
+    feed.subscribe(LandlordChanged, lambda e: entity_cache.invalidate("landlord_profile", e.row.get("user_id")))
+    feed.subscribe(PropertyChanged, lambda e: entity_cache.invalidate("properties", e.id))
+    feed.subscribe(FeedReset, lambda e: entity_cache.clear())
+
+
+# Create global instance
+change_feed = ChangeFeed()
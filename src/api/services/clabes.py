@@ -0,0 +1,76 @@
+"""
+CLABEs for the create endpoints, reserved before the row is written.
+
+POST /db/new/user, /db/new/landlord and /db/new/property write their row once,
+CLABE included, with the conflict-aware insert (src/api/db/writes.py), so the row
+is never visible without a CLABE. The CLABE therefore has to exist first. When the
+insert finds a duplicate (or fails), the CLABE is parked in spare_clabes
+(src/api/db/sql/spare_clabes.sql) instead of being lost, and a later create claims
+it rather than asking Juno for a new one.
+
+Claiming costs a round trip, so it is only tried while parked CLABEs may exist:
+once at startup (left by earlier runs or other processes) and after this process
+parks one.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from src.api.config import client
+from src.api.db.writes import insert_unique
+from src.api.services.juno import create_clabe_for_user
+
+logger = logging.getLogger(__name__)
+
+TABLE = "spare_clabes"
+
+
+class ClabeUnavailable(Exception):
+    """Raised when no CLABE could be reserved (Juno failed); nothing was written."""
+
+
+class ClabeReserve:
+    def __init__(self) -> None:
+        self._maybe_spares = True
+
+    async def take(self) -> str:
+        if self._maybe_spares:
+            try:
+                result = await asyncio.to_thread(lambda: client.rpc("claim_spare_clabe", {}).execute())
+                if result.data:
+                    return result.data
+            except Exception as e:
+                logger.warning(f"Could not claim a spare CLABE: {e}")
+            self._maybe_spares = False
+        try:
+            return await create_clabe_for_user()
+        except Exception as e:
+            raise ClabeUnavailable(str(e)) from e
+
+    async def park(self, clabe: str) -> None:
+        try:
+            await asyncio.to_thread(lambda: client.table(TABLE).insert({"clabe": clabe}).execute())
+        except Exception:
+            logger.exception("Could not park unused CLABE %s", clabe)  # logged so it can be recovered by hand
+            return
+        self._maybe_spares = True
+
+    async def insert_with_clabe(self, table: str, row: Dict[str, Any], on_conflict: str) -> Optional[Dict[str, Any]]:
+        """
+        Reserve a CLABE and insert row with it in one round trip. Returns the stored
+        row, or None on a duplicate. Raises ClabeUnavailable when no CLABE could be
+        reserved; on None or any insert error the CLABE is parked for the next create.
+        """
+        clabe = await self.take()
+        try:
+            stored = await asyncio.to_thread(insert_unique, table, {**row, "clabe": clabe}, on_conflict)
+        except Exception:
+            await self.park(clabe)
+            raise
+        if stored is None:
+            await self.park(clabe)
+        return stored
+
+
+# Create global instance
+clabe_reserve = ClabeReserve()
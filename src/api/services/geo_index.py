@@ -0,0 +1,135 @@
+"""
+In-process geospatial index over property coordinates.
+
+Points are bucketed into a fixed lat/lng grid (cell ~GEO_CELL_KM on a side), so:
+  - within(lat, lng, radius_km): visit only the cells under the query's bounding
+    box, exact haversine check on those points
+  - nearest(lat, lng, k): visit rings of cells outwards until the k-th best
+    distance is closer than anything an unvisited ring could hold
+
+The index is loaded lazily from `properties` and kept fresh by add()/remove()
+calls from the write paths, the change feed or periodic reloads (property_index.py).
+"""
+import heapq
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.api.config import settings
+from src.api.services.property_index import PropertyIndex
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoIndex(PropertyIndex):
+    COLUMNS = "id, latitude, longitude"
+
+    def __init__(self, cell_km: float = 1.0) -> None:
+        self.cell_deg = cell_km / KM_PER_DEGREE
+        self._cells: Dict[Tuple[int, int], Dict[int, Tuple[float, float]]] = {}
+        self._points: Dict[int, Tuple[float, float]] = {}
+        super().__init__()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg)
+
+    # ---------- Maintenance ----------
+    def add(self, property_id: int, lat: Optional[float], lng: Optional[float]) -> None:
+        self._write(property_id, {"latitude": lat, "longitude": lng})
+
+    def _empty(self) -> Dict[str, Any]:
+        return {"_cells": {}, "_points": {}}
+
+    def _add(self, property_id: int, row: Dict[str, Any]) -> None:
+        self._remove(property_id)
+        lat, lng = row.get("latitude"), row.get("longitude")
+        if lat is None or lng is None:
+            return
+        self._points[property_id] = (lat, lng)
+        self._cells.setdefault(self._cell(lat, lng), {})[property_id] = (lat, lng)
+
+    def _remove(self, property_id: int) -> None:
+        old = self._points.pop(property_id, None)
+        if old:
+            cell = self._cells.get(self._cell(*old))
+            if cell is not None:
+                cell.pop(property_id, None)
+                if not cell:
+                    del self._cells[self._cell(*old)]
+
+    # ---------- Queries ----------
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[int, float]]:
+        """(property_id, distance_km) for every point within radius_km, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE
+        dlng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo, lng_lo = self._cell(lat - dlat, lng - dlng)
+        lat_hi, lng_hi = self._cell(lat + dlat, lng + dlng)
+
+        # Equirectangular distance is within ~1% of haversine at city scale: use it to
+        # skip points in the bounding box corners before the exact check
+        kx = KM_PER_DEGREE * math.cos(math.radians(lat))
+        ky = KM_PER_DEGREE
+        outer_sq = (radius_km * 1.01) ** 2
+
+        hits: List[Tuple[int, float]] = []
+        for ci in range(lat_lo, lat_hi + 1):
+            for cj in range(lng_lo, lng_hi + 1):
+                cell = self._cells.get((ci, cj))
+                if not cell:
+                    continue
+                for pid, (plat, plng) in cell.items():
+                    dx = (plng - lng) * kx
+                    dy = (plat - lat) * ky
+                    approx_sq = dx * dx + dy * dy
+                    if approx_sq > outer_sq:
+                        continue
+                    d = haversine_km(lat, lng, plat, plng)
+                    if d <= radius_km:
+                        hits.append((pid, d))
+        hits.sort(key=lambda h: h[1])
+        return hits
+
+    def nearest(self, lat: float, lng: float, k: int, max_km: float = 500.0) -> List[Tuple[int, float]]:
+        """The k closest (property_id, distance_km) pairs, nearest first."""
+        ci, cj = self._cell(lat, lng)
+        # Cells are narrowest east-west; a ring r cells out is at least this far away
+        cell_km = self.cell_deg * KM_PER_DEGREE * max(math.cos(math.radians(abs(lat) + self.cell_deg)), 1e-6)
+        heap: List[Tuple[float, int]] = []  # max-heap of the best k as (-distance, id)
+        ring = 0
+        while True:
+            for di in range(-ring, ring + 1):
+                for dj in range(-ring, ring + 1):
+                    if max(abs(di), abs(dj)) != ring:
+                        continue
+                    cell = self._cells.get((ci + di, cj + dj))
+                    if not cell:
+                        continue
+                    for pid, (plat, plng) in cell.items():
+                        d = haversine_km(lat, lng, plat, plng)
+                        if len(heap) < k:
+                            heapq.heappush(heap, (-d, pid))
+                        elif d < -heap[0][0]:
+                            heapq.heapreplace(heap, (-d, pid))
+            covered_km = ring * cell_km
+            if (len(heap) >= k and -heap[0][0] <= covered_km) or covered_km > max_km or len(heap) == len(self._points):
+                break
+            ring += 1
+        return sorted(((pid, -nd) for nd, pid in heap), key=lambda h: h[1])
+
+
+# Create global instance
+geo_index = GeoIndex(cell_km=settings.GEO_CELL_KM)
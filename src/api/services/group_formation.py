@@ -0,0 +1,236 @@
+"""
+Batch roommate group formation (2-4 person households) for a whole location.
+
+Pipeline:
+  1) block: sort users by average budget; a pair can only reach min_score if its
+     budget_score (1 - |a - b| / max(a, b)) is at least 2 * min_score - 1, which
+     bounds every user's comparison window; within it, budget ranges must overlap
+  2) score each window in one vectorized pass with the roommate_score formula
+     (tags as bitmasks, Jaccard via popcount) and keep each user's top neighbours
+  3) assemble greedily: seed with the user holding the strongest edge, add the
+     neighbour whose weakest link to current members is strongest, stop at
+     max_size or when nobody clears min_score with everyone already in the group;
+     a pair without an edge (trimmed from the top neighbours) is scored on the
+     spot, but only if its budget ranges overlap, as in step 1
+  4) optionally insert the groups into roomie_groups in one bulk insert
+
+Run:
+    python -m src.api.services.group_formation --location MONTERREY [--persist]
+"""
+import argparse
+import heapq
+import json
+import logging
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from src.api.config import client
+
+logger = logging.getLogger(__name__)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of a (n, w) uint64 array."""
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(words).sum(axis=1)
+    return np.unpackbits(words.view(np.uint8), axis=1).sum(axis=1)
+
+
+class CompatibilityGraph:
+    """Sparse top-neighbour graph over one location's users."""
+
+    def __init__(self, users: List[Dict[str, Any]]) -> None:
+        self.users = users
+        n = len(users)
+        self.budget_min = np.array([u.get("budget_min") or 0 for u in users], dtype=np.float64)
+        self.budget_max = np.array([u.get("budget_max") or 0 for u in users], dtype=np.float64)
+        self.budget_avg = (self.budget_min + self.budget_max) / 2
+
+        vocabulary: Dict[str, int] = {}
+        tag_sets = [set(u.get("lifestyle_tags") or []) for u in users]
+        for tags in tag_sets:
+            for t in tags:
+                vocabulary.setdefault(t, len(vocabulary))
+        self.words = max(1, -(-len(vocabulary) // 64))
+        self.tag_masks = np.zeros((n, self.words), dtype=np.uint64)
+        for i, tags in enumerate(tag_sets):
+            for t in tags:
+                bit = vocabulary[t]
+                self.tag_masks[i, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        self.tag_counts = _popcount(self.tag_masks)
+        self.neighbours: List[Dict[int, float]] = [dict() for _ in range(n)]
+        self.pairs_scored = 0
+
+    def pair_scores(self, i: int, js: np.ndarray) -> np.ndarray:
+        """roommate_score_raw(i, j) for every j in js, vectorized."""
+        inter = _popcount(self.tag_masks[js] & self.tag_masks[i])
+        union = _popcount(self.tag_masks[js] | self.tag_masks[i])
+        both = (self.tag_counts[js] > 0) & (self.tag_counts[i] > 0)
+        tag_score = np.divide(inter, union, out=np.zeros(len(js)), where=both)
+
+        user_avg = self.budget_avg[i]
+        rm_avg = self.budget_avg[js]
+        budget_score = np.where(
+            rm_avg != 0,
+            1 - np.abs(user_avg - rm_avg) / np.maximum(np.maximum(user_avg, rm_avg), 1e-12),
+            0,
+        )
+        return 0.5 * budget_score + 0.5 * tag_score
+
+    def pair_score(self, i: int, j: int) -> float:
+        return float(self.pair_scores(i, np.array([j]))[0])
+
+    def link(self, i: int, j: int) -> Optional[float]:
+        """Edge score of i and j, scored on the spot if it was trimmed; None if their budgets don't overlap."""
+        score = self.neighbours[i].get(j)
+        if score is not None:
+            return score
+        if self.budget_min[j] > self.budget_max[i] or self.budget_max[j] < self.budget_min[i]:
+            return None
+        return self.pair_score(i, j)
+
+    def build(self, min_score: float, max_neighbours: int) -> "CompatibilityGraph":
+        order = np.argsort(self.budget_avg, kind="stable")
+        sorted_avg = self.budget_avg[order]
+        # For positive averages budget_score = smaller / larger, so budget_score >= t <=> larger <= smaller / t
+        min_budget_score = max(2 * min_score - 1, 1e-6)
+        upper = np.searchsorted(sorted_avg, sorted_avg / min_budget_score, side="right")
+
+        for pos in range(len(order)):
+            window = order[pos + 1:upper[pos]]
+            if not len(window):
+                continue
+            i = order[pos]
+            overlap = (self.budget_min[window] <= self.budget_max[i]) & (self.budget_max[window] >= self.budget_min[i])
+            window = window[overlap]
+            if not len(window):
+                continue
+            scores = self.pair_scores(i, window)
+            self.pairs_scored += len(window)
+            keep = scores >= min_score
+            window, scores = window[keep], scores[keep]
+            if len(window) > max_neighbours:
+                top = np.argpartition(-scores, max_neighbours - 1)[:max_neighbours]
+                window, scores = window[top], scores[top]
+            for j, s in zip(window.tolist(), scores.tolist()):
+                self.neighbours[i][j] = s
+                self.neighbours[j][i] = s
+
+        # Incoming edges can push a user past max_neighbours; trim to the strongest
+        for i, nbrs in enumerate(self.neighbours):
+            if len(nbrs) > max_neighbours:
+                self.neighbours[i] = dict(heapq.nlargest(max_neighbours, nbrs.items(), key=lambda kv: kv[1]))
+        return self
+
+
+def form_groups(
+    users: List[Dict[str, Any]],
+    min_size: int = 2,
+    max_size: int = 4,
+    min_score: float = 0.6,
+    max_neighbours: int = 25,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Return (groups, stats); each group has member ids and its weakest/average pair score."""
+    start = time.perf_counter()
+    graph = CompatibilityGraph(users).build(min_score, max_neighbours)
+    graph_seconds = time.perf_counter() - start
+
+    best_edge = [max(nbrs.values()) if nbrs else 0.0 for nbrs in graph.neighbours]
+    seeds = sorted(range(len(users)), key=lambda i: best_edge[i], reverse=True)
+    assigned = np.zeros(len(users), dtype=bool)
+    groups: List[Dict[str, Any]] = []
+
+    for seed in seeds:
+        if assigned[seed] or not graph.neighbours[seed]:
+            continue
+        members = [seed]
+        pair_scores: List[float] = []
+        candidates = {j for j in graph.neighbours[seed] if not assigned[j]}
+
+        while len(members) < max_size and candidates:
+            best, best_link, best_links = None, -1.0, []
+            for c in candidates:
+                links = [graph.link(m, c) for m in members]
+                if None in links:
+                    continue  # budgets don't overlap with a current member
+                weakest = min(links)
+                if weakest > best_link:
+                    best, best_link, best_links = c, weakest, links
+            if best is None or best_link < min_score:
+                break
+            members.append(best)
+            pair_scores.extend(best_links)
+            candidates.discard(best)
+
+        if len(members) >= min_size:
+            assigned[members] = True
+            groups.append({
+                "members": [users[m]["id"] for m in members],
+                "min_pair_score": round(min(pair_scores), 3),
+                "avg_pair_score": round(sum(pair_scores) / len(pair_scores), 3),
+            })
+
+    elapsed = time.perf_counter() - start
+    n = len(users)
+    stats = {
+        "users": n,
+        "all_pairs": n * (n - 1) // 2,
+        "pairs_scored": graph.pairs_scored,
+        "edges": sum(len(nbrs) for nbrs in graph.neighbours) // 2,
+        "groups": len(groups),
+        "grouped_users": int(assigned.sum()),
+        "graph_seconds": round(graph_seconds, 3),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+    return groups, stats
+
+
+def load_location(location: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+    """All profiles in a location, keyset-paginated (PostgREST caps responses at 1000 rows)."""
+    users: List[Dict[str, Any]] = []
+    last_id = 0
+    while True:
+        page = client.table("user_profiles") \
+            .select("id, budget_min, budget_max, lifestyle_tags") \
+            .eq("location_preference", location) \
+            .not_.is_("budget_min", "null") \
+            .not_.is_("budget_max", "null") \
+            .gt("id", last_id) \
+            .order("id") \
+            .limit(page_size) \
+            .execute().data or []
+        users.extend(page)
+        if len(page) < page_size:
+            return users
+        last_id = page[-1]["id"]
+
+
+def persist_groups(groups: List[Dict[str, Any]]) -> None:
+    if groups:
+        client.table("roomie_groups").insert([
+            {"members": g["members"], "status": "pending"} for g in groups
+        ]).execute()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Form 2-4 person roommate groups for one location")
+    parser.add_argument("--location", required=True)
+    parser.add_argument("--min-size", type=int, default=2)
+    parser.add_argument("--max-size", type=int, default=4)
+    parser.add_argument("--min-score", type=float, default=0.6)
+    parser.add_argument("--max-neighbours", type=int, default=25)
+    parser.add_argument("--persist", action="store_true", help="insert groups into roomie_groups")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    users = load_location(args.location.strip().upper())
+    groups, stats = form_groups(users, args.min_size, args.max_size, args.min_score, args.max_neighbours)
+    if args.persist:
+        persist_groups(groups)
+    print(json.dumps({**stats, "location": args.location, "persisted": args.persist}))
+
+
+if __name__ == "__main__":
+    main()
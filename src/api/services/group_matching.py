@@ -0,0 +1,142 @@
+"""
+Group-to-property matching for RoomieGroup.
+
+Pipeline:
+  1) load the group and all member profiles in one query
+  2) aggregate members once: summed budgets, majority lifestyle tags, location
+  3) fetch properties in that location and budget with num_rooms >= group size
+  4) score every candidate in one vectorized numpy pass (same property formula
+     as match_top: 0.7 * price_score + 0.3 * amenity jaccard)
+  5) replace the group's "suggested" rows in group_matches atomically, in one
+     RPC (replace_group_suggestions in src/api/db/sql/group_matching.sql)
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Set
+
+import numpy as np
+
+from src.api.config import client
+from src.api.services.batch_matching import top_rows
+from src.api.services.scoring import round_score
+
+logger = logging.getLogger(__name__)
+
+
+class GroupMatchingError(Exception):
+    """Raised when a group cannot be matched; carries an HTTP-style status code."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def aggregate_members(members: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Collapse member profiles into one set of group preferences:
+      - budget_min / budget_max: sums (the group splits the rent)
+      - lifestyle_tags: tags shared by at least half of the members (all tags if none are)
+      - location: most common location_preference
+    """
+    budget_min = sum(m.get("budget_min") or 0 for m in members)
+    budget_max = sum(m.get("budget_max") or 0 for m in members)
+
+    tag_counts = Counter(t for m in members for t in set(m.get("lifestyle_tags") or []))
+    majority = {t for t, c in tag_counts.items() if c * 2 >= len(members)}
+    lifestyle_tags = majority or set(tag_counts)
+
+    locations = Counter(
+        m["location_preference"].strip().upper() for m in members if m.get("location_preference")
+    )
+    location = locations.most_common(1)[0][0] if locations else None
+
+    return {
+        "budget_min": budget_min,
+        "budget_max": budget_max,
+        "lifestyle_tags": lifestyle_tags,
+        "location": location,
+        "size": len(members),
+    }
+
+
+def score_properties(budget_min: float, budget_max: float, lifestyle_tags: Set[str], properties: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Vectorized scoring.property_score_raw over all candidates: amenities become a
+    multi-hot matrix over the tag vocabulary so every Jaccard is one mat-vec.
+    """
+    if not properties:
+        return np.zeros(0)
+
+    prices = np.array([p.get("price", 0) or 0 for p in properties], dtype=np.float64)
+    price_scores = 1 - np.abs(((budget_min + budget_max) / 2) - prices) / budget_max
+
+    amenity_sets = [set(p.get("amenities") or []) for p in properties]
+    vocabulary = {tag: i for i, tag in enumerate(sorted(set(lifestyle_tags).union(*amenity_sets)))}
+    amenity_matrix = np.zeros((len(properties), len(vocabulary)), dtype=np.int32)
+    for row, amenities in enumerate(amenity_sets):
+        for tag in amenities:
+            amenity_matrix[row, vocabulary[tag]] = 1
+    group_vector = np.zeros(len(vocabulary), dtype=np.int32)
+    for tag in lifestyle_tags:
+        group_vector[vocabulary[tag]] = 1
+
+    intersection = amenity_matrix @ group_vector
+    amenity_counts = amenity_matrix.sum(axis=1)
+    union = amenity_counts + group_vector.sum() - intersection
+    both = (amenity_counts > 0) & (group_vector.sum() > 0)
+    amenity_scores = np.divide(intersection, union, out=np.zeros(len(properties)), where=both)
+
+    return 0.7 * price_scores + 0.3 * amenity_scores
+
+
+async def match_group(repository, group_id: int, top_k: int = 10, persist: bool = True) -> Dict[str, Any]:
+    group = await repository.get_group(group_id)
+    if not group:
+        raise GroupMatchingError(404, "Group not found")
+    member_ids = group.get("members") or []
+    if not member_ids:
+        raise GroupMatchingError(422, "Group has no members")
+
+    members = await repository.get_user_profiles_by_ids(member_ids)
+    missing = sorted(set(member_ids) - {m["id"] for m in members})
+    if missing:
+        raise GroupMatchingError(422, f"Member profiles not found: {missing}")
+
+    prefs = aggregate_members(members)
+    if not all([prefs["budget_min"], prefs["budget_max"], prefs["location"]]):
+        raise GroupMatchingError(422, "Group members are missing budget or location preferences")
+
+    properties = await repository.find_property_candidates(
+        prefs["location"], prefs["budget_min"], prefs["budget_max"], datetime.utcnow(), min_rooms=prefs["size"]
+    )
+    scores = score_properties(prefs["budget_min"], prefs["budget_max"], prefs["lifestyle_tags"], properties)
+
+    # Rank on round_score() like match_top; ties keep candidate order
+    matches = [
+        {"property": properties[i], "score": round_score(float(scores[i]))}
+        for i in top_rows(scores, top_k)
+    ]
+    for m in matches:
+        m["property"]["score"] = m["score"]  # candidate rows are fresh per request: no copy needed
+
+    if persist:
+        await asyncio.to_thread(_replace_suggestions, group_id, matches)
+
+    return {
+        "group_id": group_id,
+        "group_preferences": {**prefs, "lifestyle_tags": sorted(prefs["lifestyle_tags"])},
+        "candidates": len(properties),
+        "property_matches": [m["property"] for m in matches],
+        "persisted": persist,
+    }
+
+
+def _replace_suggestions(group_id: int, matches: List[Dict[str, Any]]) -> None:
+    """Swap the group's open suggestions for the new ranking in one transaction (blocking)."""
+    client.rpc("replace_group_suggestions", {
+        "p_group_id": group_id,
+        "p_entries": [{"property_id": m["property"]["id"], "match_score": m["score"]} for m in matches],
+    }).execute()
@@ -0,0 +1,78 @@
+"""
+Periodic reload of the in-process property indexes when the change feed is off.
+
+match_top uses the geo, availability and amenity indexes as hard filters, so a
+listing missing from them silently drops out of results. Without CHANGE_FEED_ENABLED
+an index only sees this process's own writes: under src/serve.py every worker has
+its own copy, and rows written by other services or the dashboard never arrive.
+This task reloads every loaded index older than INDEX_REFRESH_SECONDS, so results
+are at most about 1.5x that interval behind the table.
+
+Due indexes share one keyset scan of `properties` (the union of their columns) and
+each swaps in a new copy built from it (property_index.py); queries keep using the
+old copy meanwhile. The scan and the builds run in a worker thread.
+"""
+import asyncio
+import logging
+from contextlib import ExitStack
+from typing import List, Optional
+
+from src.api.config import settings
+from src.api.services.property_index import PropertyIndex, scan_properties
+
+logger = logging.getLogger(__name__)
+
+
+def _indexes() -> List[PropertyIndex]:
+    from src.api.services.amenity_index import amenity_index
+    from src.api.services.availability_index import availability_index
+    from src.api.services.geo_index import geo_index
+
+    return [geo_index, availability_index, amenity_index]
+
+
+def refresh(indexes: List[PropertyIndex]) -> None:
+    """Reload indexes from one shared scan (blocking)."""
+    columns = sorted({c.strip() for index in indexes for c in index.COLUMNS.split(",")})
+    with ExitStack() as stack:
+        for index in indexes:
+            stack.enter_context(index.reloading())  # writes made during the scan are replayed
+        rows = list(scan_properties(", ".join(columns)))
+        for index in indexes:
+            index.swap_in(rows)
+    logger.info("Refreshed %s from %d properties", ", ".join(type(i).__name__ for i in indexes), len(rows))
+
+
+class IndexRefresher:
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval / 2)
+            due = [index for index in _indexes() if index.older_than(self.interval)]
+            if not due:
+                continue
+            try:
+                await asyncio.to_thread(refresh, due)
+            except Exception as e:
+                logger.error(f"Index refresh failed, keeping the current copies: {e}")
+
+
+# Create global instance
+index_refresher = IndexRefresher(interval=settings.INDEX_REFRESH_SECONDS)
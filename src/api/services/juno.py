@@ -5,25 +5,71 @@ import time
 import hmac
 import hashlib
 from src.api.config import settings
+from src.api.core.metrics import juno_transport
 
 JUNO_API_KEY = settings.JUNO_API_KEY
 JUNO_API_SECRET = settings.JUNO_API_SECRET
 JUNO_BASE_URL = settings.JUNO_BASE_URL
 
-def sign_juno_request(method: str, path: str):
+WITHDRAWALS_PATH = "/mint_platform/v1/withdrawals"
+
+def sign_juno_request(method: str, path: str, body_str: str = ""):
     nonce = str(int(time.time() * 1000))  # milliseconds
-    data = f"{nonce}{method}{path}"
+    data = f"{nonce}{method}{path}{body_str}"
     signature = hmac.new(JUNO_API_SECRET.encode(), data.encode(), hashlib.sha256).hexdigest()
     authorization = f"Bitso {JUNO_API_KEY}:{nonce}:{signature}"
     return authorization
 
+def exact_postman_body(address, amount, asset, blockchain):
+    return (
+        '{"address":"%s","amount":"%s","asset":"%s","blockchain":"%s","compliance":{"travel_rule":{}}}'
+        % (address, amount, asset, blockchain)
+    )
+
+def withdrawal_headers(authorization: str):
+    return {
+        "Authorization": authorization,
+        "Content-Type": "application/json",
+        "User-Agent": "PostmanRuntime/7.44.1",
+        "Accept": "*/*",
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+        "Accept-Encoding": "gzip, deflate, br"
+    }
+
+async def submit_withdrawal(address, amount, asset, blockchain, timeout: float = 30.0) -> httpx.Response:
+    """Sign and POST a single withdrawal to Juno; the caller interprets the response."""
+    method = "POST"
+    url = f"{JUNO_BASE_URL}{WITHDRAWALS_PATH}"
+    body_str = exact_postman_body(address, str(amount), asset, blockchain)
+    authorization = sign_juno_request(method, WITHDRAWALS_PATH, body_str)
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(timeout), transport=juno_transport()) as http_client:
+        return await http_client.post(
+            url,
+            headers=withdrawal_headers(authorization),
+            content=body_str.encode()
+        )
+
+async def list_transactions(http_client: httpx.AsyncClient, page: int = 0, page_size: int = 100) -> dict:
+    """Fetch one page of Juno transactions; returns the `payload` object."""
+    method = "GET"
+    path = "/mint_platform/v1/transactions"
+    url = f"{JUNO_BASE_URL}{path}?page={page}&page_size={page_size}"
+    authorization = sign_juno_request(method, path)  # Signature uses path only (no query)
+
+    response = await http_client.get(url, headers={"Authorization": authorization})
+    if not (200 <= response.status_code < 300):
+        raise Exception(f"Failed to list Juno transactions: {response.status_code} {response.text}")
+    return response.json().get("payload", {})
+
 async def create_clabe_for_user():
     method = "POST"
     path = "/mint_platform/v1/clabes"
     url = f"{JUNO_BASE_URL}{path}"
     authorization = sign_juno_request(method, path)
 
-    async with httpx.AsyncClient() as http_client:
+    async with httpx.AsyncClient(transport=juno_transport()) as http_client:
         response = await http_client.post(url, headers={"Authorization": authorization})
         if not (200 <= response.status_code < 300):
             raise Exception("Failed to create CLABE for user")
@@ -0,0 +1,236 @@
+"""
+Offline export of every user's top-k matches as columnar files, one per location.
+
+Analytics and the email pipeline read matches for all users at once. Instead of
+calling the API per user, this job:
+
+  1) scans user_profiles and properties in bulk (keyset pages, like the snapshot
+     build) and groups them by location
+  2) fingerprints each location's inputs: its profiles, its listings and which
+     listings are available now
+  3) skips locations whose fingerprint matches the previous export (incremental);
+     the rest are scored with batch_matching.score_location, the same scoring and
+     ranking as match_top with stored preferences
+  4) writes one file per location, then publishes _manifest.json
+
+Layout (Hive-style partitions, so pyarrow.dataset, DuckDB and Spark read the
+directory as one table with a `location` column; they skip files starting with
+"_" or ".", like the manifest and files being written):
+
+  <dir>/_manifest.json                         {"format", "top_k", "locations": {location: {path, fingerprint, ...}}}
+  <dir>/location=<quoted>/matches.arrow        (or matches.parquet)
+
+Columns: user_id, kind ("roommate" | "property"), rank (1-based), match_id
+(user_profiles.id or properties.id), match_user_id (roommates only), score.
+
+Arrow IPC files are uncompressed, so readers can memory-map them and get
+zero-copy columns (read_location). Parquet is smaller but has to be decoded.
+Both formats need pyarrow, which is imported only when the job runs.
+
+    python -m src.api.services.match_export --format arrow --top-k 10
+    python -m src.api.services.match_export --full   # ignore previous fingerprints
+
+The fingerprints cover the inputs but not the code, so after a scoring change,
+run the next export with --full.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+import orjson
+
+from src.api.config import settings
+from src.api.services.batch_matching import _preferences, score_location
+from src.api.services.candidate_snapshot import _scan, to_epoch
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"arrow": "matches.arrow", "parquet": "matches.parquet"}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401 (submodules used through the package)
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("Match export needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def fingerprint(users: List[Dict[str, Any]], roommates: List[Dict[str, Any]], properties: List[Dict[str, Any]],
+                now: datetime) -> str:
+    """Digest of everything the location's matches depend on (rows arrive ordered by id)."""
+    cutoff = to_epoch(now)
+    digest = hashlib.sha256()
+    for rows in (users, roommates):
+        for row in rows:
+            digest.update(orjson.dumps(row, option=orjson.OPT_SORT_KEYS))
+        digest.update(b"|")
+    for row in properties:
+        digest.update(orjson.dumps(row, option=orjson.OPT_SORT_KEYS))
+        digest.update(b"1" if to_epoch(row.get("available_from")) <= cutoff else b"0")
+    return digest.hexdigest()
+
+
+def _table(pa, results: List[Dict[str, Any]]):
+    columns: Dict[str, list] = {name: [] for name in ("user_id", "kind", "rank", "match_id", "match_user_id", "score")}
+    for result in results:
+        for kind, matches in (("roommate", result["roommate_matches"]), ("property", result["property_matches"])):
+            for rank, match in enumerate(matches, start=1):
+                columns["user_id"].append(result["user_id"])
+                columns["kind"].append(kind)
+                columns["rank"].append(rank)
+                columns["match_id"].append(match["id"])
+                columns["match_user_id"].append(str(match["user_id"]) if kind == "roommate" else None)
+                columns["score"].append(match["score"])
+    return pa.table({
+        "user_id": pa.array(columns["user_id"], pa.string()),
+        "kind": pa.array(columns["kind"], pa.string()).dictionary_encode(),
+        "rank": pa.array(columns["rank"], pa.int16()),
+        "match_id": pa.array(columns["match_id"], pa.int64()),
+        "match_user_id": pa.array(columns["match_user_id"], pa.string()),
+        "score": pa.array(columns["score"], pa.float64()),
+    })
+
+
+def _write(pa, table, path: str, fmt: str) -> None:
+    tmp = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".tmp")
+    if fmt == "arrow":
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        pa.parquet.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, path)  # readers never see a partial file
+
+
+def _group(rows: Iterable[Dict[str, Any]], key: str, required: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Rows by their stored location value (pools match it exactly, like the repository)."""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        if row.get(key) is None or any(row.get(c) is None for c in required):
+            continue  # can never pass the candidate filters
+        groups.setdefault(row[key], []).append(row)
+    return groups
+
+
+def export_matches(directory: Optional[str] = None, fmt: str = "arrow", top_k: int = 5,
+                   full: bool = False, page_size: int = 1000) -> Dict[str, Any]:
+    """Export changed locations (all with full=True) and publish the manifest. Returns run stats."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    pa = _pyarrow()
+    directory = directory or settings.MATCH_EXPORT_DIR
+    os.makedirs(directory, exist_ok=True)
+    started = time.perf_counter()
+    now = datetime.utcnow()
+
+    manifest_path = os.path.join(directory, "_manifest.json")
+    previous: Dict[str, Any] = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+    if previous.get("format") != fmt or previous.get("top_k") != top_k:
+        full = True  # earlier files are not comparable
+    previous_locations: Dict[str, Any] = {} if full else previous.get("locations", {})
+
+    profiles = list(_scan("user_profiles", "*", page_size))
+    roommate_pools = _group(profiles, "location_preference", ("budget_min", "budget_max"))
+    property_pools = _group(_scan("properties", "*", page_size), "location", ("price",))
+
+    # Users match within their normalized location (match_top upper-cases it)
+    users_by_location: Dict[str, List[Dict[str, Any]]] = {}
+    user_rows: Dict[str, List[Dict[str, Any]]] = {}
+    skipped_users = 0
+    for row in profiles:
+        prefs = _preferences(row)
+        if prefs is None:
+            skipped_users += 1
+            continue
+        users_by_location.setdefault(prefs["location"], []).append(prefs)
+        user_rows.setdefault(prefs["location"], []).append(row)
+
+    locations: Dict[str, Any] = {}
+    stats = {"locations": len(users_by_location), "exported": 0, "unchanged": 0, "removed": 0,
+             "users": 0, "skipped_users": skipped_users, "rows": 0}
+    for location, users in sorted(users_by_location.items()):
+        roommates = roommate_pools.get(location, [])
+        properties = property_pools.get(location, [])
+        digest = fingerprint(user_rows[location], roommates, properties, now)
+        relative = os.path.join(f"location={quote(location, safe='')}", FORMATS[fmt])
+        entry = previous_locations.get(location)
+        if entry and entry["fingerprint"] == digest and os.path.exists(os.path.join(directory, relative)):
+            locations[location] = entry
+            stats["unchanged"] += 1
+            continue
+
+        results = score_location(users, roommates, properties, top_k, now)
+        table = _table(pa, results)
+        os.makedirs(os.path.join(directory, os.path.dirname(relative)), exist_ok=True)
+        _write(pa, table, os.path.join(directory, relative), fmt)
+        locations[location] = {
+            "path": relative,
+            "fingerprint": digest,
+            "users": len(users),
+            "rows": table.num_rows,
+            "exported_at": now.isoformat(),
+        }
+        stats["exported"] += 1
+        stats["users"] += len(users)
+        stats["rows"] += table.num_rows
+
+    manifest = {"format": fmt, "top_k": top_k, "exported_at": now.isoformat(), "locations": locations}
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    # Files of locations without users (or of the previous format), once the manifest no longer lists them
+    for location, entry in previous.get("locations", {}).items():
+        if locations.get(location, {}).get("path") == entry["path"]:
+            continue
+        try:
+            os.remove(os.path.join(directory, entry["path"]))
+            os.rmdir(os.path.join(directory, os.path.dirname(entry["path"])))
+        except OSError:
+            pass  # already gone, or the partition still holds the new format's file
+        stats["removed"] += 1
+
+    stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info("Match export finished: %s", stats)
+    return stats
+
+
+def read_location(directory: str, location: str):
+    """pyarrow Table for one location; Arrow IPC files are memory-mapped (zero copy)."""
+    pa = _pyarrow()
+    with open(os.path.join(directory, "_manifest.json")) as f:
+        manifest = json.load(f)
+    entry = manifest["locations"][location]
+    path = os.path.join(directory, entry["path"])
+    if manifest["format"] == "arrow":
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return pa.parquet.read_table(path, memory_map=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export every user's top-k matches as columnar files per location")
+    parser.add_argument("--directory", default=None, help="output directory (default: MATCH_EXPORT_DIR)")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="arrow")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--full", action="store_true", help="re-export every location, not only changed ones")
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per bulk read")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = export_matches(args.directory, fmt=args.format, top_k=args.top_k, full=args.full, page_size=args.page_size)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+Incremental maintenance of stored top-k match lists (the `matches` table).
+
+Instead of recomputing everyone's matches, each write scores only the new item
+against the users it can affect:
+  - property insert: users in the listing's location whose budget range contains
+    its price, found by a stabbing query on a per-location interval tree over
+    (budget_min, budget_max), then narrowed by match_top's other property filters:
+    the user's move-in window (or "available now" without one) and the amenities
+    their roomie_preferences require
+  - profile write: users in the same location whose budget range overlaps the
+    new one (match_top's roommate filter); the written user's own roommate list
+    is rebuilt from that same candidate set
+
+For each affected user the new score is compared with their stored pending list:
+it is inserted if the list has fewer than MATCH_STORED_TOP_K entries or it beats
+the weakest entry, which is then evicted. The compare-and-evict runs in the
+database as one RPC per write (patch_stored_matches / replace_stored_matches in
+src/api/db/sql/match_maintenance.sql), which locks each list it touches, so
+concurrent writes to the same user's list can't lose or duplicate entries. The
+cost stays O(affected users).
+
+The handlers are synchronous and meant to run as FastAPI background tasks.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.api.config import settings, client
+from src.api.services.amenity_index import normalize_amenity, preference_filters
+from src.api.services.availability_index import IntervalTree, OPEN_END, move_in_range, to_ordinal
+from src.api.services.candidate_snapshot import to_epoch
+from src.api.services.scoring import roommate_score_raw, property_score_raw, round_score
+
+logger = logging.getLogger(__name__)
+
+SOURCE = "incremental"
+
+PROFILE_COLUMNS = "id, user_id, location_preference, budget_min, budget_max, lifestyle_tags, roomie_preferences"
+
+
+class MatchMaintainer:
+    def __init__(self, top_k: int = 5) -> None:
+        self.top_k = top_k
+        self._trees: Dict[str, IntervalTree] = {}
+        self._users: Dict[int, Dict[str, Any]] = {}  # profile pk -> slim profile
+        self._lock = threading.Lock()
+        self.loaded = False
+        self._load_lock = threading.Lock()  # startup warm-up and reloads run in worker threads
+        self._replay: Optional[List[Tuple[int, Optional[Dict[str, Any]]]]] = None  # writes during a load
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    # ---------- Budget / location index ----------
+    def add_user(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._add_user(profile)
+            if self._replay is not None:
+                self._replay.append((profile["id"], profile))
+
+    def _add_user(self, profile: Dict[str, Any]) -> None:
+        self._remove_user(profile["id"])
+        location = (profile.get("location_preference") or "").strip().upper()
+        budget_min, budget_max = profile.get("budget_min"), profile.get("budget_max")
+        if not (location and budget_min and budget_max):
+            return
+        self._users[profile["id"]] = {
+            "id": profile["id"],
+            "user_id": str(profile["user_id"]),
+            "location": location,
+            "budget_min": budget_min,
+            "budget_max": budget_max,
+            "lifestyle_tags": set(profile.get("lifestyle_tags") or []),
+            "move_in": move_in_range(profile),
+            "required_amenities": set(preference_filters(profile.get("roomie_preferences"))),
+        }
+        self._trees.setdefault(location, IntervalTree()).insert(budget_min, budget_max, profile["id"])
+
+    def remove_user(self, profile_id: int) -> None:
+        with self._lock:
+            self._remove_user(profile_id)
+            if self._replay is not None:
+                self._replay.append((profile_id, None))
+
+    def _remove_user(self, profile_id: int) -> None:
+        old = self._users.pop(profile_id, None)
+        if old:
+            self._trees[old["location"]].remove(old["budget_min"], profile_id)
+
+    def affected_users(self, location: Optional[str], low: float, high: float) -> List[Dict[str, Any]]:
+        """Users in location whose [budget_min, budget_max] overlaps [low, high]."""
+        with self._lock:
+            tree = self._trees.get((location or "").strip().upper())
+            if tree is None:
+                return []
+            return [self._users[pk] for pk in tree.overlapping(low, high)]
+
+    def load(self, page_size: int = 1000) -> None:
+        """(Re)build from user_profiles, keyset-paginated."""
+        with self._load_lock:
+            self._load(page_size)
+
+    def _load(self, page_size: int = 1000) -> None:
+        # Build a new copy while the current one keeps serving; add_user()/remove_user()
+        # calls made meanwhile are recorded and replayed onto it before the swap
+        with self._lock:
+            self._replay = []
+        try:
+            fresh = MatchMaintainer(self.top_k)
+            last_id = 0
+            while True:
+                page = client.table("user_profiles") \
+                    .select(PROFILE_COLUMNS) \
+                    .gt("id", last_id) \
+                    .order("id") \
+                    .limit(page_size) \
+                    .execute().data or []
+                for row in page:
+                    fresh._add_user(row)
+                if len(page) < page_size:
+                    break
+                last_id = page[-1]["id"]
+            with self._lock:
+                for profile_id, profile in self._replay:
+                    if profile is None:
+                        fresh._remove_user(profile_id)
+                    else:
+                        fresh._add_user(profile)
+                self._trees, self._users = fresh._trees, fresh._users
+        finally:
+            with self._lock:
+                self._replay = None
+        self.loaded = True
+        logger.info("Match maintenance index loaded with %d users", len(self))
+
+    def ensure_loaded(self) -> "MatchMaintainer":
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self._load()
+        return self
+
+    # ---------- Write hooks ----------
+    def on_property_insert(self, prop: Dict[str, Any]) -> Dict[str, int]:
+        self.ensure_loaded()
+        price = prop.get("price")
+        if price is None:
+            return {"affected": 0, "inserted": 0, "evicted": 0}
+        affected = [u for u in self.affected_users(prop.get("location"), price, price) if self._wants(u, prop)]
+        scored = [
+            (u["user_id"], property_score_raw(u["budget_min"], u["budget_max"], u["lifestyle_tags"], prop))
+            for u in affected
+        ]
+        inserted, evicted = self._patch("matched_property_id", prop["id"], scored)
+        stats = {"affected": len(affected), "inserted": inserted, "evicted": evicted}
+        logger.info("Property %s patched into stored matches: %s", prop["id"], stats)
+        return stats
+
+    @staticmethod
+    def _wants(user: Dict[str, Any], prop: Dict[str, Any]) -> bool:
+        """match_top's availability and amenity filters for one user and listing."""
+        move_in = user["move_in"]
+        if move_in is None:
+            # "Available now"; a missing available_from never passes, like the SQL filter
+            if not to_epoch(prop.get("available_from")) <= to_epoch(datetime.utcnow()):
+                return False
+        else:
+            start = to_ordinal(prop.get("available_from"))
+            if start is None or start > to_ordinal(move_in.end) or to_ordinal(prop.get("available_to"), OPEN_END) < to_ordinal(move_in.start):
+                return False
+        if user["required_amenities"]:
+            terms = {normalize_amenity(a) for a in prop.get("amenities") or [] if a}
+            return user["required_amenities"] <= terms
+        return True
+
+    def on_profile_write(self, profile: Dict[str, Any]) -> Dict[str, int]:
+        self.ensure_loaded()
+        self.add_user(profile)
+        me = self._users.get(profile["id"])
+        if me is None:
+            return {"affected": 0, "inserted": 0, "evicted": 0}
+
+        others = [
+            u for u in self.affected_users(me["location"], me["budget_min"], me["budget_max"])
+            if u["user_id"] != me["user_id"]
+        ]
+        me_row = {"budget_min": me["budget_min"], "budget_max": me["budget_max"], "lifestyle_tags": list(me["lifestyle_tags"])}
+        scored = [
+            (u["user_id"], roommate_score_raw(u["budget_min"], u["budget_max"], u["lifestyle_tags"], me_row))
+            for u in others
+        ]
+        inserted, evicted = self._patch("matched_user_id", me["user_id"], scored)
+
+        # The candidate set above is exactly match_top's roommate filter, so the
+        # written user's own list can be rebuilt from it
+        own = sorted(
+            ((u["user_id"], roommate_score_raw(me["budget_min"], me["budget_max"], me["lifestyle_tags"], u)) for u in others),
+            key=lambda pair: round_score(pair[1]), reverse=True,
+        )[:self.top_k]
+        self._replace_list(me["user_id"], "matched_user_id", own)
+
+        stats = {"affected": len(others), "inserted": inserted, "evicted": evicted}
+        logger.info("Profile %s patched into stored matches: %s", me["user_id"], stats)
+        return stats
+
+    # ---------- matches table ----------
+    @staticmethod
+    def _kind(column: str) -> str:
+        return "roommate" if column == "matched_user_id" else "property"
+
+    def _patch(self, column: str, item_id: Any, scored: List[Tuple[str, float]]) -> Tuple[int, int]:
+        """Offer item_id to each user's stored list; returns (inserted, evicted)."""
+        if not scored:
+            return 0, 0
+        result = client.rpc("patch_stored_matches", {
+            "p_kind": self._kind(column),
+            "p_matched_user_id": item_id if column == "matched_user_id" else None,
+            "p_matched_property_id": item_id if column == "matched_property_id" else None,
+            "p_entries": [{"user_id": uid, "score": round_score(raw)} for uid, raw in scored],
+            "p_top_k": self.top_k,
+            "p_source": SOURCE,
+        }).execute()
+        row = (result.data or [{}])[0]
+        return row.get("inserted", 0), row.get("evicted", 0)
+
+    def _replace_list(self, user_id: str, column: str, scored: List[Tuple[str, float]]) -> None:
+        client.rpc("replace_stored_matches", {
+            "p_user_id": user_id,
+            "p_kind": self._kind(column),
+            "p_entries": [{column: item_id, "score": round_score(raw)} for item_id, raw in scored],
+            "p_source": SOURCE,
+        }).execute()
+
+
+# Create global instance
+match_maintainer = MatchMaintainer(top_k=settings.MATCH_STORED_TOP_K)
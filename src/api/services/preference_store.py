@@ -0,0 +1,53 @@
+"""
+Write-behind storage for AI-extracted preferences.
+
+When match_top runs the AI pipeline with persist_preferences=true, the merged
+budget, location and lifestyle tags are written back to user_profiles together
+with a fingerprint of the prompt that produced them. A later request whose prompt
+has the same fingerprint finds the preferences already stored on the profile and
+skips translation and extraction entirely.
+
+The fingerprint is word-order and formatting insensitive: accents, case,
+punctuation and repeated words are dropped before hashing, so "Depa en CDMX,
+pet friendly" and "pet-friendly depa en cdmx" are the same prompt.
+"""
+import hashlib
+import logging
+import re
+import unicodedata
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from src.api.config import settings, client
+from src.api.db.cache import entity_cache
+from src.api.services.ai_service import PREFERENCE_FIELDS
+from src.api.services.match_maintenance import match_maintainer
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(prompt: str) -> str:
+    text = unicodedata.normalize("NFKD", prompt).encode("ascii", "ignore").decode().lower()
+    tokens = sorted(set(re.findall(r"[a-z0-9]+", text)))
+    return hashlib.sha256(" ".join(tokens).encode()).hexdigest()[:32]
+
+
+def store_preferences(user_id: str, updated: Dict[str, Any], fingerprint: str) -> Optional[Dict[str, Any]]:
+    """
+    Store the merged preferences and prompt fingerprint; returns the updated row.
+    The cached profile is replaced and, like any profile write, stored matches are patched.
+    """
+    fields = {k: updated[k] for k in PREFERENCE_FIELDS if updated.get(k) is not None}
+    result = client.table("user_profiles").update({
+        **fields,
+        "ai_prompt_fingerprint": fingerprint,
+        "ai_preferences_updated_at": datetime.utcnow().isoformat(),
+    }).eq("user_id", user_id).execute()
+    if not result.data:
+        logger.warning(f"Could not persist AI preferences for user {user_id}: profile not found")
+        return None
+    row = result.data[0]
+    entity_cache.put("user_profiles", user_id, row)
+    if settings.MATCH_INCREMENTAL:
+        match_maintainer.on_profile_write(row)
+    return row
@@ -0,0 +1,132 @@
+"""
+Base class for the in-process indexes over `properties` (geo, availability, amenity).
+
+An index loads lazily from the table and is then kept fresh by add()/remove() calls
+from this process's write paths and, when CHANGE_FEED_ENABLED, from the change feed.
+Rows written elsewhere (other workers, other services, the dashboard) only show up
+through the feed, so without it every index older than INDEX_REFRESH_SECONDS is
+reloaded in the background (src/api/services/index_refresh.py).
+
+A reload never empties the live structures: it builds a fresh copy from one keyset
+scan and swaps it in. add()/remove() calls made while the copy is being built are
+recorded and replayed onto it before the swap, so writes during a reload are not
+lost. Queries keep reading the previous copy until then.
+
+Subclasses list their structures in _empty() and implement _add()/_remove() on them.
+"""
+import copy
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.api.config import client
+
+logger = logging.getLogger(__name__)
+
+
+def scan_properties(columns: str, page_size: int = 1000) -> Iterable[Dict[str, Any]]:
+    """Every row of properties (the given columns, id included), keyset-paginated."""
+    last_id = 0
+    while True:
+        page = client.table("properties") \
+            .select(columns) \
+            .gt("id", last_id) \
+            .order("id") \
+            .limit(page_size) \
+            .execute().data or []
+        yield from page
+        if len(page) < page_size:
+            break
+        last_id = page[-1]["id"]
+
+
+class PropertyIndex:
+    COLUMNS = "id"  # properties columns _add() reads
+
+    def __init__(self) -> None:
+        self.loaded = False
+        self.loaded_at: Optional[float] = None  # time.monotonic() of the last full load
+        self._load_lock = threading.Lock()  # startup warm-up and refreshes load from worker threads
+        self._write_lock = threading.Lock()
+        self._replay: Optional[List[Tuple[int, Optional[Dict[str, Any]]]]] = None  # writes during a load
+        self._reset()
+
+    # ---------- Subclass hooks ----------
+    def _empty(self) -> Dict[str, Any]:
+        """Fresh, empty structures by attribute name."""
+        raise NotImplementedError
+
+    def _add(self, property_id: int, row: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _remove(self, property_id: int) -> None:
+        raise NotImplementedError
+
+    # ---------- Maintenance ----------
+    def _reset(self) -> None:
+        for name, value in self._empty().items():
+            setattr(self, name, value)
+
+    def _write(self, property_id: int, row: Optional[Dict[str, Any]]) -> None:
+        """Apply an add (row) or a remove (None), recording it if a load is building a new copy."""
+        with self._write_lock:
+            if row is None:
+                self._remove(property_id)
+            else:
+                self._add(property_id, row)
+            if self._replay is not None:
+                self._replay.append((property_id, row))
+
+    def remove(self, property_id: int) -> None:
+        self._write(property_id, None)
+
+    @contextmanager
+    def reloading(self) -> Iterator[None]:
+        """Hold the load lock and record writes until swap_in() has replaced the structures."""
+        with self._load_lock:
+            with self._write_lock:
+                self._replay = []
+            try:
+                yield
+            finally:
+                with self._write_lock:
+                    self._replay = None
+
+    def swap_in(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Inside reloading(): build a new copy from rows (with at least COLUMNS), replay writes, swap it in."""
+        fresh = copy.copy(self)
+        fresh._reset()
+        for row in rows:
+            fresh._add(row["id"], row)
+        with self._write_lock:
+            for property_id, row in self._replay:
+                if row is None:
+                    fresh._remove(property_id)
+                else:
+                    fresh._add(property_id, row)
+            for name in self._empty():
+                setattr(self, name, getattr(fresh, name))
+            self._replay = []
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+
+    def _load(self, page_size: int = 1000) -> None:
+        self.swap_in(scan_properties(self.COLUMNS, page_size))
+        logger.info("%s loaded with %d properties", type(self).__name__, len(self))
+
+    def load(self, page_size: int = 1000) -> None:
+        """(Re)build from the properties table, keyset-paginated."""
+        with self.reloading():
+            self._load(page_size)
+
+    def ensure_loaded(self) -> "PropertyIndex":
+        if not self.loaded:
+            with self.reloading():
+                if not self.loaded:
+                    self._load()
+        return self
+
+    def older_than(self, seconds: float) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at >= seconds
@@ -0,0 +1,43 @@
+"""
+Match scoring formulas shared by every matching path.
+
+  roommate: 0.5 * budget_score + 0.5 * jaccard(lifestyle_tags)
+  property: 0.7 * price_score  + 0.3 * jaccard(lifestyle_tags, amenities)
+
+The *_raw functions return the unrounded float; src/api/db/sql/match_scoring.sql
+evaluates the same float8 expressions in Postgres, and both paths round with
+round_score() in Python so the numbers are identical.
+"""
+from typing import Dict, Any, Set
+
+
+def round_score(score: float) -> float:
+    return round(score, 3)
+
+
+def jaccard(a: Set[Any], b: Set[Any]) -> float:
+    return len(a & b) / len(a | b) if a and b else 0
+
+
+def roommate_score_raw(budget_min: float, budget_max: float, lifestyle_tags: Set[str], rm: Dict[str, Any]) -> float:
+    rm_tags = set(rm.get("lifestyle_tags") or [])
+    tag_score = jaccard(lifestyle_tags, rm_tags)
+    rm_budget_avg = (rm.get("budget_min", 0) + rm.get("budget_max", 0)) / 2
+    user_budget_avg = (budget_min + budget_max) / 2
+    budget_score = 1 - abs(user_budget_avg - rm_budget_avg) / max(user_budget_avg, rm_budget_avg) if rm_budget_avg else 0
+    return 0.5 * budget_score + 0.5 * tag_score
+
+
+def property_score_raw(budget_min: float, budget_max: float, lifestyle_tags: Set[str], prop: Dict[str, Any]) -> float:
+    amenities = set(prop.get("amenities") or [])
+    amenity_score = jaccard(lifestyle_tags, amenities)
+    price_score = 1 - abs(((budget_min + budget_max) / 2) - prop.get("price", 0)) / budget_max
+    return 0.7 * price_score + 0.3 * amenity_score
+
+
+def roommate_score(budget_min: float, budget_max: float, lifestyle_tags: Set[str], rm: Dict[str, Any]) -> float:
+    return round_score(roommate_score_raw(budget_min, budget_max, lifestyle_tags, rm))
+
+
+def property_score(budget_min: float, budget_max: float, lifestyle_tags: Set[str], prop: Dict[str, Any]) -> float:
+    return round_score(property_score_raw(budget_min, budget_max, lifestyle_tags, prop))
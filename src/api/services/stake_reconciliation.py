@@ -0,0 +1,159 @@
+"""
+Batched reconciliation of unconfirmed stakes against Juno transactions.
+
+Run:
+    python -m src.api.services.stake_reconciliation --batch-size 1000 --concurrency 8
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+from src.api.config import client
+from src.api.core.metrics import juno_transport
+from src.api.services.juno import list_transactions
+
+logger = logging.getLogger(__name__)
+
+# Juno transaction statuses that settle a stake
+SETTLED_STATUSES = {"COMPLETE", "COMPLETED", "SETTLED"}
+
+# confirmed is nullable and rows created without it are unconfirmed too (eq.false skips NULL)
+UNCONFIRMED = "confirmed.is.null,confirmed.eq.false"
+
+
+async def fetch_transactions(page_size: int = 100, concurrency: int = 8) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch every Juno transaction, indexed by id. The first page tells us the page
+    count; the rest are fetched concurrently, bounded by `concurrency`.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(30.0), transport=juno_transport()) as http_client:
+        async def fetch(page: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                payload = await list_transactions(http_client, page=page, page_size=page_size)
+                return payload.get("response") or []
+
+        first = await list_transactions(http_client, page=0, page_size=page_size)
+        pages = [first.get("response") or []]
+        total_pages = first.get("total_pages") or 1
+        pages += await asyncio.gather(*(fetch(p) for p in range(1, total_pages)))
+
+    return {str(txn["id"]): txn for page in pages for txn in page if txn.get("id") is not None}
+
+
+def _unconfirmed_batches(batch_size: int):
+    """Yield unconfirmed stakes in id order, one keyset-paginated batch at a time."""
+    last_id = 0
+    while True:
+        result = client.table("stakes") \
+            .select("id, txn_id, amount_mxn") \
+            .or_(UNCONFIRMED) \
+            .gt("id", last_id) \
+            .order("id") \
+            .limit(batch_size) \
+            .execute()
+        batch = result.data or []
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1]["id"]
+
+
+def _amount_matches(stake: Dict[str, Any], txn: Dict[str, Any]) -> bool:
+    """Reject a match when both sides carry an amount and they disagree (to the centavo)."""
+    txn_amount = txn.get("amount")
+    if stake.get("amount_mxn") is None or txn_amount is None:
+        return True
+    return round(float(stake["amount_mxn"]), 2) == round(float(txn_amount), 2)
+
+
+async def reconcile_stakes(
+    batch_size: int = 1000,
+    page_size: int = 100,
+    concurrency: int = 8,
+    dry_run: bool = False,
+    transactions: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Confirm every unconfirmed stake whose txn_id matches a settled Juno transaction.
+    Each batch of stakes costs one read and at most one bulk update.
+    Returns throughput stats.
+    """
+    start = time.perf_counter()
+    if transactions is None:
+        transactions = await fetch_transactions(page_size=page_size, concurrency=concurrency)
+    fetch_elapsed = time.perf_counter() - start
+
+    stats = {
+        "transactions": len(transactions),
+        "scanned": 0,
+        "confirmed": 0,
+        "unmatched": 0,
+        "not_settled": 0,
+        "amount_mismatch": 0,
+        "batches": 0,
+    }
+
+    for batch in _unconfirmed_batches(batch_size):
+        stats["batches"] += 1
+        stats["scanned"] += len(batch)
+        to_confirm: List[int] = []
+
+        for stake in batch:
+            txn = transactions.get(str(stake.get("txn_id")))
+            if not txn:
+                stats["unmatched"] += 1
+            elif str(txn.get("status", "")).upper() not in SETTLED_STATUSES:
+                stats["not_settled"] += 1
+            elif not _amount_matches(stake, txn):
+                stats["amount_mismatch"] += 1
+                logger.warning("Stake %s amount differs from Juno transaction %s", stake["id"], stake["txn_id"])
+            else:
+                to_confirm.append(stake["id"])
+
+        if to_confirm and not dry_run:
+            client.table("stakes") \
+                .update({"confirmed": True, "confirmed_at": datetime.utcnow().isoformat()}) \
+                .in_("id", to_confirm) \
+                .or_(UNCONFIRMED) \
+                .execute()
+        stats["confirmed"] += len(to_confirm)
+
+    elapsed = time.perf_counter() - start
+    stats.update({
+        "dry_run": dry_run,
+        "fetch_seconds": round(fetch_elapsed, 3),
+        "elapsed_seconds": round(elapsed, 3),
+        "stakes_per_minute": round(stats["scanned"] / elapsed * 60, 1) if elapsed else None,
+    })
+    logger.info("Stake reconciliation finished: %s", stats)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Confirm stakes against Juno transactions")
+    parser.add_argument("--batch-size", type=int, default=1000, help="stakes per read/bulk update")
+    parser.add_argument("--page-size", type=int, default=100, help="Juno transactions per page")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent Juno page fetches")
+    parser.add_argument("--dry-run", action="store_true", help="match but do not update")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = asyncio.run(reconcile_stakes(
+        batch_size=args.batch_size,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        dry_run=args.dry_run,
+    ))
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
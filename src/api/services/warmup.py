@@ -0,0 +1,127 @@
+"""
+Startup warm-up and readiness.
+
+Nothing expensive happens at import time any more: the Supabase client, the
+asyncpg pool, the in-process indexes and LangChain are all created on first use.
+To keep that first use off the request path, the lifespan hook in src/main.py
+starts Warmup.run() in the background right after the app begins serving.
+GET /ready returns 503 until every step has finished:
+
+  supabase      build the PostgREST client
+  db_pool       open one pooled connection (DB_BACKEND=sqlalchemy only)
+  geo_index, availability_index, amenity_index
+                keyset-load the matchmaking indexes
+  match_maintainer
+                load user budgets (MATCH_INCREMENTAL only)
+  ai_parser     import LangChain and build the structured output parser
+
+Blocking steps run in worker threads; the index loads are guarded by a lock, so
+a request that needs an index before warm-up reaches it waits for the one load
+instead of starting a second. A failed step is reported with its error and keeps
+the instance unready; the request path still falls back to lazy loading.
+With WARMUP_ON_STARTUP=false nothing is preloaded and /ready is always 200.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.api.config import settings, client
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_db_pool() -> None:
+    from sqlalchemy import text
+    from src.api.db.session import get_engine
+
+    async with get_engine().connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def _steps() -> List[Tuple[str, Callable[[], Any]]]:
+    from src.api.services.ai_service import ai_service
+    from src.api.services.amenity_index import amenity_index
+    from src.api.services.availability_index import availability_index
+    from src.api.services.geo_index import geo_index
+    from src.api.services.match_maintenance import match_maintainer
+
+    steps: List[Tuple[str, Callable[[], Any]]] = [("supabase", client.get)]
+    if settings.DB_BACKEND.lower() == "sqlalchemy":
+        steps.append(("db_pool", _open_db_pool))
+    steps += [
+        ("geo_index", geo_index.ensure_loaded),
+        ("availability_index", availability_index.ensure_loaded),
+        ("amenity_index", amenity_index.ensure_loaded),
+    ]
+    if settings.MATCH_INCREMENTAL:
+        steps.append(("match_maintainer", match_maintainer.ensure_loaded))
+    steps.append(("ai_parser", lambda: ai_service.parser))
+    return steps
+
+
+class Warmup:
+    def __init__(self) -> None:
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        if not settings.WARMUP_ON_STARTUP:
+            return True  # everything loads lazily on first request
+        return self.finished_at is not None and all(c["status"] == "ready" for c in self.components.values())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def run(self) -> None:
+        self.started_at = time.monotonic()
+        steps = _steps()
+        for name, _ in steps:
+            self.components[name] = {"status": "pending"}
+        for name, step in steps:
+            self.components[name]["status"] = "loading"
+            t0 = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(step):
+                    await step()
+                else:
+                    await asyncio.to_thread(step)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Warm-up step {name} failed: {e}")
+                self.components[name] = {"status": "failed", "error": str(e)}
+                continue
+            self.components[name] = {"status": "ready", "ms": round((time.perf_counter() - t0) * 1000, 1)}
+        self.finished_at = time.monotonic()
+        logger.info("Warm-up finished in %.0f ms, ready=%s", (self.finished_at - self.started_at) * 1000, self.ready)
+
+    def status(self) -> Dict[str, Any]:
+        from src.api.db.cache import entity_cache
+        from src.api.services.change_feed import change_feed
+        from src.api.services.index_refresh import index_refresher
+        from src.api.services.withdrawals import withdrawal_queue
+
+        return {
+            "ready": self.ready,
+            "warmup_s": round(self.finished_at - self.started_at, 3) if self.finished_at is not None else None,
+            "components": self.components,
+            "entity_cache": {"enabled": settings.ENTITY_CACHE_ENABLED, **entity_cache.stats()},
+            "change_feed": {"enabled": settings.CHANGE_FEED_ENABLED, "running": change_feed.running},
+            "index_refresh": {"interval_s": settings.INDEX_REFRESH_SECONDS, "running": index_refresher.running},
+            "withdrawal_workers": withdrawal_queue.running,
+        }
+
+
+# Create global instance
+warmup = Warmup()
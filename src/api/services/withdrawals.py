@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import random
+from decimal import Decimal
+from typing import Dict, Any, Optional, Set, Tuple, List
+
+import httpx
+
+from src.api.config import settings, client
+from src.api.services.juno import submit_withdrawal
+
+logger = logging.getLogger(__name__)
+
+TABLE = "withdrawal_jobs"
+
+# Statuses a job moves through. "needs_review" is used whenever we cannot tell
+# whether Juno accepted the payout (e.g. the connection dropped after the body
+# was sent); those jobs are never retried automatically.
+QUEUED = "queued"
+SUBMITTING = "submitting"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+NEEDS_REVIEW = "needs_review"
+
+# Upstream statuses where Juno rejected the request before processing it.
+RETRYABLE_STATUS_CODES = {429, 503}
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an idempotency key is reused with a different payload."""
+
+
+# ------------------------------
+# Withdrawal job queue
+# ------------------------------
+class WithdrawalJobQueue:
+    """
+    Persisted, idempotent withdrawal jobs:
+      1) enqueue: insert a row keyed by idempotency_key (or return the existing one)
+      2) workers claim a job with a conditional queued -> submitting update
+      3) submit to Juno; retry with exponential backoff only when Juno did not accept it
+      4) record the final status and upstream response on the row
+    """
+
+    def __init__(self, num_workers: int, max_attempts: int, backoff_base: float) -> None:
+        self.num_workers = num_workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()  # pending backoff requeues and the startup recovery
+
+    # ---------- Lifecycle ----------
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.num_workers)]
+        # Recover in the background: the API must boot even when the database is unreachable
+        task = asyncio.create_task(self._recover_until_done())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+        logger.info("Started %d withdrawal workers", self.num_workers)
+
+    async def stop(self) -> None:
+        # Cancelled retries stay "queued" in the table and are picked up by _recover on the next start
+        tasks = [*self._workers, *self._retries]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._retries.clear()
+        self._queue = None
+
+    async def _recover(self) -> None:
+        """
+        Re-enqueue jobs left queued by a previous run. Jobs stuck in "submitting"
+        are left alone: another process may still own them, and if not, the
+        payout may or may not have reached Juno, so they need manual review.
+        """
+        queued = await asyncio.to_thread(
+            lambda: client.table(TABLE).select("id").eq("status", QUEUED).execute()
+        )
+        for row in queued.data or []:
+            self._queue.put_nowait(row["id"])
+
+    async def _recover_until_done(self) -> None:
+        delay = self.backoff_base
+        while True:
+            try:
+                await self._recover()
+                return
+            except Exception as e:
+                logger.error("Could not recover queued withdrawal jobs, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+
+    # ---------- Public API ----------
+    async def enqueue(self, idempotency_key: str, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Persist a job for payload under idempotency_key.
+        Returns (job, created); created is False when the key was already used.
+        """
+        existing = await self._get_by_key(idempotency_key)
+        if existing:
+            return self._check_same_payload(existing, payload), False
+
+        try:
+            result = await asyncio.to_thread(
+                lambda: client.table(TABLE).insert({
+                    "idempotency_key": idempotency_key,
+                    "status": QUEUED,
+                    "attempts": 0,
+                    **payload,
+                }).execute()
+            )
+        except Exception:
+            # Lost the race against a concurrent request with the same key
+            existing = await self._get_by_key(idempotency_key)
+            if not existing:
+                raise
+            return self._check_same_payload(existing, payload), False
+
+        job = result.data[0]
+        if self._queue is not None:
+            self._queue.put_nowait(job["id"])
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        result = await asyncio.to_thread(
+            lambda: client.table(TABLE).select("*").eq("id", job_id).execute()
+        )
+        return result.data[0] if result.data else None
+
+    # ---------- Internal helpers ----------
+    async def _get_by_key(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        result = await asyncio.to_thread(
+            lambda: client.table(TABLE).select("*").eq("idempotency_key", idempotency_key).execute()
+        )
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    def _check_same_payload(job: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in payload.items():
+            stored = job.get(key)
+            same = Decimal(str(stored)) == Decimal(str(value)) if key == "amount" else str(stored) == str(value)
+            if not same:
+                raise IdempotencyConflict(f"Idempotency key already used with a different '{key}'")
+        return job
+
+    async def _update(self, job_id: str, fields: Dict[str, Any], expect_status: Optional[str] = None) -> List[Dict[str, Any]]:
+        def run():
+            query = client.table(TABLE).update(fields).eq("id", job_id)
+            if expect_status:
+                query = query.eq("status", expect_status)
+            return query.execute()
+        result = await asyncio.to_thread(run)
+        return result.data or []
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff_base * (2 ** (attempt - 1)) * (1 + random.random() / 2)
+
+    async def _requeue_later(self, job_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception:
+                logger.exception("Withdrawal worker %d failed on job %s", worker_id, job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str) -> None:
+        job = await self.get(job_id)
+        if not job or job["status"] != QUEUED:
+            return
+
+        attempt = (job.get("attempts") or 0) + 1
+        # Conditional update is the claim: only one worker (in any process) wins it
+        claimed = await self._update(job_id, {"status": SUBMITTING, "attempts": attempt}, expect_status=QUEUED)
+        if not claimed:
+            return
+
+        try:
+            response = await submit_withdrawal(job["address"], job["amount"], job["asset"], job["blockchain"])
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # Nothing reached Juno, safe to retry
+            await self._retry_or_fail(job_id, attempt, f"Connection error: {e}")
+            return
+        except Exception as e:
+            logger.error("Ambiguous withdrawal outcome for job %s: %s", job_id, e)
+            await self._update(job_id, {"status": NEEDS_REVIEW, "error": str(e)})
+            return
+
+        if 200 <= response.status_code < 300:
+            # Juno accepted the payout: record that before parsing the body, which may not be JSON
+            await self._update(job_id, {"status": SUCCEEDED, "error": None})
+            logger.info("Withdrawal job %s succeeded", job_id)
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"raw": response.text}
+            await self._update(job_id, {"juno_response": body})
+        elif response.status_code in RETRYABLE_STATUS_CODES:
+            await self._retry_or_fail(job_id, attempt, f"Juno returned {response.status_code}: {response.text}")
+        else:
+            logger.error("Withdrawal job %s failed: %s", job_id, response.text)
+            await self._update(job_id, {"status": FAILED, "error": f"Withdrawal failed: {response.text}"})
+
+    async def _retry_or_fail(self, job_id: str, attempt: int, error: str) -> None:
+        if attempt >= self.max_attempts:
+            await self._update(job_id, {"status": FAILED, "error": error})
+            return
+        await self._update(job_id, {"status": QUEUED, "error": error})
+        delay = self._backoff(attempt)
+        logger.warning("Withdrawal job %s retry %d in %.1fs: %s", job_id, attempt, delay, error)
+        task = asyncio.create_task(self._requeue_later(job_id, delay))
+        self._retries.add(task)  # the loop keeps only weak references to tasks
+        task.add_done_callback(self._retries.discard)
+
+
+# Create global instance
+withdrawal_queue = WithdrawalJobQueue(
+    num_workers=settings.WITHDRAW_WORKERS,
+    max_attempts=settings.WITHDRAW_MAX_ATTEMPTS,
+    backoff_base=settings.WITHDRAW_BACKOFF_BASE,
+)
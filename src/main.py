@@ -2,6 +2,8 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routers import auth
@@ -12,9 +14,41 @@ from src.api.routers import landlords
 from src.api.routers import properties
 from src.api.routers import juno
 from src.api.routers import withdraw
+from src.api.routers import health
+from src.api.routers import metrics
+from src.api.config import settings
+from src.api.services.change_feed import change_feed, subscribe_indexes, subscribe_cache
+from src.api.services.index_refresh import index_refresher
+from src.api.services.withdrawals import withdrawal_queue
+from src.api.services.warmup import warmup
+from src.api.db.session import dispose_engine
+from src.api.core.responses import FastJSONResponse
+from src.api.core.metrics import MetricsMiddleware
+from src.api.core.timing import ServerTimingMiddleware
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: background workers first, then warm pools/indexes without blocking the first requests
+    await withdrawal_queue.start()
+    if settings.CHANGE_FEED_ENABLED:
+        subscribe_indexes(change_feed)
+        subscribe_cache(change_feed)
+        await change_feed.start()
+    else:
+        index_refresher.start()  # the feed keeps indexes fresh; without it, reload them periodically
+    if settings.WARMUP_ON_STARTUP:
+        warmup.start()
+    yield
+    # Shutdown
+    await warmup.stop()
+    await index_refresher.stop()
+    await change_feed.stop()
+    await withdrawal_queue.stop()
+    await dispose_engine()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +57,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 app.include_router(matchmaking.router, prefix="/matchmaking", tags=["matchmaking"])
 app.include_router(users.router, prefix="/db",tags=["user_profiles"])
@@ -30,6 +68,10 @@ app.include_router(landlords.router, prefix="/db", tags=["landlord_profiles"])
 app.include_router(properties.router, prefix="/db", tags=["properties"])
 app.include_router(juno.router, prefix="/juno", tags=["juno"])
 app.include_router(withdraw.router, prefix="/funds", tags=["funds"])
+app.include_router(health.router, tags=["health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["metrics"])
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,180 @@
+"""
+Production launcher: pre-fork N uvicorn workers that share one candidate snapshot.
+
+    python -m src.serve --workers 8 --port 8080
+    python -m src.serve --workers 8 --port 8080 --shard-by-location   # ports 8080..8087
+    python -m src.serve --workers 8 --routes                           # print location -> port map
+
+The parent imports the app, builds the candidate snapshot into SNAPSHOT_DIR
+(src/api/services/candidate_snapshot.py), binds the listening socket and forks the
+workers. Those workers share the imported code copy-on-write and memory-map the
+snapshot, so N workers cost one copy of the candidate arrays. The parent then only
+supervises: it restarts workers that die, rebuilds the snapshot every
+SNAPSHOT_REFRESH_SECONDS in a forked helper process (so it keeps reaping workers
+while the build runs), and forwards SIGTERM/SIGINT.
+
+With --shard-by-location every worker gets its own port (port + i). Locations are
+assigned to workers by consistent hashing, and each worker pre-faults only its own
+shards, so its part of the snapshot stays hot. A gateway that routes each location
+to the port from --routes keeps a location on one worker. Adding a worker moves
+about 1/N of the locations. Any worker can still answer for any location.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+
+from src.api.config import settings, client
+from src.api.services.candidate_snapshot import HashRing, build_snapshot, candidate_snapshot
+
+logger = logging.getLogger("src.serve")
+
+
+def bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def refresh_snapshot() -> None:
+    try:
+        os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+        build_snapshot(settings.SNAPSHOT_DIR)
+    except Exception:
+        logger.exception("Candidate snapshot build failed; workers keep the previous generation")
+    finally:
+        # Never hand an open HTTP connection pool to forked workers
+        client.reset()
+
+
+def run_worker(index: int, sock: socket.socket, owned: List[str]) -> None:
+    os.environ["WORKER_INDEX"] = str(index)
+    if owned:
+        touched = candidate_snapshot.touch(owned)
+        logger.info("Worker %d owns %d locations (%d bytes pre-faulted)", index, len(owned), touched)
+    from src.main import app
+
+    config = uvicorn.Config(app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-by-location", action="store_true", help="one port per worker, locations assigned by consistent hashing")
+    parser.add_argument("--no-snapshot", action="store_true", help="don't build the candidate snapshot")
+    parser.add_argument("--routes", action="store_true", help="print the location -> port map of the current snapshot and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    ports = [args.port + i for i in range(args.workers)] if args.shard_by_location else [args.port]
+    ring = HashRing(range(args.workers))
+
+    def ownership() -> Dict[int, List[str]]:
+        owned: Dict[int, List[str]] = {i: [] for i in range(args.workers)}
+        if args.shard_by_location:
+            for location in candidate_snapshot.locations():
+                owned[ring.node_for(location)].append(location)
+        return owned
+
+    if args.routes:
+        print(json.dumps({loc: args.port + ring.node_for(loc) for loc in candidate_snapshot.locations()}, indent=2))
+        return
+
+    # Workers write metric samples here (before anything imports prometheus_client); any worker's
+    # GET /metrics aggregates all of them
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="roomfi-metrics-"))
+
+    if not args.no_snapshot:
+        refresh_snapshot()
+    from src.main import app  # noqa: F401  import once in the parent so workers share it copy-on-write
+
+    sockets = [bind(args.host, port) for port in ports]
+    owned = ownership()
+    children: Dict[int, int] = {}  # pid -> worker index
+    started_at: Dict[int, float] = {}
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            run_worker(index, sockets[index % len(sockets)], owned[index])
+            os._exit(0)
+        children[pid] = index
+        started_at[index] = time.monotonic()
+
+    stopping = False
+    refresher = None  # pid of the running snapshot rebuild
+
+    def spawn_refresh() -> int:
+        # A process, not a thread: forking workers while a thread holds the client's locks would copy them held
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            refresh_snapshot()
+            os._exit(0)
+        return pid
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in [*children, *([refresher] if refresher else [])]:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(args.workers):
+        spawn(index)
+    logger.info("Started %d workers on %s", args.workers, ", ".join(f"{args.host}:{p}" for p in ports))
+
+    next_refresh = time.monotonic() + settings.SNAPSHOT_REFRESH_SECONDS
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == refresher:
+            refresher = None  # a failed or killed build keeps the previous generation published
+            continue
+        if pid:
+            index = children.pop(pid)
+            if settings.METRICS_ENABLED:
+                from prometheus_client import multiprocess
+                multiprocess.mark_process_dead(pid)  # drop its in-flight gauge samples
+            if not stopping:
+                logger.warning("Worker %d (pid %d) exited with status %d, restarting", index, pid, status)
+                if time.monotonic() - started_at[index] < 5:
+                    time.sleep(1)  # don't spin on a worker that fails at startup
+                spawn(index)
+            continue
+        if not stopping and not args.no_snapshot and refresher is None and time.monotonic() >= next_refresh:
+            refresher = spawn_refresh()  # workers switch to the new generation on their next check
+            next_refresh = time.monotonic() + settings.SNAPSHOT_REFRESH_SECONDS
+        time.sleep(0.5)
+    if refresher:
+        os.waitpid(refresher, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Unit tests run without a database or Juno: settings only need placeholder values,
+and anything that would reach Supabase is replaced per test.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name in (
+    "DATABASE_URL", "SUPABASE_JWT_SECRET", "SUPABASE_ANON_KEY", "SUPABASE_URL", "JUNO_BASE_URL",
+    "JUNO_API_KEY", "JUNO_API_SECRET", "CLOUDFLARE_ACCOUNT_ID", "CLOUDFLARE_API_TOKEN", "LLM_MODEL",
+):
+    os.environ.setdefault(name, "test")
+os.environ.setdefault("WARMUP_ON_STARTUP", "false")
@@ -0,0 +1,38 @@
+from src.api.services import index_refresh
+from src.api.services.amenity_index import AmenityIndex, preference_filters
+
+
+def test_match_normalizes_terms_and_filters_by_location():
+    index = AmenityIndex()
+    index.add(1, "cdmx", ["Pet Friendly", "WiFi"])
+    index.add(2, "CDMX", ["mascotas", "Estacionamiento"])
+    index.add(3, "GDL", ["pets"])
+    assert index.match(all_of=["pet_friendly"], location="CDMX") == {1, 2}
+    assert index.match(all_of=preference_filters({"pet_friendly": True, "parking": True})) == {2}
+    assert index.match(any_of=["wifi", "parking"]) == {1, 2}
+    index.add(2, "CDMX", ["wifi"])  # re-adding replaces the old terms
+    assert index.match(all_of=["parking"]) == set()
+    index.remove(1)
+    assert index.match(location="CDMX") == {2}
+
+
+def test_refresh_picks_up_rows_written_elsewhere(monkeypatch):
+    index = AmenityIndex()
+    index.add(1, "CDMX", ["wifi"])
+    live_postings = index._postings
+    rows = [
+        {"id": 1, "location": "CDMX", "amenities": ["wifi"], "latitude": 0, "longitude": 0},
+        {"id": 2, "location": "CDMX", "amenities": ["wifi"], "latitude": 0, "longitude": 0},
+    ]
+
+    def scan(columns, page_size=1000):
+        assert "amenities" in columns
+        index.add(3, "CDMX", ["wifi"])  # a write while the new copy is being built
+        assert live_postings["wifi"] == {1, 3}
+        yield from rows
+
+    monkeypatch.setattr(index_refresh, "scan_properties", scan)
+    index_refresh.refresh([index])
+    assert index._postings is not live_postings
+    assert index.match(all_of=["wifi"], location="CDMX") == {1, 2, 3}
+    assert index.loaded and not index.older_than(60)
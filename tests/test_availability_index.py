@@ -0,0 +1,129 @@
+import random
+
+from src.api.services import property_index
+from src.api.services.availability_index import AvailabilityIndex, IntervalTree
+
+
+def _check_invariants(node, lo=None, hi=None):
+    """BST order on key, heap order on priority, max_end of every subtree; returns the node count."""
+    if node is None:
+        return 0
+    assert lo is None or node.key > lo
+    assert hi is None or node.key < hi
+    expected_max = node.end
+    for child in (node.left, node.right):
+        if child is not None:
+            assert child.priority <= node.priority
+            expected_max = max(expected_max, child.max_end)
+    assert node.max_end == expected_max
+    return 1 + _check_invariants(node.left, lo, node.key) + _check_invariants(node.right, node.key, hi)
+
+
+def _brute_force(intervals, q_start, q_end):
+    return sorted(pid for pid, (start, end) in intervals.items() if start <= q_end and end >= q_start)
+
+
+def _random_intervals(rng, n):
+    intervals = {}
+    for pid in range(n):
+        start = rng.randint(0, 365)
+        intervals[pid] = (start, start + rng.randint(0, 120))
+    return intervals
+
+
+def test_insert_keeps_invariants_and_matches_brute_force():
+    rng = random.Random(1)
+    intervals = _random_intervals(rng, 500)
+    tree = IntervalTree()
+    for pid, (start, end) in intervals.items():
+        tree.insert(start, end, pid)
+        assert _check_invariants(tree.root) == tree.size
+    for _ in range(300):
+        q_start = rng.randint(-10, 480)
+        q_end = q_start + rng.randint(0, 60)
+        assert sorted(tree.overlapping(q_start, q_end)) == _brute_force(intervals, q_start, q_end)
+
+
+def test_insert_equal_starts():
+    tree = IntervalTree()
+    for pid in range(20):
+        tree.insert(100, 100 + pid, pid)
+    assert _check_invariants(tree.root) == 20
+    assert sorted(tree.overlapping(110, 200)) == list(range(10, 20))
+    assert sorted(tree.overlapping(0, 99)) == []
+
+
+def test_remove_node_with_two_children():
+    rng = random.Random(2)
+    intervals = _random_intervals(rng, 200)
+    tree = IntervalTree()
+    for pid, (start, end) in intervals.items():
+        tree.insert(start, end, pid)
+
+    removed_with_two_children = 0
+    while removed_with_two_children < 50:
+        node = tree.root
+        while node.left is None or node.right is None:  # walk down to a node with both children
+            node = node.left or node.right
+        start, pid = node.key
+        tree.remove(start, pid)
+        del intervals[pid]
+        removed_with_two_children += 1
+        assert _check_invariants(tree.root) == tree.size == len(intervals)
+        assert sorted(tree.overlapping(0, 1000)) == sorted(intervals)
+
+    for _ in range(200):
+        q_start = rng.randint(0, 480)
+        q_end = q_start + rng.randint(0, 30)
+        assert sorted(tree.overlapping(q_start, q_end)) == _brute_force(intervals, q_start, q_end)
+
+
+def test_remove_leaf_root_and_everything():
+    rng = random.Random(3)
+    intervals = _random_intervals(rng, 100)
+    tree = IntervalTree()
+    for pid, (start, end) in intervals.items():
+        tree.insert(start, end, pid)
+    for pid in rng.sample(sorted(intervals), len(intervals)):
+        tree.remove(intervals.pop(pid)[0], pid)
+        assert _check_invariants(tree.root) == tree.size
+        assert sorted(tree.overlapping(0, 1000)) == sorted(intervals)
+    assert tree.root is None
+
+
+def test_index_filters_by_location_and_treats_missing_end_as_open():
+    index = AvailabilityIndex()
+    index.add(1, "cdmx", "2025-01-01", "2025-01-31")
+    index.add(2, "CDMX ", "2025-03-01", None)
+    index.add(3, "GDL", "2025-01-15", "2025-02-15")
+    index.add(4, "CDMX", None, None)  # no start: never available
+    assert sorted(index.overlapping("2025-01-20", "2025-01-25")) == [1, 3]
+    assert index.overlapping("2025-01-20", "2025-01-25", "cdmx") == [1]
+    assert index.overlapping("2030-01-01", "2030-01-02", "CDMX") == [2]
+    index.add(1, "CDMX", "2025-06-01", "2025-06-30")  # re-add moves the window
+    assert index.overlapping("2025-01-20", "2025-01-25", "CDMX") == []
+    index.remove(3)
+    assert index.overlapping("2025-01-20", "2025-01-25") == []
+
+
+def test_reload_swaps_in_a_new_copy_and_replays_writes(monkeypatch):
+    index = AvailabilityIndex()
+    index.add(1, "CDMX", "2025-01-01", "2025-12-31")
+    live_trees = index._trees
+    rows = [
+        {"id": 1, "location": "CDMX", "available_from": "2025-01-01", "available_to": "2025-12-31"},
+        {"id": 2, "location": "CDMX", "available_from": "2025-01-01", "available_to": "2025-12-31"},
+    ]
+
+    def scan(columns, page_size=1000):
+        # Writes arrive while the new copy is being built
+        index.add(3, "CDMX", "2025-01-01", "2025-12-31")
+        index.remove(1)
+        assert live_trees["CDMX"].size == 1  # the live copy keeps serving meanwhile
+        yield from rows
+
+    monkeypatch.setattr(property_index, "scan_properties", scan)
+    index.load()
+    assert index._trees is not live_trees
+    assert sorted(index.overlapping("2025-06-01", "2025-06-02")) == [2, 3]
+    assert index.loaded and not index.older_than(60)
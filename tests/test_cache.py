@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+
+from src.api.db import cache
+from src.api.db.cache import EntityCache
+
+
+def _row(pk, payload=""):
+    return {"id": pk, "payload": payload}
+
+
+def _size(row):
+    return len(json.dumps(row, default=str))
+
+
+def test_evicts_least_recently_used_within_the_byte_budget():
+    entry = _size(_row(1, "x" * 50))
+    c = EntityCache(max_bytes=3 * entry, ttl_seconds=60)
+    for pk in (1, 2, 3):
+        c.put("t", pk, _row(pk, "x" * 50))
+    assert c.get("t", 1) is not None  # 1 becomes the most recently used
+    c.put("t", 4, _row(4, "x" * 50))
+    assert c.get("t", 2) is None
+    assert [c.get("t", pk)["id"] for pk in (1, 3, 4)] == [1, 3, 4]
+    assert c.bytes == 3 * entry and len(c) == 3
+
+
+def test_rows_larger_than_the_budget_are_not_cached():
+    c = EntityCache(max_bytes=10, ttl_seconds=60)
+    c.put("t", 1, _row(1, "x" * 50))
+    assert c.get("t", 1) is None and c.bytes == 0
+
+
+def test_replacing_and_invalidating_keep_the_byte_count():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+    c.put("t", 1, _row(1, "short"))
+    c.put("t", 1, _row(1, "a longer payload"))
+    assert c.bytes == _size(_row(1, "a longer payload"))
+    c.invalidate("t", 1)
+    assert c.bytes == 0 and c.get("t", 1) is None
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = EntityCache(max_bytes=10_000, ttl_seconds=30)
+    c.put("t", 1, _row(1))
+    now[0] += 29
+    assert c.get("t", 1) == _row(1)
+    now[0] += 2
+    assert c.get("t", 1) is None and c.bytes == 0
+
+
+def test_callers_get_copies():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+    c.put("t", 1, _row(1))
+    c.get("t", 1)["payload"] = "changed"
+    assert c.get("t", 1)["payload"] == ""
+
+
+def test_concurrent_misses_share_one_load():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return _row(1)
+
+    async def run():
+        return await asyncio.gather(*(c.get_or_load("t", 1, loader) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [_row(1)] * 5 and len(calls) == 1
+    assert (c.misses, c.coalesced) == (1, 4)
+    assert asyncio.run(c.get_or_load("t", 1, loader)) == _row(1) and c.hits == 1
+
+
+def test_a_failed_load_reaches_every_waiter_and_is_not_cached():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def run():
+        return await asyncio.gather(*(c.get_or_load("t", 1, loader) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(run()))
+    assert c.get("t", 1) is None and not c._inflight
+
+
+def test_invalidate_during_a_load_does_not_cache_the_stale_row():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+
+    async def run():
+        loading = asyncio.Event()
+
+        async def loader():
+            loading.set()
+            await asyncio.sleep(0.01)
+            return _row(1, "stale")
+
+        task = asyncio.create_task(c.get_or_load("t", 1, loader))
+        await loading.wait()
+        c.invalidate("t", 1)  # the row changed while it was being read
+        return await task
+
+    assert asyncio.run(run()) == _row(1, "stale")  # the caller still gets what it read
+    assert c.get("t", 1) is None
+    assert not c._inflight
+
+
+def test_a_load_after_an_invalidate_does_not_join_the_stale_one():
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+
+    async def run():
+        loading = asyncio.Event()
+
+        async def stale():
+            loading.set()
+            await asyncio.sleep(0.02)
+            return _row(1, "stale")
+
+        async def fresh():
+            return _row(1, "fresh")
+
+        first = asyncio.create_task(c.get_or_load("t", 1, stale))
+        await loading.wait()
+        c.invalidate("t", 1)
+        second = await c.get_or_load("t", 1, fresh)
+        await first
+        return second
+
+    assert asyncio.run(run()) == _row(1, "fresh")
+    assert c.get("t", 1) == _row(1, "fresh")
+
+
+@pytest.mark.parametrize("stored", [True, False])
+def test_put_during_a_load_wins(stored):
+    c = EntityCache(max_bytes=10_000, ttl_seconds=60)
+
+    async def run():
+        loading = asyncio.Event()
+
+        async def loader():
+            loading.set()
+            await asyncio.sleep(0.01)
+            return _row(1, "read") if stored else None
+
+        task = asyncio.create_task(c.get_or_load("t", 1, loader))
+        await loading.wait()
+        c.put("t", 1, _row(1, "written"))
+        await task
+
+    asyncio.run(run())
+    assert c.get("t", 1) == _row(1, "written")
@@ -0,0 +1,61 @@
+import asyncio
+
+from src.api.services import amenity_index, availability_index, geo_index, index_refresh, match_maintenance, property_index
+from src.api.services.change_feed import ChangeFeed, FeedReset, PropertyChanged, subscribe_indexes
+
+ROW = {"location": "CDMX", "available_from": "2025-01-01", "available_to": None, "amenities": [], "latitude": 19.4, "longitude": -99.1}
+
+
+def _feed(monkeypatch):
+    """A feed wired to fresh indexes; returns (feed, indexes, reloads)."""
+    indexes = {
+        "geo": geo_index.GeoIndex(),
+        "availability": availability_index.AvailabilityIndex(),
+        "amenity": amenity_index.AmenityIndex(),
+        "match_maintainer": match_maintenance.MatchMaintainer(),
+    }
+    monkeypatch.setattr(geo_index, "geo_index", indexes["geo"])
+    monkeypatch.setattr(availability_index, "availability_index", indexes["availability"])
+    monkeypatch.setattr(amenity_index, "amenity_index", indexes["amenity"])
+    monkeypatch.setattr(match_maintenance, "match_maintainer", indexes["match_maintainer"])
+    reloads = []
+    monkeypatch.setattr(index_refresh, "refresh", lambda due: reloads.append(due))
+    monkeypatch.setattr(indexes["match_maintainer"], "load", lambda: reloads.append("match_maintainer"))
+    feed = ChangeFeed()
+    subscribe_indexes(feed)
+    return feed, indexes, reloads
+
+
+def _publish_reset(feed):
+    async def run():
+        await feed.publish(FeedReset(reason="connected"))
+        await asyncio.sleep(0.05)  # let the background reload run
+    asyncio.run(run())
+
+
+def test_reset_on_the_initial_connect_reloads_nothing(monkeypatch):
+    feed, indexes, reloads = _feed(monkeypatch)
+    _publish_reset(feed)
+    assert reloads == []
+
+
+def test_reset_reloads_loaded_indexes_without_unloading_them(monkeypatch):
+    feed, indexes, reloads = _feed(monkeypatch)
+    for name in ("geo", "amenity", "match_maintainer"):
+        indexes[name].loaded = True
+    _publish_reset(feed)
+    assert reloads == [[indexes["geo"], indexes["amenity"]], "match_maintainer"]
+    assert indexes["geo"].loaded and indexes["amenity"].loaded and indexes["match_maintainer"].loaded
+
+
+def test_events_during_a_load_are_replayed(monkeypatch):
+    feed, indexes, _ = _feed(monkeypatch)
+    index = indexes["availability"]
+
+    def scan(columns, page_size=1000):
+        asyncio.run(feed.publish(PropertyChanged(table="properties", op="INSERT", id=2, row=ROW)))
+        yield {"id": 1, **ROW}
+
+    monkeypatch.setattr(property_index, "scan_properties", scan)
+    index.ensure_loaded()
+    assert sorted(index.overlapping("2025-06-01", "2025-06-02", location="CDMX")) == [1, 2]
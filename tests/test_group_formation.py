@@ -0,0 +1,24 @@
+from src.api.services.group_formation import CompatibilityGraph, form_groups
+
+
+def _user(i, budget_min, budget_max, tags=("quiet", "clean")):
+    return {"id": i, "budget_min": budget_min, "budget_max": budget_max, "lifestyle_tags": list(tags)}
+
+
+def test_members_without_an_edge_need_overlapping_budgets():
+    # 1-2 and 2-3 overlap, 1-3 do not: 1 and 3 share no edge and must not end up together,
+    # even though their score (same tags, close averages) would clear min_score
+    users = [_user(1, 1000, 2000), _user(2, 1900, 2100), _user(3, 2050, 2600)]
+    groups, _ = form_groups(users, min_size=2, max_size=3, min_score=0.6)
+    for group in groups:
+        assert not {1, 3} <= set(group["members"])
+
+
+def test_trimmed_edges_are_scored_only_when_budgets_overlap():
+    users = [_user(i, 4000, 6000) for i in range(1, 5)] + [_user(5, 6500, 7000)]
+    graph = CompatibilityGraph(users).build(min_score=0.6, max_neighbours=1)
+    trimmed = [(i, j) for i in range(4) for j in range(4) if i != j and j not in graph.neighbours[i]]
+    assert trimmed
+    for i, j in trimmed:
+        assert graph.link(i, j) == 1.0
+    assert graph.link(0, 4) is None
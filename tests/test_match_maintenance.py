@@ -0,0 +1,79 @@
+from src.api.services import match_maintenance
+from src.api.services.match_maintenance import MatchMaintainer
+
+
+class FakeTable:
+    """Just enough of the PostgREST query builder for MatchMaintainer.load()."""
+
+    def __init__(self, rows, on_execute=None):
+        self.rows = rows
+        self.on_execute = on_execute
+        self.last_id = 0
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self.last_id = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, n):
+        self.n = n
+        return self
+
+    def execute(self):
+        if self.on_execute:
+            self.on_execute()
+        page = [r for r in self.rows if r["id"] > self.last_id][:self.n]
+        return type("Result", (), {"data": page})()
+
+
+def _profile(pk, location="CDMX", budget_min=4000, budget_max=6000, **extra):
+    return {"id": pk, "user_id": f"u{pk}", "location_preference": location,
+            "budget_min": budget_min, "budget_max": budget_max, "lifestyle_tags": [], **extra}
+
+
+def _use_table(monkeypatch, table):
+    monkeypatch.setattr(match_maintenance, "client", type("Client", (), {"table": lambda self, name: table})())
+
+
+def test_load_swaps_in_a_new_copy_and_replays_writes(monkeypatch):
+    maintainer = MatchMaintainer()
+    maintainer.add_user(_profile(1))
+    live_users = maintainer._users
+
+    def during_scan():
+        maintainer.add_user(_profile(3))
+        maintainer.remove_user(1)
+        assert live_users.keys() == {3}  # the live copy keeps serving meanwhile
+
+    _use_table(monkeypatch, FakeTable([_profile(1), _profile(2)], during_scan))
+    maintainer.load(page_size=10)
+    assert maintainer._users is not live_users
+    assert sorted(u["id"] for u in maintainer.affected_users("cdmx", 5000, 5000)) == [2, 3]
+    assert maintainer.loaded
+
+
+def test_property_insert_applies_move_in_and_amenity_filters(monkeypatch):
+    maintainer = MatchMaintainer()
+    maintainer.loaded = True
+    maintainer.add_user(_profile(1))  # no preferences: "available now"
+    maintainer.add_user(_profile(2, roomie_preferences={"move_in_range": {"start": "2030-03-01", "end": "2030-03-31"}}))
+    maintainer.add_user(_profile(3, roomie_preferences={"pet_friendly": True}))
+    maintainer.add_user(_profile(4, roomie_preferences={"move_in_range": {"start": "2030-05-01", "end": "2030-05-31"},
+                                                        "amenities": ["WiFi"]}))
+    patched = []
+    monkeypatch.setattr(maintainer, "_patch", lambda column, item_id, scored: patched.append(sorted(u for u, _ in scored)) or (0, 0))
+
+    def insert(**prop):
+        maintainer.on_property_insert({"id": 100, "location": "CDMX", "price": 5000, **prop})
+        return patched.pop()
+
+    assert insert(available_from="2020-01-01T00:00:00", amenities=["Mascotas"]) == ["u1", "u2", "u3"]  # open-ended
+    assert insert(available_from="2020-01-01T00:00:00", available_to="2021-01-01T00:00:00") == ["u1"]
+    assert insert(available_from="2030-02-01T00:00:00", available_to="2030-03-05T00:00:00") == ["u2"]
+    assert insert(available_from="2030-04-01T00:00:00", amenities=["wi-fi"]) == ["u4"]
+    assert insert(available_from=None) == []